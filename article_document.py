@@ -0,0 +1,485 @@
+"""
+Article Document Model for Multi-Agent Content Creator System
+Parses the markdown-ish text the agents produce into a small block tree
+(headings, paragraphs, lists, tables and code blocks with bold/italic
+spans) that every export format renders from, so an article is parsed once
+and looks the same in Markdown, HTML, Word and PDF.
+
+render_markdown writes a tree back out as Markdown that parses to the same
+tree, so the Markdown export keeps everything the other formats show.
+"""
+
+import re
+import string
+import unicodedata
+from functools import lru_cache
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+
+class Span:
+    """A run of text with emphasis flags"""
+
+    __slots__ = ("text", "bold", "italic")
+
+    def __init__(self, text: str, bold: bool = False, italic: bool = False):
+        self.text = text
+        self.bold = bold
+        self.italic = italic
+
+    def __eq__(self, other):
+        return isinstance(other, Span) and (self.text, self.bold, self.italic) == (other.text, other.bold, other.italic)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Span({self.text!r}, bold={self.bold}, italic={self.italic})"
+
+
+class Block:
+    """A heading, paragraph, list, table or code block
+
+    Headings and paragraphs keep their text in ``spans``; lists keep one
+    tuple of spans per item in ``items`` and number from ``start``; tables
+    keep rows of cells in ``rows`` (the first row is the header) with a
+    left/center/right/None alignment per column in ``aligns``; code blocks
+    keep their lines verbatim in ``code`` and the fence's language in ``info``.
+    """
+
+    __slots__ = ("kind", "level", "spans", "items", "ordered", "start", "rows", "aligns", "code", "info")
+
+    def __init__(self, kind: str, spans: Tuple[Span, ...] = (), level: int = 0,
+                 items: Tuple[Tuple[Span, ...], ...] = (), ordered: bool = False, start: int = 1,
+                 rows: Tuple[Tuple[Tuple[Span, ...], ...], ...] = (), aligns: Tuple[Optional[str], ...] = (),
+                 code: str = "", info: str = ""):
+        self.kind = kind
+        self.spans = spans
+        self.level = level
+        self.items = items
+        self.ordered = ordered
+        self.start = start
+        self.rows = rows
+        self.aligns = aligns
+        self.code = code
+        self.info = info
+
+    @property
+    def text(self) -> str:
+        """Plain text of a heading or paragraph"""
+        return "".join(span.text for span in self.spans)
+
+    def __eq__(self, other):
+        return isinstance(other, Block) and all(getattr(self, name) == getattr(other, name)
+                                                for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self.kind == "list":
+            return f"Block(list, ordered={self.ordered}, items={len(self.items)})"
+        if self.kind == "table":
+            return f"Block(table, rows={len(self.rows)}, columns={len(self.aligns)})"
+        if self.kind == "code":
+            return f"Block(code, info={self.info!r}, lines={len(self.code.splitlines())})"
+        return f"Block({self.kind}, level={self.level}, text={self.text[:40]!r})"
+
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+_BOLD_LINE = re.compile(r'^\*\*([^*]+?)\*\*:?$')
+_BULLET = re.compile(r'^\s*[-*•+]\s+(.*)$')
+_NUMBERED = re.compile(r'^\s*(\d+)[.)]\s+(.*)$')
+_RULE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+_FENCE = re.compile(r'^\s*(`{3,}|~{3,})\s*([^`]*?)\s*$')
+_TABLE_DELIMITER = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$')
+_PUNCTUATION = set(string.punctuation)
+_ESCAPABLE = _PUNCTUATION | {"•"}
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def _is_punctuation(char: str) -> bool:
+    return char in _PUNCTUATION or unicodedata.category(char).startswith(("P", "S"))
+
+
+def _flanking(text: str, start: int, end: int) -> Tuple[bool, bool]:
+    """Whether the asterisk run text[start:end] can open and can close emphasis (CommonMark flanking)"""
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    left = not after.isspace() and (not _is_punctuation(after) or before.isspace() or _is_punctuation(before))
+    right = not before.isspace() and (not _is_punctuation(before) or after.isspace() or _is_punctuation(after))
+    return left, right
+
+
+def _tokens(text: str) -> List[Dict]:
+    """Literal text and asterisk runs; a backslash before punctuation makes it literal"""
+    tokens: List[Dict] = []
+    position = 0
+    for match in re.finditer(r'\\(.)|\*+', text):
+        if match.group(1) is not None and match.group(1) not in _ESCAPABLE:
+            continue
+        if match.start() > position:
+            tokens.append({"text": text[position:match.start()]})
+        if match.group(1) is not None:
+            tokens.append({"text": match.group(1)})
+        else:
+            can_open, can_close = _flanking(text, match.start(), match.end())
+            tokens.append({"run": len(match.group()), "left": len(match.group()), "open": can_open,
+                           "close": can_close})
+        position = match.end()
+    if position < len(text):
+        tokens.append({"text": text[position:]})
+    return tokens
+
+
+def _pair_runs(tokens: List[Dict]):
+    """Match closing asterisk runs with openers, marking the tokens between them bold or italic
+
+    Two asterisks from each side make bold, one makes italic. As in CommonMark,
+    a run that can both open and close pairs only when the two runs' lengths do
+    not sum to a multiple of 3 (unless both are multiples of 3).
+    """
+    runs = [index for index, token in enumerate(tokens) if "run" in token]
+    k = 0
+    while k < len(runs):
+        closer = tokens[runs[k]]
+        opener_at = None
+        if closer["close"] and closer["left"]:
+            for m in range(k - 1, -1, -1):
+                opener = tokens[runs[m]]
+                if not opener["open"] or not opener["left"]:
+                    continue
+                total = opener["run"] + closer["run"]
+                if ((opener["close"] or closer["open"]) and total % 3 == 0
+                        and not (opener["run"] % 3 == 0 and closer["run"] % 3 == 0)):
+                    continue
+                opener_at = m
+                break
+        if opener_at is None:
+            k += 1
+            continue
+        opener = tokens[runs[opener_at]]
+        used = 2 if opener["left"] >= 2 and closer["left"] >= 2 else 1
+        for token in tokens[runs[opener_at] + 1:runs[k]]:
+            token["bold" if used == 2 else "italic"] = True
+        opener["left"] -= used
+        closer["left"] -= used
+        for m in range(opener_at + 1, k):
+            tokens[runs[m]]["open"] = tokens[runs[m]]["close"] = False
+        if not closer["left"]:
+            k += 1
+
+
+def parse_inline(text: str) -> Tuple[Span, ...]:
+    """Split text into spans on **bold**, *italic* and ***both*** markers, which may nest
+
+    Asterisks follow CommonMark's emphasis rules; unpaired ones, and any
+    escaped with a backslash, stay literal.
+    """
+    tokens = _tokens(text)
+    _pair_runs(tokens)
+    spans: List[Span] = []
+    for token in tokens:
+        piece = token["text"] if "text" in token else "*" * token["left"]
+        if not piece:
+            continue
+        bold, italic = token.get("bold", False), token.get("italic", False)
+        if spans and (spans[-1].bold, spans[-1].italic) == (bold, italic):
+            spans[-1] = Span(spans[-1].text + piece, bold, italic)
+        else:
+            spans.append(Span(piece, bold, italic))
+    return tuple(spans)
+
+
+def _table_cells(line: str) -> List[str]:
+    """Cells of a pipe-table row; ``\\|`` is a literal pipe inside a cell"""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip() for cell in re.split(r'(?<!\\)\|', line)]
+
+
+def _alignment(cell: str) -> Optional[str]:
+    if cell.startswith(":") and cell.endswith(":"):
+        return "center"
+    if cell.endswith(":"):
+        return "right"
+    if cell.startswith(":"):
+        return "left"
+    return None
+
+
+def _table_at(lines: List[str], index: int) -> Optional[Tuple[Block, int]]:
+    """The pipe table whose header is lines[index], and the index after it, if there is one"""
+    if "|" not in lines[index] or index + 1 >= len(lines) or not _TABLE_DELIMITER.match(lines[index + 1].strip()):
+        return None
+    header = _table_cells(lines[index])
+    aligns = [_alignment(cell) for cell in _table_cells(lines[index + 1])]
+    if len(aligns) != len(header):
+        return None
+    rows = [header]
+    index += 2
+    while index < len(lines) and lines[index].strip() and "|" in lines[index]:
+        cells = _table_cells(lines[index])[:len(header)]
+        rows.append(cells + [""] * (len(header) - len(cells)))
+        index += 1
+    return Block("table", rows=tuple(tuple(parse_inline(cell) for cell in row) for row in rows),
+                 aligns=tuple(aligns)), index
+
+
+def _closes_fence(line: str, marker: str) -> bool:
+    closing = line.strip()
+    return closing.startswith(marker) and not closing.strip(marker[0])
+
+
+def _fence_at(lines: List[str], index: int) -> Optional[Tuple[Block, int]]:
+    """The fenced code block opened at lines[index], and the index after it; runs to the end if unclosed"""
+    fence = _FENCE.match(lines[index])
+    if not fence:
+        return None
+    body = []
+    index += 1
+    while index < len(lines):
+        if _closes_fence(lines[index], fence.group(1)):
+            return Block("code", code="\n".join(body), info=fence.group(2)), index + 1
+        body.append(lines[index])
+        index += 1
+    return Block("code", code="\n".join(body), info=fence.group(2)), index
+
+
+def has_open_fence(text: str) -> bool:
+    """Whether text ends inside a fenced code block, i.e. more of the block is still to come"""
+    marker = None
+    for line in text.split('\n'):
+        if marker is None:
+            fence = _FENCE.match(line)
+            marker = fence.group(1) if fence else None
+        elif _closes_fence(line, marker):
+            marker = None
+    return marker is not None
+
+
+@lru_cache(maxsize=32)
+def parse_article(article: str) -> Tuple[Block, ...]:
+    """Parse article text into blocks; results are cached per article text
+
+    Every non-empty line outside a list, table or code block becomes its own
+    paragraph, matching how the exporters have always laid out model output.
+    A line that is entirely bold (``**Title**``) is treated as a level-2 heading.
+    """
+    blocks: List[Block] = []
+    list_items: List[Tuple[Span, ...]] = []
+    list_ordered = False
+    list_start = 1
+
+    def close_list():
+        nonlocal list_items
+        if list_items:
+            blocks.append(Block("list", items=tuple(list_items), ordered=list_ordered,
+                                start=list_start if list_ordered else 1))
+            list_items = []
+
+    lines = article.split('\n')
+    index = 0
+    while index < len(lines):
+        raw_line = lines[index]
+        line = raw_line.strip()
+        fenced = _fence_at(lines, index) or _table_at(lines, index)
+        if fenced:
+            close_list()
+            blocks.append(fenced[0])
+            index = fenced[1]
+            continue
+        index += 1
+        if not line or _RULE.match(line):
+            close_list()
+            continue
+
+        heading = _HEADING.match(line)
+        bold_line = _BOLD_LINE.match(line)
+        bold_line = bold_line if bold_line and bold_line.group(1).strip() else None
+        bullet = _BULLET.match(raw_line)
+        numbered = _NUMBERED.match(raw_line)
+
+        if heading:
+            close_list()
+            blocks.append(Block("heading", parse_inline(heading.group(2)), level=len(heading.group(1))))
+        elif bold_line:
+            close_list()
+            blocks.append(Block("heading", (Span(bold_line.group(1).strip()),), level=2))
+        elif bullet or numbered:
+            ordered = numbered is not None
+            if list_items and ordered != list_ordered:
+                close_list()
+            if not list_items:
+                list_start = int(numbered.group(1)) if ordered else 1
+            list_ordered = ordered
+            list_items.append(parse_inline((numbered.group(2) if ordered else bullet.group(1)).strip()))
+        else:
+            close_list()
+            spans = parse_inline(line)
+            if len(spans) == 1 and spans[0].bold and not spans[0].italic and "*" not in spans[0].text:
+                blocks.append(Block("heading", (Span(spans[0].text.strip()),), level=2))
+            else:
+                blocks.append(Block("paragraph", spans))
+
+    close_list()
+    return tuple(blocks)
+
+
+# ---------------------------------------------------------------------------
+# Inline renderers shared by the exporters
+# ---------------------------------------------------------------------------
+
+def _escape_markdown(text: str, special: str = "") -> str:
+    """Backslash-escape asterisks (and ``special``) so text reads back literally"""
+    text = re.sub(r'\\(?=[%s]|$)' % re.escape("".join(sorted(_ESCAPABLE))), r'\\\\', text)
+    for char in "*" + special:
+        text = text.replace(char, "\\" + char)
+    return text
+
+
+def spans_to_markdown(spans: Tuple[Span, ...], special: str = "") -> str:
+    """Inline Markdown; emphasis markers open and close only where the flags change"""
+    parts = []
+    bold = italic = False
+    for span in spans:
+        if italic and not span.italic:
+            parts.append("*")
+            italic = False
+        if bold and not span.bold:
+            parts.append("**")
+            bold = False
+        if span.bold and not bold:
+            parts.append("**")
+            bold = True
+        if span.italic and not italic:
+            parts.append("*")
+            italic = True
+        parts.append(_escape_markdown(span.text, special))
+    if italic:
+        parts.append("*")
+    if bold:
+        parts.append("**")
+    return "".join(parts)
+
+
+def spans_to_html(spans: Tuple[Span, ...], bold_tag: str = "strong", italic_tag: str = "em") -> str:
+    """Escaped inline markup; with b/i tags it is also ReportLab paragraph markup"""
+    parts = []
+    for span in spans:
+        text = escape(span.text, quote=False)
+        if span.italic:
+            text = f"<{italic_tag}>{text}</{italic_tag}>"
+        if span.bold:
+            text = f"<{bold_tag}>{text}</{bold_tag}>"
+        parts.append(text)
+    return "".join(parts)
+
+
+def _section_level(block: Block) -> int:
+    """Heading level below the document title, which owns level 1"""
+    return min(max(block.level, 2), 6)
+
+
+# ---------------------------------------------------------------------------
+# Block renderers
+# ---------------------------------------------------------------------------
+
+def _paragraph_markdown(spans: Tuple[Span, ...]) -> str:
+    """A paragraph line, escaped where it would otherwise start another kind of block"""
+    line = spans_to_markdown(spans)
+    numbered = re.match(r'^(\d+)([.)])(\s)', line)
+    if numbered:
+        return f"{numbered.group(1)}\\{line[len(numbered.group(1)):]}"
+    if _BOLD_LINE.match(line) and line.endswith(":"):
+        return line[:-1] + "\\:"
+    if _HEADING.match(line) or _BULLET.match(line) or _RULE.match(line) or _FENCE.match(line):
+        return "\\" + line
+    return line
+
+
+def _heading_markdown(block: Block) -> str:
+    """A heading line; a trailing run of '#' is escaped so it is not read as a closing sequence"""
+    text = re.sub(r'(^|\s)(#+)$', r'\1\\\2', spans_to_markdown(block.spans))
+    return f"{'#' * block.level} {text}"
+
+
+def _table_markdown(block: Block) -> List[str]:
+    delimiters = {"left": ":---", "center": ":---:", "right": "---:", None: "---"}
+    lines = []
+    for number, row in enumerate(block.rows):
+        lines.append("| " + " | ".join(spans_to_markdown(cell, "|") for cell in row) + " |")
+        if number == 0:
+            lines.append("| " + " | ".join(delimiters[align] for align in block.aligns) + " |")
+    return lines
+
+
+def _item_markdown(block: Block, number: int, item: Tuple[Span, ...]) -> str:
+    text = spans_to_markdown(item)
+    if block.ordered:
+        return f"{block.start + number}. {text}"
+    # "- -" or "- ---|---" would read back as a horizontal rule or a table delimiter row
+    line = f"- {text}"
+    return f"* {text}" if _RULE.match(line) or _TABLE_DELIMITER.match(line) else line
+
+
+def _code_fence(code: str) -> str:
+    """A backtick fence longer than any backtick run inside the code"""
+    longest = max((len(run) for run in re.findall(r'`{3,}', code)), default=2)
+    return "`" * (longest + 1)
+
+
+def render_markdown(blocks: Tuple[Block, ...]) -> str:
+    """Markdown that parse_article reads back into the same blocks"""
+    parts = []
+    for block in blocks:
+        if block.kind == "heading":
+            parts.append(_heading_markdown(block))
+        elif block.kind == "list":
+            parts.append("\n".join(_item_markdown(block, number, item) for number, item in enumerate(block.items)))
+        elif block.kind == "table":
+            parts.append("\n".join(_table_markdown(block)))
+        elif block.kind == "code":
+            fence = _code_fence(block.code)
+            parts.append(f"{fence}{block.info}\n{block.code}\n{fence}" if block.code else
+                         f"{fence}{block.info}\n{fence}")
+        else:
+            parts.append(_paragraph_markdown(block.spans))
+    return "\n\n".join(parts) + "\n" if parts else ""
+
+
+def _cell_style(align: Optional[str]) -> str:
+    return f' style="text-align: {align}"' if align else ""
+
+
+def render_html(blocks: Tuple[Block, ...]) -> str:
+    parts = []
+    for block in blocks:
+        if block.kind == "heading":
+            level = _section_level(block)
+            parts.append(f"<h{level}>{spans_to_html(block.spans)}</h{level}>")
+        elif block.kind == "list":
+            tag = "ol" if block.ordered else "ul"
+            start = f' start="{block.start}"' if block.ordered and block.start != 1 else ""
+            items = "".join(f"<li>{spans_to_html(item)}</li>" for item in block.items)
+            parts.append(f"<{tag}{start}>{items}</{tag}>")
+        elif block.kind == "table":
+            rows = []
+            for number, row in enumerate(block.rows):
+                cell_tag = "th" if number == 0 else "td"
+                cells = "".join(
+                    f"<{cell_tag}{_cell_style(align)}>{spans_to_html(cell)}</{cell_tag}>"
+                    for cell, align in zip(row, block.aligns)
+                )
+                rows.append(f"<tr>{cells}</tr>")
+            parts.append(f"<table><thead>{rows[0]}</thead><tbody>{''.join(rows[1:])}</tbody></table>")
+        elif block.kind == "code":
+            language = f' class="language-{escape(block.info.split()[0])}"' if block.info else ""
+            parts.append(f"<pre><code{language}>{escape(block.code, quote=False)}</code></pre>")
+        else:
+            parts.append(f"<p>{spans_to_html(block.spans)}</p>")
+    return "\n            ".join(parts)
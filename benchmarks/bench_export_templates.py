@@ -0,0 +1,85 @@
+"""
+Benchmark: per-article export latency with and without the cached templates
+
+Cold runs clear the cached stylesheets/templates (and the parsed document)
+before every export, which reproduces the old build-everything-per-call
+behaviour. Warm runs reuse them, as a long-running process does.
+
+Usage:
+    python benchmarks/bench_export_templates.py [--runs 20] [--paragraphs 10]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+
+import content_tools  # noqa: E402
+from article_document import parse_article  # noqa: E402
+
+
+def make_article(paragraphs: int) -> str:
+    sections = []
+    for i in range(paragraphs):
+        sections.append(f"**Section {i + 1}**")
+        sections.append("AI adoption grew 42% in 2023, according to *industry surveys*. " * 6)
+        sections.append("- Key point with **emphasis**\n- Another key point")
+    return "\n\n".join(sections)
+
+
+def clear_caches():
+    content_tools._html_template.cache_clear()
+    content_tools._docx_template.cache_clear()
+    content_tools._pdf_styles.cache_clear()
+    parse_article.cache_clear()
+
+
+def measure(export, article: str, path: str, runs: int, cold: bool):
+    timings = []
+    for _ in range(runs):
+        if cold:
+            clear_caches()
+        started = time.perf_counter()
+        export(article, path)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=10)
+    args = parser.parse_args()
+
+    article = make_article(args.paragraphs)
+    exporter = content_tools.MultiFormatExporter()
+    formats = [("html", exporter.export_to_html), ("docx", exporter.export_to_docx), ("pdf", exporter.export_to_pdf)]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        devnull = open(os.devnull, "w")
+        stdout, sys.stdout = sys.stdout, devnull  # silence per-export progress lines
+        try:
+            for name, export in formats:
+                path = os.path.join(tmp, f"article.{name}")
+                export(article, path)  # import/first-use warm-up for both modes
+                cold = measure(export, article, path, args.runs, cold=True)
+                warm = measure(export, article, path, args.runs, cold=False)
+                rows.append((name, statistics.median(cold), statistics.median(warm)))
+        finally:
+            sys.stdout = stdout
+            devnull.close()
+
+    print(f"Article: {len(article)} chars, {args.runs} runs per mode (median ms)")
+    print(f"{'format':<8}{'cold':>10}{'warm':>10}{'saved':>10}")
+    for name, cold, warm in rows:
+        print(f"{name:<8}{cold:>10.2f}{warm:>10.2f}{cold - warm:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: end-to-end and per-stage pipeline throughput on the fake LLM backend
+
+Runs MultiAgentContentCreator.create_content, generate_comprehensive_output
+and every MultiFormatExporter method at several article sizes without a
+Groq key. Model latency comes from the fake backend, so what varies between
+commits is the pipeline's own overhead. Per-stage numbers are read back from
+the tracing spans. Save a run with --json and compare later runs against it
+with --baseline to catch regressions.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--sizes 200,800,2000] [--runs 3]
+        [--latency-ms 50] [--dist fixed] [--ms-per-token 0] [--write-mode single]
+        [--json out.json] [--baseline out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="200,800,2000",
+                        help="comma-separated article sizes in words (default: 200,800,2000)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=50.0,
+                        help="median fake model latency per call (default: 50)")
+    parser.add_argument("--dist", default="fixed", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--ms-per-token", type=float, default=0.0,
+                        help="extra fake latency per completion token, so long outputs cost more (default: 0)")
+    parser.add_argument("--write-mode", default="single", choices=["single", "sections"],
+                        help="WriterAgent mode to benchmark (default: single)")
+    parser.add_argument("--json", metavar="FILE", help="write results to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against results saved with --json")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="relative slowdown vs baseline reported as a regression (default: 0.15)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="ignore slowdowns smaller than this many ms (default: 1.0)")
+    return parser.parse_args()
+
+
+def configure_env(args, trace_file: str):
+    """Point every backend knob at the fake model; must run before the pipeline is imported"""
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "LLM_CACHE": "off",
+        "CLAIM_INDEX": "off",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_LATENCY_DIST": args.dist,
+        "FAKE_LLM_JITTER": str(args.jitter),
+        "FAKE_LLM_MS_PER_TOKEN": str(args.ms_per_token),
+        "WRITER_MODE": args.write_mode,
+        "TRACE_FILE": trace_file,
+    })
+
+
+def timed(fn, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def bench_size(words: int, args, tmp: str) -> dict:
+    import content_tools
+    import main
+    import tracing
+    from fake_llm import FakeChatModel
+    from llm_backends import override_llm
+
+    fake = FakeChatModel.from_env(words=words, max_tokens=max(2000, words * 2))
+    override_llm(fake)
+    trace_file = os.path.join(tmp, f"trace_{words}.jsonl")
+    tracing.configure_tracing(trace_file)
+    output_dir = os.path.join(tmp, f"out_{words}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    article = fake._article(fake._rng(f"article:{words}"))
+    results = {"words": words, "article_chars": len(article)}
+
+    def create():
+        main.MultiAgentContentCreator(max_iterations=1).create_content(f"Benchmark topic {words}")
+    results["create_content_ms"] = timed(create, args.runs)
+    results["generate_comprehensive_output_ms"] = timed(
+        lambda: content_tools.generate_comprehensive_output(article, "benchmark", output_dir), args.runs)
+
+    exporter = content_tools.MultiFormatExporter()
+    for export_format, (ext, method) in content_tools.EXPORT_FORMATS.items():
+        path = os.path.join(output_dir, f"bench.{ext}")
+        results[f"{method}_ms"] = timed(lambda: getattr(exporter, method)(article, path), args.runs)
+
+    results["stages"] = {stage: {"count": stats["count"], "p50_ms": stats["p50_ms"], "p95_ms": stats["p95_ms"]}
+                         for stage, stats in tracing.summarize(trace_file).items()}
+    return results
+
+
+def report(all_results, baseline, tolerance: float, min_delta_ms: float) -> int:
+    regressions = 0
+    for results in all_results:
+        print(f"\n{results['words']} words ({results['article_chars']} chars), median ms")
+        previous = next((r for r in baseline if r["words"] == results["words"]), {}) if baseline else {}
+        for key, value in results.items():
+            if not key.endswith("_ms"):
+                continue
+            line = f"  {key[:-3]:<34}{value:>10.1f}"
+            if key in previous:
+                change = value / previous[key] - 1 if previous[key] else 0.0
+                slower = change > tolerance and value - previous[key] > min_delta_ms
+                flag = "  ⚠️  REGRESSION" if slower else ""
+                regressions += bool(flag)
+                line += f"{previous[key]:>10.1f}{change:>+9.1%}{flag}"
+            print(line)
+        print(f"  {'stage':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}")
+        for stage, stats in results["stages"].items():
+            print(f"  {stage:<22}{stats['count']:>6}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    all_results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_env(args, os.path.join(tmp, "trace.jsonl"))
+        cwd = os.getcwd()
+        os.chdir(tmp)  # article_output.txt and friends land in the temp dir
+        devnull = open(os.devnull, "w")
+        stdout, sys.stdout = sys.stdout, devnull  # silence per-stage progress lines
+        try:
+            for words in sizes:
+                all_results.append(bench_size(words, args, tmp))
+        finally:
+            sys.stdout = stdout
+            devnull.close()
+            os.chdir(cwd)
+
+    print(f"Fake LLM: {args.dist} latency, median {args.latency_ms:.0f} ms; {args.runs} run(s) per measurement")
+    regressions = report(all_results, baseline, args.tolerance, args.min_delta_ms)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": all_results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+    if baseline is not None:
+        print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
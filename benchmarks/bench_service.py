@@ -0,0 +1,119 @@
+"""
+Benchmark: HTTP service throughput and job latency on the fake LLM backend
+
+Starts the job service in-process on a free local port, submits many topics
+at once over HTTP, follows every job's event stream to completion and
+reports throughput, end-to-end latency and queueing. No API key or external
+service is needed.
+
+Usage:
+    python benchmarks/bench_service.py [--jobs 20] [--workers 4] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=50.0,
+                        help="median fake model latency per call (default: 50)")
+    parser.add_argument("--words", type=int, default=400, help="fake article size in words (default: 400)")
+    return parser.parse_args()
+
+
+async def follow(session, base: str, job_id: str) -> int:
+    """Read a job's event stream until it ends; returns the number of events seen"""
+    events = 0
+    async with session.get(f"{base}/jobs/{job_id}/events") as response:
+        async for line in response.content:
+            if line.startswith(b"data: "):
+                events += 1
+    return events
+
+
+async def run(args, tmp: str):
+    from aiohttp import ClientSession, web
+    import service
+
+    app = service.create_app(service.ContentService(workers=args.workers, queue_size=args.queue_size,
+                                                    output_root=os.path.join(tmp, "service_output")))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+
+    async def one(session, index: int):
+        started = time.perf_counter()
+        async with session.post(f"{base}/jobs", json={"topic": f"Benchmark topic {index}"}) as response:
+            if response.status != 202:
+                return {"rejected": True}
+            job_id = (await response.json())["job_id"]
+        events = await follow(session, base, job_id)
+        async with session.get(f"{base}/jobs/{job_id}") as response:
+            status = await response.json()
+        return {"rejected": False, "seconds": time.perf_counter() - started, "events": events,
+                "status": status["status"], "queue_seconds": status["queue_seconds"]}
+
+    try:
+        async with ClientSession() as session:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(one(session, i) for i in range(args.jobs)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+    return results, elapsed
+
+
+def main():
+    args = parse_args()
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "LLM_CACHE": "off",
+        "CLAIM_INDEX": "off",
+        "TRACE": "off",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_WORDS": str(args.words),
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CHECKPOINT_DIR"] = os.path.join(tmp, "checkpoints")
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        devnull = open(os.devnull, "w")
+        stdout, sys.stdout = sys.stdout, devnull  # silence per-stage progress lines
+        try:
+            results, elapsed = asyncio.run(run(args, tmp))
+        finally:
+            sys.stdout = stdout
+            devnull.close()
+            os.chdir(cwd)
+
+    accepted = [r for r in results if not r["rejected"]]
+    succeeded = [r for r in accepted if r["status"] == "succeeded"]
+    latencies = sorted(r["seconds"] for r in accepted)
+    queued = sorted(r["queue_seconds"] for r in accepted)
+    print(f"{args.jobs} jobs, {args.workers} workers, fake LLM median {args.latency_ms:.0f} ms")
+    print(f"  accepted {len(accepted)}, rejected {args.jobs - len(accepted)}, succeeded {len(succeeded)}")
+    print(f"  wall {elapsed:.2f}s, throughput {len(succeeded) / elapsed:.2f} jobs/s")
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(f"  job latency p50 {statistics.median(latencies):.2f}s, p95 {p95:.2f}s")
+        print(f"  queue wait p50 {statistics.median(queued):.2f}s, max {queued[-1]:.2f}s")
+        print(f"  events streamed per job: {statistics.median(r['events'] for r in accepted):.0f}")
+    return 0 if len(succeeded) == len(accepted) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
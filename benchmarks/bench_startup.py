@@ -0,0 +1,74 @@
+"""
+Benchmark: CLI cold-start latency and resident memory, lazy vs eager imports
+
+Each sample runs in a fresh interpreter. "lazy" is what `python main.py
+--help` pays today. "eager" additionally imports everything the old
+module-level imports pulled in (langchain, reportlab, python-docx, jinja2,
+content_tools) and builds the LLM client, reproducing the previous startup.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_REPORT_RSS = """
+try:
+    import resource
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)
+except ImportError:  # Windows
+    print(-1)
+"""
+
+MODES = {
+    "lazy": "import sys; sys.argv = ['main.py', '--help']\n"
+            "import main\n"
+            "try:\n    main.parse_args()\nexcept SystemExit:\n    pass\n",
+    "eager": "import main, content_tools, langchain.prompts, reportlab.platypus, docx, jinja2\n"
+             "import llm_backends\n"
+             "for stage in llm_backends.STAGES:\n    llm_backends.get_llm(stage)\n",
+}
+
+
+def sample(code: str):
+    """(wall ms, peak RSS MB) of one fresh interpreter running code"""
+    env = dict(os.environ, GROQ_API_KEY=os.getenv("GROQ_API_KEY") or "benchmark-placeholder")
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code + _REPORT_RSS], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, int(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    sample(MODES["eager"])  # populate __pycache__ and the OS file cache for both modes
+    rows = {}
+    for name, code in MODES.items():
+        samples = [sample(code) for _ in range(args.runs)]
+        rows[name] = (statistics.median(s[0] for s in samples), max(s[1] for s in samples))
+
+    print(f"{args.runs} fresh interpreters per mode (median wall ms, peak RSS MB)")
+    print(f"{'mode':<8}{'wall ms':>10}{'RSS MB':>10}")
+    for name, (wall, rss) in rows.items():
+        print(f"{name:<8}{wall:>10.1f}{rss if rss >= 0 else 'n/a':>10}")
+    lazy, eager = rows["lazy"], rows["eager"]
+    print(f"\nStartup cut: {eager[0] - lazy[0]:.1f} ms ({1 - lazy[0] / eager[0]:.0%})", end="")
+    if lazy[1] >= 0:
+        print(f", {eager[1] - lazy[1]} MB resident")
+    else:
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Stage Checkpoints for Multi-Agent Content Creator System
+Each pipeline stage's output is written to disk under a run ID as soon as it
+completes, so an interrupted run can resume from the first unfinished stage.
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def _default_root() -> str:
+    return os.getenv("CHECKPOINT_DIR", "checkpoints")
+
+
+class CheckpointStore:
+    """JSON checkpoint files for one run, stored in ``<root>/<run_id>/``"""
+
+    def __init__(self, run_id: Optional[str] = None, root: Optional[str] = None):
+        root = root or _default_root()
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.directory = os.path.join(root, self.run_id)
+        os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def open(cls, run_id: str, root: Optional[str] = None) -> "CheckpointStore":
+        """Open an existing run; raises FileNotFoundError for unknown run IDs"""
+        root = root or _default_root()
+        if not os.path.isdir(os.path.join(root, run_id)):
+            raise FileNotFoundError(f"No checkpoints found for run '{run_id}' in {root}/")
+        return cls(run_id, root)
+
+    def _path(self, stage: str) -> str:
+        return os.path.join(self.directory, f"{stage}.json")
+
+    def has(self, stage: str) -> bool:
+        return os.path.exists(self._path(stage))
+
+    def load(self, stage: str) -> Any:
+        with open(self._path(stage), encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, stage: str, data: Any):
+        """Write atomically so a crash mid-write never leaves a torn checkpoint"""
+        path = self._path(stage)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def save_run_info(self, **info):
+        """Record what is needed to restart the run (topic, options...)"""
+        existing = self.load_run_info() if self.has("run") else {}
+        existing.update(info, run_id=self.run_id)
+        self.save("run", existing)
+
+    def load_run_info(self) -> Dict:
+        return self.load("run")
+
+
+def run_stage(store: Optional[CheckpointStore], stage: str, produce: Callable[[], Any],
+              restore: Optional[Callable[[Any], None]] = None) -> Any:
+    """Return the checkpointed result of `stage`, or run `produce` and checkpoint it
+
+    `restore` is called with a result loaded from disk so callers can replay
+    side effects (e.g. memory updates) that `produce` would have performed.
+    None results are never checkpointed, so failed steps rerun on resume.
+    """
+    if store is not None and store.has(stage):
+        print(f"♻️  Restored '{stage}' from checkpoint {store.run_id}")
+        result = store.load(stage)
+        if restore:
+            restore(result)
+        return result
+
+    result = produce()
+    if store is not None and result is not None:
+        store.save(stage, result)
+    return result
+
+
+async def arun_stage(store: Optional[CheckpointStore], stage: str, produce: Callable[[], Awaitable[Any]],
+                     restore: Optional[Callable[[Any], None]] = None) -> Any:
+    """Asynchronous counterpart of run_stage; `produce` returns an awaitable"""
+    if store is not None and store.has(stage):
+        print(f"♻️  Restored '{stage}' from checkpoint {store.run_id}")
+        result = store.load(stage)
+        if restore:
+            restore(result)
+        return result
+
+    result = await produce()
+    if store is not None and result is not None:
+        store.save(stage, result)
+    return result
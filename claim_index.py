@@ -0,0 +1,83 @@
+"""
+Checked-Claim Index for Multi-Agent Content Creator System
+Remembers the fact-check outcome of individual claims so a claim that was
+already verified in an earlier article is not sent to the model again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class ClaimIndex:
+    """SQLite index of fact-checked claims keyed by normalised claim text"""
+
+    def __init__(self, path: str = ".claim_index.sqlite", ttl_seconds: Optional[float] = 30 * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS claims (
+                key TEXT PRIMARY KEY,
+                verified INTEGER NOT NULL,
+                claim TEXT NOT NULL,
+                accuracy REAL,
+                checked_at REAL NOT NULL
+            )"""
+        )
+
+    def lookup(self, keys: List[str]) -> Dict[str, Dict]:
+        """Return {key: {"verified", "claim", "accuracy"}} for known, unexpired keys"""
+        if not keys:
+            return {}
+        oldest = time.time() - self.ttl_seconds if self.ttl_seconds is not None else 0
+        found = {}
+        with self._lock:
+            for key in set(keys):
+                row = self._conn.execute(
+                    "SELECT verified, claim, accuracy FROM claims WHERE key = ? AND checked_at >= ?",
+                    (key, oldest),
+                ).fetchone()
+                if row:
+                    found[key] = {"verified": bool(row[0]), "claim": json.loads(row[1]), "accuracy": row[2]}
+        return found
+
+    def record(self, key: str, claim: Dict, verified: bool, accuracy: Optional[float]):
+        """Store (or refresh) the outcome of checking one claim"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO claims (key, verified, claim, accuracy, checked_at) VALUES (?, ?, ?, ?, ?)",
+                (key, int(verified), json.dumps(claim), accuracy, time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def claim_index_from_env() -> Optional[ClaimIndex]:
+    """Build the index described by CLAIM_INDEX* environment variables
+
+    ``CLAIM_INDEX=off`` disables the index so every claim is re-checked.
+    """
+    if os.getenv("CLAIM_INDEX", "on").lower() in ("off", "0", "false", "no"):
+        return None
+    return ClaimIndex(path=os.getenv("CLAIM_INDEX_PATH", ".claim_index.sqlite"))
+
+
+_index: Optional[ClaimIndex] = None
+_index_loaded = False
+
+
+def get_claim_index() -> Optional[ClaimIndex]:
+    """Process-wide index shared by every FactCheckingAgent, opened on first use"""
+    global _index, _index_loaded
+    if not _index_loaded:
+        _index = claim_index_from_env()
+        _index_loaded = True
+    return _index
@@ -3,37 +3,50 @@ Content Tools for Multi-Agent Content Creator System
 Includes: Fact-Checking, Multi-Format Export, Social Media Generator
 """
 
+import atexit
+import multiprocessing
 import os
-from typing import Dict, List
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 from langchain.prompts import PromptTemplate
+import asyncio
 import json
 import re
-from docx import Document
-from docx.shared import Pt, RGBColor
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.units import inch
+import threading
+import time
+from llm_backends import get_llm
+from llm_client import stream_llm, astream_llm
+from tracing import bind_trace, current_trace_id, get_tracer
+from checkpoints import run_stage, arun_stage
+from claim_index import ClaimIndex, get_claim_index
+from article_document import parse_article, render_html, render_markdown, spans_to_html
+from structured_output import (FACT_CHECK_SCHEMA, SOCIAL_SCHEMA, StructuredOutputError, astructured_stream,
+                               structured_stream)
+from functools import lru_cache
+from io import BytesIO
 
 load_dotenv()
 
-# Configure LLM
-llm = ChatGroq(
-    model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
-    temperature=float(os.getenv("GROQ_TEMPERATURE", "0.7")),
-    groq_api_key=os.getenv("GROQ_API_KEY"),
-    max_tokens=int(os.getenv("GROQ_MAX_TOKENS", "2000"))
-)
-
 
 class FactCheckingAgent:
     """Agent that verifies claims and adds citations"""
     
-    def __init__(self):
+    def __init__(self, chunked: Optional[bool] = None, chunk_size: int = 3000,
+                 extract_claims: Optional[bool] = None, claim_index: Optional[ClaimIndex] = None):
         self.role = "Fact-Checker"
+        # Chunked mode checks the whole article instead of a token-budgeted extract of it
+        if chunked is None:
+            chunked = _env_flag("FACT_CHECK_CHUNKED")
+        self.chunked = chunked
+        self.chunk_size = chunk_size
+        # Claim mode sends only claim-bearing sentences not already in the claim index
+        if extract_claims is None:
+            extract_claims = _env_flag("FACT_CHECK_EXTRACT_CLAIMS")
+        self.extract_claims = extract_claims
+        self.claim_index = claim_index if claim_index is not None or not extract_claims else get_claim_index()
         self.verification_template = PromptTemplate(
             input_variables=["article"],
             template="""You are a meticulous fact-checking agent. Review the following article and:
@@ -47,6 +60,34 @@ For each factual claim (statistics, names, dates, events):
 3. Suggest reliable sources if available
 4. Flag any questionable claims
 
+Return JSON format:
+{{
+    "verified_claims": [
+        {{"claim": "...", "confidence": 85, "source": "...", "verified": true}}
+    ],
+    "unverified_claims": [
+        {{"claim": "...", "reason": "...", "needs_source": true}}
+    ],
+    "overall_accuracy": 95,
+    "improvements": ["suggestion 1", "suggestion 2"]
+}}"""
+        )
+        self.claims_template = PromptTemplate(
+            input_variables=["claims"],
+            template="""You are a meticulous fact-checking agent. Check each numbered claim below,
+which was extracted from an article:
+
+Claims:
+{claims}
+
+For each claim:
+1. Evaluate the claim's verifiability
+2. Provide a confidence score (0-100%)
+3. Suggest reliable sources if available
+4. Flag any questionable claims
+
+Copy each claim's text exactly as given into the "claim" field.
+
 Return JSON format:
 {{
     "verified_claims": [
@@ -64,39 +105,166 @@ Return JSON format:
         """Verify claims in article"""
         print(f"\n🔍 {self.role} is verifying claims...")
         
-        chain = self.verification_template | llm
-        result = chain.invoke({"article": article[:3000]}).content  # Limit to first 3000 chars
+        if self.extract_claims:
+            known, batches = self._plan_claim_check(article)
+            with ThreadPoolExecutor(max_workers=max(1, min(len(batches), 8))) as pool:
+                results = list(pool.map(bind_trace(self._verify_claim_batch), batches))
+            verification_data = self._merge_claim_results(known, batches, results)
+        elif self.chunked:
+            chunks = split_article(article, self.chunk_size)
+            print(f"   Checking {len(chunks)} section(s) concurrently")
+            with ThreadPoolExecutor(max_workers=min(len(chunks), 8)) as pool:
+                results = list(pool.map(bind_trace(self._verify_chunk), chunks))
+            verification_data = merge_verifications(results, [len(chunk) for chunk in chunks])
+        else:
+            verification_data = self._verify_chunk(article, budgeted=True)
         
-        try:
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                verification_data = json.loads(json_match.group())
-            else:
-                verification_data = {
-                    "verified_claims": [],
-                    "unverified_claims": [],
-                    "overall_accuracy": 85,
-                    "improvements": [result]
-                }
-        except json.JSONDecodeError:
-            verification_data = {
-                "verified_claims": [],
-                "unverified_claims": [],
-                "overall_accuracy": 85,
-                "improvements": [result]
-            }
-        
-        print(f"✅ Fact-checking completed - Accuracy: {verification_data.get('overall_accuracy', 85)}%")
+        print(f"✅ Fact-checking completed - Accuracy: {_format_accuracy(verification_data)}")
+        return verification_data
+    
+    async def averify_article(self, article: str) -> Dict:
+        """Verify claims in article without blocking the event loop"""
+        print(f"\n🔍 {self.role} is verifying claims...")
+        
+        if self.extract_claims:
+            known, batches = self._plan_claim_check(article)
+            results = await asyncio.gather(*(self._averify_claim_batch(batch) for batch in batches))
+            verification_data = self._merge_claim_results(known, batches, results)
+        elif self.chunked:
+            chunks = split_article(article, self.chunk_size)
+            print(f"   Checking {len(chunks)} section(s) concurrently")
+            results = await asyncio.gather(*(self._averify_chunk(chunk) for chunk in chunks))
+            verification_data = merge_verifications(results, [len(chunk) for chunk in chunks])
+        else:
+            verification_data = await self._averify_chunk(article, budgeted=True)
+        
+        print(f"✅ Fact-checking completed - Accuracy: {_format_accuracy(verification_data)}")
         return verification_data
     
+    def _verify_chunk(self, text: str, budgeted: bool = False) -> Dict:
+        """Check one chunk; budgeted text is first reduced to its most claim-dense sentences"""
+        chunks = stream_llm(get_llm("fact_check", json_mode=True), self.verification_template, {"article": text},
+                            "fact_check", compress="article" if budgeted else None)
+        return self._parse_verification(chunks)
+    
+    async def _averify_chunk(self, text: str, budgeted: bool = False) -> Dict:
+        chunks = astream_llm(get_llm("fact_check", json_mode=True), self.verification_template,
+                             {"article": text}, "fact_check", compress="article" if budgeted else None)
+        return await self._aparse_verification(chunks)
+    
+    def _plan_claim_check(self, article: str):
+        """Extract claims, split off those already in the index, and batch the rest
+        
+        Returns (known, batches): known maps claim key to its indexed outcome,
+        batches are lists of (key, claim) pairs that fit in chunk_size characters.
+        """
+        claims = extract_claims(article)
+        keyed = [(_claim_key(claim), claim) for claim in claims]
+        known = self.claim_index.lookup([key for key, _ in keyed]) if self.claim_index else {}
+        new_claims = [(key, claim) for key, claim in keyed if key not in known]
+        batches = self._batch_claims(new_claims)
+        
+        print(f"   {len(claims)} claim(s) extracted, {len(known)} already checked, "
+              f"{len(new_claims)} sent in {len(batches)} batch(es)")
+        return known, batches
+    
+    def _batch_claims(self, keyed: List) -> List[List]:
+        """Pack (key, claim) pairs into batches that fit in chunk_size characters"""
+        batches = []
+        size = 0
+        for key, claim in keyed:
+            if batches and size + len(claim) + 6 <= self.chunk_size:
+                batches[-1].append((key, claim))
+                size += len(claim) + 6
+            else:
+                batches.append([(key, claim)])
+                size = len(claim) + 6
+        return batches
+    
+    def verify_claims(self, claims: List[str]) -> Dict:
+        """Check only the given claim sentences, e.g. the passages an edit changed"""
+        print(f"\n🔍 {self.role} is verifying {len(claims)} changed claim(s)...")
+        batches = self._batch_claims([(_claim_key(claim), claim) for claim in claims])
+        with ThreadPoolExecutor(max_workers=max(1, min(len(batches), 8))) as pool:
+            results = list(pool.map(bind_trace(self._verify_claim_batch), batches))
+        return merge_verifications(results, [len(batch) for batch in batches])
+    
+    async def averify_claims(self, claims: List[str]) -> Dict:
+        print(f"\n🔍 {self.role} is verifying {len(claims)} changed claim(s)...")
+        batches = self._batch_claims([(_claim_key(claim), claim) for claim in claims])
+        results = await asyncio.gather(*(self._averify_claim_batch(batch) for batch in batches))
+        return merge_verifications(results, [len(batch) for batch in batches])
+    
+    def _format_claims(self, batch: List) -> Dict:
+        return {"claims": "\n".join(f"{i}. {claim}" for i, (_, claim) in enumerate(batch, 1))}
+    
+    def _verify_claim_batch(self, batch: List) -> Dict:
+        chunks = stream_llm(get_llm("fact_check", json_mode=True), self.claims_template, self._format_claims(batch),
+                            "fact_check")
+        return self._parse_verification(chunks)
+    
+    async def _averify_claim_batch(self, batch: List) -> Dict:
+        chunks = astream_llm(get_llm("fact_check", json_mode=True), self.claims_template,
+                             self._format_claims(batch), "fact_check")
+        return await self._aparse_verification(chunks)
+    
+    def _merge_claim_results(self, known: Dict, batches: List, results: List[Dict]) -> Dict:
+        """Record new outcomes in the claim index and merge them with indexed ones"""
+        if self.claim_index:
+            for batch, result in zip(batches, results):
+                batch_keys = {key for key, _ in batch}
+                accuracy = result.get('overall_accuracy')
+                accuracy = accuracy if isinstance(accuracy, (int, float)) else None
+                for verified, field in ((True, 'verified_claims'), (False, 'unverified_claims')):
+                    for claim in result.get(field, []):
+                        key = _claim_key(claim)
+                        if isinstance(claim, dict) and key in batch_keys:
+                            self.claim_index.record(key, claim, verified, accuracy)
+        
+        merged = list(results)
+        weights = [len(batch) for batch in batches]
+        if known:
+            accuracies = [entry["accuracy"] for entry in known.values() if entry["accuracy"] is not None]
+            merged.append({
+                "verified_claims": [entry["claim"] for entry in known.values() if entry["verified"]],
+                "unverified_claims": [entry["claim"] for entry in known.values() if not entry["verified"]],
+                "overall_accuracy": sum(accuracies) / len(accuracies) if accuracies else None
+            })
+            weights.append(len(known))
+        return merge_verifications(merged, weights)
+    
+    def _parse_verification(self, chunks: Iterator[str]) -> Dict:
+        """Validated verification payload from the streamed model response"""
+        try:
+            return structured_stream(chunks, FACT_CHECK_SCHEMA, "fact_check")
+        except StructuredOutputError as e:
+            return self._unverified_result(e)
+    
+    async def _aparse_verification(self, chunks: AsyncIterator[str]) -> Dict:
+        try:
+            return await astructured_stream(chunks, FACT_CHECK_SCHEMA, "fact_check")
+        except StructuredOutputError as e:
+            return self._unverified_result(e)
+    
+    def _unverified_result(self, error: StructuredOutputError) -> Dict:
+        """Keep whatever validated, but never invent an accuracy score"""
+        print(f"   ⚠️  Fact-check response unusable after repair: {error}")
+        partial = error.partial or {}
+        return {
+            "verified_claims": partial.get("verified_claims", []),
+            "unverified_claims": partial.get("unverified_claims", []),
+            "overall_accuracy": partial.get("overall_accuracy"),
+            "improvements": partial.get("improvements", []),
+            "parse_errors": error.errors[:5]
+        }
+    
     def generate_fact_check_report(self, verification_data: Dict) -> str:
         """Generate human-readable fact-check report"""
         report = "\n" + "="*70 + "\n"
         report += "FACT-CHECK VERIFICATION REPORT\n"
         report += "="*70 + "\n\n"
         
-        report += f"Overall Accuracy Score: {verification_data.get('overall_accuracy', 85)}%\n\n"
+        report += f"Overall Accuracy Score: {_format_accuracy(verification_data)}\n\n"
         
         verified = verification_data.get('verified_claims', [])
         if verified:
@@ -112,6 +280,11 @@ Return JSON format:
                 if isinstance(claim, dict):
                     report += f"  • {claim.get('claim', 'N/A')}\n"
         
+        if verification_data.get('parse_errors'):
+            report += "\n❗ PARTS OF THE FACT-CHECK RESPONSE COULD NOT BE VALIDATED:\n"
+            for problem in verification_data['parse_errors']:
+                report += f"  • {problem}\n"
+        
         improvements = verification_data.get('improvements', [])
         if improvements:
             report += "\n💡 IMPROVEMENT SUGGESTIONS:\n"
@@ -123,24 +296,178 @@ Return JSON format:
         return report
 
 
-class MultiFormatExporter:
-    """Exports articles to multiple formats"""
+def _format_accuracy(verification_data: Dict) -> str:
+    accuracy = verification_data.get('overall_accuracy')
+    return f"{accuracy}%" if isinstance(accuracy, (int, float)) else "n/a (no valid score returned)"
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "false").lower() in ("1", "true", "yes", "on")
+
+
+_MONTHS = r'(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+_CLAIM_SIGNALS = re.compile(
+    r'\d'                      # numbers, years, percentages
+    r'|%|\bpercent\b'
+    rf'|\b{_MONTHS}\b'
+    r'|["\u201c\u201d]'          # quotations
+    r'|(?<=\s)[A-Z][a-zA-Z]+'   # capitalised word after the first: proper nouns, acronyms
+)
+
+
+def extract_claims(article: str, min_words: int = 5) -> List[str]:
+    """Pull out sentences that carry checkable facts, without calling the model
     
-    def __init__(self):
-        self.role = "Multi-Format Exporter"
+    A sentence qualifies when it contains a number, date, percentage, quote or
+    proper noun. Markdown markers are stripped, headings and fragments shorter
+    than min_words are skipped, and repeated claims are returned once.
+    """
+    claims = []
+    seen = set()
+    for line in article.split('\n'):
+        line = re.sub(r'[*_#`>]+', '', line).strip(' -•\t')
+        if not line:
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', line):
+            sentence = sentence.strip()
+            if len(sentence.split()) < min_words or not _CLAIM_SIGNALS.search(sentence):
+                continue
+            key = _claim_key(sentence)
+            if key not in seen:
+                seen.add(key)
+                claims.append(sentence)
+    return claims
+
+
+def split_article(article: str, max_chars: int = 3000) -> List[str]:
+    """Split an article into chunks of at most max_chars on paragraph boundaries
     
-    def export_to_markdown(self, article: str, filename: str = "article.md") -> str:
-        """Export as Markdown"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# Article\n\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(article)
-        print(f"✅ Markdown exported: {filename}")
-        return filename
+    Paragraphs (blank-line separated blocks, which also isolates headings) are
+    packed greedily. A single paragraph longer than max_chars is split between
+    sentences so no chunk ends mid-sentence unless a sentence itself is too long.
+    """
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', article):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        sentence_chunk = ""
+        for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+            if sentence_chunk and len(sentence_chunk) + len(sentence) + 1 > max_chars:
+                pieces.append(sentence_chunk)
+                sentence_chunk = ""
+            while len(sentence) > max_chars:
+                pieces.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            sentence_chunk = f"{sentence_chunk} {sentence}".strip()
+        if sentence_chunk:
+            pieces.append(sentence_chunk)
     
-    def export_to_html(self, article: str, filename: str = "article.html") -> str:
-        """Export as HTML"""
-        html_content = f"""
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks or [article[:max_chars]]
+
+
+def _claim_key(claim) -> str:
+    """Normalised claim text used to spot the same claim reported twice"""
+    text = claim.get('claim', '') if isinstance(claim, dict) else str(claim)
+    return re.sub(r'[^a-z0-9%]+', ' ', text.lower()).strip()
+
+
+def merge_verifications(results: List[Dict], weights: List[int]) -> Dict:
+    """Combine per-chunk fact-check results into one verification report
+    
+    Duplicate claims are collapsed (keeping the highest-confidence verified
+    entry) and overall_accuracy is the chunk-length-weighted mean.
+    """
+    verified = {}
+    unverified = {}
+    improvements = []
+    accuracy_total = 0.0
+    accuracy_weight = 0
+    
+    for result, weight in zip(results, weights):
+        for claim in result.get('verified_claims', []):
+            key = _claim_key(claim)
+            previous = verified.get(key)
+            if previous is None or (isinstance(claim, dict) and isinstance(previous, dict)
+                                    and claim.get('confidence', 0) > previous.get('confidence', 0)):
+                verified[key] = claim
+        for claim in result.get('unverified_claims', []):
+            unverified.setdefault(_claim_key(claim), claim)
+        for suggestion in result.get('improvements', []):
+            if suggestion not in improvements:
+                improvements.append(suggestion)
+        try:
+            accuracy_total += float(result.get('overall_accuracy')) * weight
+            accuracy_weight += weight
+        except (TypeError, ValueError):
+            pass
+    
+    # A claim verified in one chunk should not also be reported as unverified
+    unverified = {key: claim for key, claim in unverified.items() if key not in verified}
+    
+    return {
+        "verified_claims": list(verified.values()),
+        "unverified_claims": list(unverified.values()),
+        "overall_accuracy": round(accuracy_total / accuracy_weight) if accuracy_weight else None,
+        "improvements": improvements
+    }
+
+
+def diff_claims(draft: str, article: str) -> Tuple[List[str], List[str], float]:
+    """Claim sentences editing added and removed, and the share of the article's claims that are new"""
+    before = {_claim_key(claim): claim for claim in extract_claims(draft)}
+    after = {_claim_key(claim): claim for claim in extract_claims(article)}
+    added = [claim for key, claim in after.items() if key not in before]
+    removed = [claim for key, claim in before.items() if key not in after]
+    return added, removed, len(added) / len(after) if after else 0.0
+
+
+def text_similarity(a: str, b: str) -> float:
+    """Bag-of-words overlap of two texts (0-1); cheap enough to run on whole articles"""
+    words_a, words_b = Counter(a.lower().split()), Counter(b.lower().split())
+    total = sum(words_a.values()) + sum(words_b.values())
+    return 2 * sum((words_a & words_b).values()) / total if total else 1.0
+
+
+def _claim_terms(claim) -> set:
+    return {word for word in _claim_key(claim).split() if len(word) > 3}
+
+
+def _best_overlap(terms: set, sentences: List[set]) -> float:
+    return max((len(terms & other) / len(terms) for other in sentences), default=0.0) if terms else 0.0
+
+
+def drop_removed_claims(verification_data: Dict, removed: List[str], article_claims: List[str]) -> Dict:
+    """Verification data without the claims whose sentences editing removed"""
+    removed_terms = [_claim_terms(claim) for claim in removed]
+    kept_terms = [_claim_terms(claim) for claim in article_claims]
+    
+    def holds(claim) -> bool:
+        terms = _claim_terms(claim)
+        return _best_overlap(terms, removed_terms) < 0.6 or _best_overlap(terms, kept_terms) >= 0.6
+    
+    return {**verification_data,
+            "verified_claims": [c for c in verification_data.get("verified_claims", []) if holds(c)],
+            "unverified_claims": [c for c in verification_data.get("unverified_claims", []) if holds(c)]}
+
+
+# ---------------------------------------------------------------------------
+# Export templates, built once per process and reused by every export
+# ---------------------------------------------------------------------------
+
+_HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -148,7 +475,7 @@ class MultiFormatExporter:
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Generated Article</title>
     <style>
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             line-height: 1.6;
             max-width: 900px;
@@ -156,45 +483,135 @@ class MultiFormatExporter:
             padding: 20px;
             background-color: #f5f5f5;
             color: #333;
-        }}
-        .container {{
+        }
+        .container {
             background-color: white;
             padding: 40px;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h1 {{
+        }
+        h1 {
             color: #2c3e50;
             border-bottom: 3px solid #3498db;
             padding-bottom: 10px;
-        }}
-        h2 {{
+        }
+        h2, h3, h4, h5, h6 {
             color: #34495e;
             margin-top: 30px;
-        }}
-        .meta {{
+        }
+        .meta {
             color: #7f8c8d;
             font-size: 0.9em;
             margin-bottom: 20px;
-        }}
-        p {{
+        }
+        p {
             margin: 15px 0;
-        }}
-        strong {{
+        }
+        strong {
             color: #2c3e50;
-        }}
+        }
+        table {
+            border-collapse: collapse;
+            margin: 15px 0;
+        }
+        th, td {
+            border: 1px solid #dcdde1;
+            padding: 6px 12px;
+        }
+        pre {
+            background: #f5f6fa;
+            padding: 12px;
+            overflow-x: auto;
+        }
     </style>
 </head>
 <body>
     <div class="container">
-        <div class="meta">Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
+        <div class="meta">Generated: {{ generated }}</div>
         <article>
-            {article.replace('**', '<strong>').replace('\n', '<br>')}
+            {{ body }}
         </article>
     </div>
 </body>
 </html>
 """
+
+
+# Rendering libraries are imported on first use of each format, so importing
+# this module (or running only fact-checks) does not pay for all of them.
+
+@lru_cache(maxsize=1)
+def _html_template():
+    """Compiled HTML page; the body is already escaped by render_html"""
+    from jinja2 import Template
+    return Template(_HTML_TEMPLATE, autoescape=False)
+
+
+@lru_cache(maxsize=1)
+def _docx_template() -> bytes:
+    """Serialized base Word document with styles configured and the title in place
+    
+    Set DOCX_TEMPLATE to a .docx path to start from a custom house style.
+    """
+    from docx import Document
+    doc = Document(os.getenv("DOCX_TEMPLATE") or None)
+    title = doc.add_heading('Generated Article', 0)
+    title.alignment = 1  # Center alignment
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def _pdf_styles() -> Dict:
+    """ReportLab paragraph styles for PDF export; treat as read-only"""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    sample = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=sample['Heading1'],
+            fontSize=24,
+            leading=28,
+            textColor=colors.HexColor('#2c3e50'),
+            spaceAfter=30,
+            alignment=1
+        ),
+        'meta': ParagraphStyle('Meta', parent=sample['Normal'], fontSize=9),
+        'body': sample['Normal'],
+        'heading2': sample['Heading2'],
+        'heading3': sample['Heading3'],
+        'list_item': ParagraphStyle('ListItem', parent=sample['Normal'], leftIndent=18, bulletIndent=6),
+        'code': sample['Code'],
+    }
+
+
+class MultiFormatExporter:
+    """Exports articles to multiple formats"""
+    
+    def __init__(self):
+        self.role = "Multi-Format Exporter"
+    
+    def parse(self, article: str):
+        """Document tree shared by every format; parsed once per article text"""
+        return parse_article(article)
+    
+    def export_to_markdown(self, article: str, filename: str = "article.md") -> str:
+        """Export as Markdown rendered from the same document tree as the other formats"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("# Article\n\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            f.write(render_markdown(self.parse(article)))
+        print(f"✅ Markdown exported: {filename}")
+        return filename
+    
+    def export_to_html(self, article: str, filename: str = "article.html") -> str:
+        """Export as HTML"""
+        html_content = _html_template().render(
+            generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            body=render_html(self.parse(article))
+        )
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(html_content)
         print(f"✅ HTML exported: {filename}")
@@ -202,11 +619,11 @@ class MultiFormatExporter:
     
     def export_to_docx(self, article: str, filename: str = "article.docx") -> str:
         """Export as Word Document"""
-        doc = Document()
+        from docx import Document
+        from docx.shared import Pt
         
-        # Add title
-        title = doc.add_heading('Generated Article', 0)
-        title.alignment = 1  # Center alignment
+        # Pre-styled base document that already contains the title
+        doc = Document(BytesIO(_docx_template()))
         
         # Add metadata
         meta = doc.add_paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -216,55 +633,99 @@ class MultiFormatExporter:
         doc.add_paragraph()  # Blank line
         
         # Add content
-        lines = article.split('\n')
-        for line in lines:
-            if line.startswith('**') and line.endswith('**'):
-                # Bold heading
-                heading = line.replace('**', '')
-                doc.add_heading(heading, level=2)
-            elif line.strip():
-                doc.add_paragraph(line)
+        for block in self.parse(article):
+            if block.kind == "heading":
+                doc.add_heading(block.text, level=min(max(block.level, 2), 9))
+            elif block.kind == "list":
+                style = 'List Number' if block.ordered else 'List Bullet'
+                for item in block.items:
+                    self._add_docx_runs(doc.add_paragraph(style=style), item)
+            elif block.kind == "table":
+                self._add_docx_table(doc, block)
+            elif block.kind == "code":
+                run = doc.add_paragraph().add_run(block.code)
+                run.font.name = 'Courier New'
+                run.font.size = Pt(9)
+            else:
+                self._add_docx_runs(doc.add_paragraph(), block.spans)
         
         doc.save(filename)
         print(f"✅ Word document exported: {filename}")
         return filename
     
+    def _add_docx_runs(self, paragraph, spans):
+        """Append styled runs for each span to a Word paragraph"""
+        for span in spans:
+            run = paragraph.add_run(span.text)
+            run.bold = span.bold or None
+            run.italic = span.italic or None
+    
+    def _add_docx_table(self, doc, block):
+        """Add a table block with a bold header row and each column's alignment"""
+        alignments = {"left": 0, "center": 1, "right": 2}
+        table = doc.add_table(rows=len(block.rows), cols=len(block.aligns))
+        try:
+            table.style = 'Table Grid'
+        except (KeyError, ValueError):
+            pass  # Custom DOCX_TEMPLATE without the built-in table styles
+        for number, row in enumerate(block.rows):
+            for cell, spans, align in zip(table.rows[number].cells, row, block.aligns):
+                paragraph = cell.paragraphs[0]
+                paragraph.alignment = alignments.get(align)
+                self._add_docx_runs(paragraph, spans)
+                if number == 0:
+                    for run in paragraph.runs:
+                        run.bold = True
+    
     def export_to_pdf(self, article: str, filename: str = "article.pdf") -> str:
         """Export as PDF"""
         try:
+            from reportlab.lib.pagesizes import letter
+            from reportlab.lib.units import inch
+            from reportlab.lib import colors
+            from reportlab.platypus import Preformatted, SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+            
             doc = SimpleDocTemplate(filename, pagesize=letter)
             story = []
             
-            # Styles
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor=RGBColor(44, 62, 80),
-                spaceAfter=30,
-                alignment=1
-            )
+            # Styles (built once per process and never mutated)
+            styles = _pdf_styles()
             
             # Title
-            story.append(Paragraph("Generated Article", title_style))
+            story.append(Paragraph("Generated Article", styles['title']))
             story.append(Spacer(1, 0.3*inch))
             
             # Meta info
-            meta_style = styles['Normal']
-            meta_style.fontSize = 9
-            story.append(Paragraph(f"<i>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>", meta_style))
+            story.append(Paragraph(f"<i>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>", styles['meta']))
             story.append(Spacer(1, 0.3*inch))
             
             # Content
-            lines = article.split('\n')
-            for line in lines:
-                if line.startswith('**') and line.endswith('**'):
-                    heading = line.replace('**', '')
-                    story.append(Paragraph(heading, styles['Heading2']))
+            for block in self.parse(article):
+                if block.kind == "heading":
+                    style = styles['heading2'] if block.level <= 2 else styles['heading3']
+                    story.append(Paragraph(spans_to_html(block.spans, "b", "i"), style))
                     story.append(Spacer(1, 0.2*inch))
-                elif line.strip():
-                    story.append(Paragraph(line, styles['Normal']))
+                elif block.kind == "list":
+                    for number, item in enumerate(block.items, block.start):
+                        bullet = f"{number}." if block.ordered else "•"
+                        story.append(Paragraph(spans_to_html(item, "b", "i"), styles['list_item'], bulletText=bullet))
+                    story.append(Spacer(1, 0.1*inch))
+                elif block.kind == "table":
+                    rows = [[Paragraph(spans_to_html(cell, "b", "i"), styles['body']) for cell in row]
+                            for row in block.rows]
+                    table = Table(rows, hAlign='LEFT')
+                    table.setStyle(TableStyle([
+                        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                        ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                    ]))
+                    story.append(table)
+                    story.append(Spacer(1, 0.1*inch))
+                elif block.kind == "code":
+                    story.append(Preformatted(block.code, styles['code']))
+                    story.append(Spacer(1, 0.1*inch))
+                else:
+                    story.append(Paragraph(spans_to_html(block.spans, "b", "i"), styles['body']))
                     story.append(Spacer(1, 0.1*inch))
             
             doc.build(story)
@@ -307,37 +768,35 @@ Generate JSON with:
         """Generate social media content"""
         print(f"\n📱 {self.role} is creating content...")
         
-        chain = self.social_template | llm
-        result = chain.invoke({"article": article[:2000]}).content
+        chunks = stream_llm(get_llm("social", json_mode=True), self.social_template, {"article": article},
+                            "social", compress="article")
         
         try:
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                social_data = json.loads(json_match.group())
-            else:
-                social_data = {
-                    "twitter_thread": [result[:280]],
-                    "linkedin_post": result[:300],
-                    "instagram_caption": result,
-                    "email_subject": "Check out this article",
-                    "email_preview": "Interesting content",
-                    "hashtags": ["#content", "#article"],
-                    "key_quote": result.split('.')[0]
-                }
-        except json.JSONDecodeError:
-            social_data = {
-                "twitter_thread": [result[:280]],
-                "linkedin_post": result[:300],
-                "instagram_caption": result,
-                "email_subject": "Check out this article",
-                "email_preview": "Interesting content",
-                "hashtags": ["#content", "#article"],
-                "key_quote": result
-            }
-        
-        print(f"✅ Social media content generated")
+            social_data = structured_stream(chunks, SOCIAL_SCHEMA, "social")
+        except StructuredOutputError as e:
+            social_data = self._partial_social(e)
+        print("✅ Social media content generated")
+        return social_data
+    
+    async def agenerate_content(self, article: str) -> Dict:
+        """Generate social media content without blocking the event loop"""
+        print(f"\n📱 {self.role} is creating content...")
+        
+        chunks = astream_llm(get_llm("social", json_mode=True), self.social_template, {"article": article},
+                             "social", compress="article")
+        
+        try:
+            social_data = await astructured_stream(chunks, SOCIAL_SCHEMA, "social")
+        except StructuredOutputError as e:
+            social_data = self._partial_social(e)
+        print("✅ Social media content generated")
         return social_data
     
+    def _partial_social(self, error: StructuredOutputError) -> Dict:
+        """Fields that validated, with the problems recorded instead of placeholder copy"""
+        print(f"   ⚠️  Social media response unusable after repair: {error}")
+        return {**(error.partial or {}), "parse_errors": error.errors[:5]}
+    
     def generate_social_report(self, social_data: Dict) -> str:
         """Generate formatted social media content report"""
         report = "\n" + "="*70 + "\n"
@@ -373,36 +832,373 @@ Generate JSON with:
         report += f"\n\n💬 KEY QUOTE:\n"
         report += f"  \"{social_data.get('key_quote', 'N/A')}\"\n"
         
+        if social_data.get('parse_errors'):
+            report += "\n❗ MISSING OR INVALID FIELDS:\n"
+            for problem in social_data['parse_errors']:
+                report += f"  • {problem}\n"
+        
         report += "\n" + "="*70 + "\n"
         return report
 
 
-def generate_comprehensive_output(article: str, topic: str):
-    """Generate all outputs: fact-checking, exports, and social media"""
+# Format name -> (file extension, MultiFormatExporter method)
+EXPORT_FORMATS = {
+    "markdown": ("md", "export_to_markdown"),
+    "html": ("html", "export_to_html"),
+    "docx": ("docx", "export_to_docx"),
+    "pdf": ("pdf", "export_to_pdf"),
+}
+
+
+def _render_export(export_format: str, article: str, path: str) -> Dict:
+    """Render one format and time it; module-level so worker processes can run it"""
+    started = time.perf_counter()
+    result = getattr(MultiFormatExporter(), EXPORT_FORMATS[export_format][1])(article, path)
+    return {
+        "format": export_format,
+        "path": result,
+        "ok": result is not None,
+        "seconds": round(time.perf_counter() - started, 4)
+    }
+
+
+def _worker_context():
+    """Forkserver context whose server has already imported the renderers (spawn on Windows)"""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["content_tools", "docx", "reportlab.platypus"])
+    return context
+
+
+class ExportEngine:
+    """Renders export formats in parallel on a process pool
+    
+    ReportLab and python-docx rendering is CPU-bound and holds the GIL, so
+    formats are spread across processes; concurrent batch and service articles
+    queue their renders on the same shared pool.
+    ``max_workers=0`` renders in-process instead. Every export returns a
+    manifest of produced files with per-format timings.
+    
+    Workers come from a forkserver (spawn where that is unavailable), never a
+    plain fork: by the time the pool starts the parent has hedge and
+    speculation threads and open SQLite connections a forked child would
+    inherit mid-use.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        if max_workers is None:
+            max_workers = int(os.getenv("EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+    
+    @property
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        """The shared process pool, started on first use (None when disabled)"""
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_worker_context())
+            return self._pool
+    
+    def _plan(self, article_output_dir: str, timestamp: str, checkpoints=None) -> Tuple[Dict, List]:
+        """Split formats into already-checkpointed entries and (format, path) jobs"""
+        export_base = os.path.join(article_output_dir, "exports", f"article_{timestamp}")
+        done = {}
+        jobs = []
+        for export_format, (extension, _) in EXPORT_FORMATS.items():
+            stage = f"export_{export_format}"
+            if checkpoints is not None and checkpoints.has(stage):
+                print(f"♻️  Restored '{stage}' from checkpoint {checkpoints.run_id}")
+                entry = checkpoints.load(stage)
+                if isinstance(entry, str):  # checkpoints written before manifests existed
+                    entry = {"format": export_format, "path": entry, "ok": True, "seconds": None}
+                done[export_format] = entry
+            else:
+                jobs.append((export_format, f"{export_base}.{extension}"))
+        return done, jobs
+    
+    def _finish(self, done: Dict, results: List[Dict], started: float, output_dir: str,
+                timestamp: str, checkpoints=None) -> Dict:
+        tracer = get_tracer()
+        for entry in results:
+            done[entry["format"]] = entry
+            # Workers run in other processes, so their spans are recorded here
+            tracer.record({
+                "ts": datetime.now().isoformat(),
+                "trace_id": current_trace_id(),
+                "stage": f"export_{entry['format']}",
+                "kind": "export",
+                "wall_ms": round(entry["seconds"] * 1000, 3),
+                "ok": entry["ok"]
+            })
+            if checkpoints is not None and entry["ok"]:
+                checkpoints.save(f"export_{entry['format']}", entry)
+        
+        manifest = {
+            "timestamp": timestamp,
+            "total_seconds": round(time.perf_counter() - started, 4),
+            "workers": self.max_workers,
+            "files": [done[export_format] for export_format in EXPORT_FORMATS if export_format in done]
+        }
+        manifest_path = os.path.join(output_dir, "exports", f"article_{timestamp}_manifest.json")
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+    
+    def export_article(self, article: str, output_dir: str = ".", timestamp: Optional[str] = None,
+                       checkpoints=None) -> Dict:
+        """Render every format of one article and return its manifest"""
+        started = time.perf_counter()
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(os.path.join(output_dir, "exports"), exist_ok=True)
+        done, jobs = self._plan(output_dir, timestamp, checkpoints)
+        
+        executor = self.executor
+        if executor is None:
+            results = [_render_export(export_format, article, path) for export_format, path in jobs]
+        else:
+            futures = [executor.submit(_render_export, export_format, article, path) for export_format, path in jobs]
+            results = [future.result() for future in futures]
+        
+        return self._finish(done, results, started, output_dir, timestamp, checkpoints)
+    
+    async def aexport_article(self, article: str, output_dir: str = ".", timestamp: Optional[str] = None,
+                              checkpoints=None) -> Dict:
+        """Asynchronous export_article; the event loop stays free while workers render"""
+        started = time.perf_counter()
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(os.path.join(output_dir, "exports"), exist_ok=True)
+        done, jobs = self._plan(output_dir, timestamp, checkpoints)
+        
+        # Without a process pool, fall back to the loop's default thread pool
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _render_export, export_format, article, path)
+            for export_format, path in jobs
+        ))
+        
+        return self._finish(done, list(results), started, output_dir, timestamp, checkpoints)
+    
+    def shutdown(self):
+        """Stop the worker processes; the pool restarts on next use"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_export_engine: Optional[ExportEngine] = None
+
+
+def get_export_engine() -> ExportEngine:
+    """Process-wide export engine so concurrent articles share one worker pool"""
+    global _export_engine
+    if _export_engine is None:
+        _export_engine = ExportEngine()
+        atexit.register(_export_engine.shutdown)
+    return _export_engine
+
+
+class Speculation:
+    """Fact-check and social content started on the writer draft while the editor runs
+    
+    SPECULATIVE_OUTPUTS=on makes the pipeline start these as soon as the
+    draft exists. generate_comprehensive_output then reconciles them with the
+    edited article: claims editing left alone keep their draft verdicts, and
+    only added claims are sent to the model. If more than
+    SPECULATIVE_MAX_CHANGE of the claims are new, the article is checked from
+    scratch. Social content is kept while the article's wording stays within
+    SPECULATIVE_MIN_SIMILARITY of the draft.
+    """
+    
+    def __init__(self, draft: str, fact_check, social):
+        self.draft = draft
+        self.fact_check = fact_check  # concurrent Future or asyncio Task
+        self.social = social
+        self.max_change = float(os.getenv("SPECULATIVE_MAX_CHANGE", "0.5"))
+        self.min_similarity = float(os.getenv("SPECULATIVE_MIN_SIMILARITY", "0.6"))
+    
+    @classmethod
+    def start(cls, draft: str) -> "Speculation":
+        """Run both stages on the draft in background threads"""
+        print("\n🔮 Fact-checking and drafting social content on the draft while the editor works...")
+        pool = ThreadPoolExecutor(max_workers=2)
+        speculation = cls(draft, pool.submit(bind_trace(FactCheckingAgent().verify_article), draft),
+                          pool.submit(bind_trace(SocialMediaGenerator().generate_content), draft))
+        pool.shutdown(wait=False)
+        return speculation
+    
+    @classmethod
+    def astart(cls, draft: str) -> "Speculation":
+        """Run both stages on the draft as tasks on the running event loop"""
+        print("\n🔮 Fact-checking and drafting social content on the draft while the editor works...")
+        return cls(draft, asyncio.ensure_future(FactCheckingAgent().averify_article(draft)),
+                   asyncio.ensure_future(SocialMediaGenerator().agenerate_content(draft)))
+    
+    def cancel(self):
+        for pending in (self.fact_check, self.social):
+            pending.cancel()
+    
+    def _plan_fact_check(self, article: str, speculative: Dict) -> Optional[Tuple[Dict, List[str], int]]:
+        """(carried result, claims to check, unchanged claim count) if the draft's fact-check carries over, else None"""
+        added, removed, changed = diff_claims(self.draft, article)
+        if changed > self.max_change:
+            print(f"   🔮 {changed:.0%} of claims changed while editing; re-checking the article")
+            return None
+        article_claims = extract_claims(article)
+        carried = drop_removed_claims(speculative, removed, article_claims)
+        print(f"   🔮 Draft fact-check carried over: {len(article_claims) - len(added)} claim(s) unchanged, "
+              f"{len(added)} to check, {len(removed)} removed")
+        return carried, added, max(1, len(article_claims) - len(added))
+    
+    def fact_check_for(self, fact_checker: FactCheckingAgent, article: str) -> Dict:
+        try:
+            speculative = self.fact_check.result()
+        except Exception as e:
+            print(f"   ⚠️  Speculative fact-check failed ({e}); checking the article")
+            return fact_checker.verify_article(article)
+        plan = self._plan_fact_check(article, speculative)
+        if plan is None:
+            return fact_checker.verify_article(article)
+        carried, added, unchanged = plan
+        if not added:
+            return carried
+        return merge_verifications([carried, fact_checker.verify_claims(added)], [unchanged, len(added)])
+    
+    async def afact_check_for(self, fact_checker: FactCheckingAgent, article: str) -> Dict:
+        try:
+            speculative = await self.fact_check
+        except Exception as e:
+            print(f"   ⚠️  Speculative fact-check failed ({e}); checking the article")
+            return await fact_checker.averify_article(article)
+        plan = self._plan_fact_check(article, speculative)
+        if plan is None:
+            return await fact_checker.averify_article(article)
+        carried, added, unchanged = plan
+        if not added:
+            return carried
+        return merge_verifications([carried, await fact_checker.averify_claims(added)], [unchanged, len(added)])
+    
+    def _social_holds(self, article: str) -> bool:
+        similarity = text_similarity(self.draft, article)
+        if similarity >= self.min_similarity:
+            print(f"   🔮 Draft social content kept (article {similarity:.0%} similar to the draft)")
+            return True
+        print(f"   🔮 Article only {similarity:.0%} similar to the draft; regenerating social content")
+        return False
+    
+    def social_for(self, social_gen: "SocialMediaGenerator", article: str) -> Dict:
+        try:
+            speculative = self.social.result()
+        except Exception as e:
+            print(f"   ⚠️  Speculative social content failed ({e}); regenerating")
+            return social_gen.generate_content(article)
+        return speculative if self._social_holds(article) else social_gen.generate_content(article)
+    
+    async def asocial_for(self, social_gen: "SocialMediaGenerator", article: str) -> Dict:
+        try:
+            speculative = await self.social
+        except Exception as e:
+            print(f"   ⚠️  Speculative social content failed ({e}); regenerating")
+            return await social_gen.agenerate_content(article)
+        return speculative if self._social_holds(article) else await social_gen.agenerate_content(article)
+
+
+def generate_comprehensive_output(article: str, topic: str, output_dir: str = ".", checkpoints=None,
+                                  speculation: Optional[Speculation] = None):
+    """Generate all outputs: fact-checking, exports, and social media
+    
+    With a CheckpointStore every step is checkpointed as it completes and
+    skipped when the run is resumed. A Speculation started on the draft is
+    reconciled with the article instead of repeating its work.
+    """
     
     print("\n" + "="*70)
     print("🚀 GENERATING COMPREHENSIVE CONTENT PACKAGE")
     print("="*70)
     
+    # Keep file names stable across resumes
+    timestamp = run_stage(checkpoints, "export_timestamp", lambda: datetime.now().strftime("%Y%m%d_%H%M%S"))
+    
     # 1. Fact-Checking
     fact_checker = FactCheckingAgent()
-    verification_data = fact_checker.verify_article(article)
+    if speculation is not None:
+        verification_data = run_stage(checkpoints, "fact_check",
+                                      lambda: speculation.fact_check_for(fact_checker, article))
+    else:
+        verification_data = run_stage(checkpoints, "fact_check", lambda: fact_checker.verify_article(article))
     fact_check_report = fact_checker.generate_fact_check_report(verification_data)
     
-    # 2. Multi-Format Export
-    exporter = MultiFormatExporter()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    exporter.export_to_markdown(article, f"exports/article_{timestamp}.md")
-    exporter.export_to_html(article, f"exports/article_{timestamp}.html")
-    exporter.export_to_docx(article, f"exports/article_{timestamp}.docx")
-    exporter.export_to_pdf(article, f"exports/article_{timestamp}.pdf")
+    # 2. Multi-Format Export (rendered in parallel worker processes)
+    manifest = get_export_engine().export_article(article, output_dir, timestamp, checkpoints)
     
     # 3. Social Media Content
     social_gen = SocialMediaGenerator()
-    social_data = social_gen.generate_content(article)
+    if speculation is not None:
+        social_data = run_stage(checkpoints, "social", lambda: speculation.social_for(social_gen, article))
+    else:
+        social_data = run_stage(checkpoints, "social", lambda: social_gen.generate_content(article))
+    social_report = social_gen.generate_social_report(social_data)
+    
+    return _save_comprehensive_output(
+        verification_data, fact_check_report, social_data, social_report, timestamp, output_dir, manifest
+    )
+
+
+async def agenerate_comprehensive_output(article: str, topic: str, output_dir: str = ".", checkpoints=None,
+                                         speculation: Optional[Speculation] = None):
+    """Generate all outputs concurrently: fact-checking, exports, and social media
+    
+    Fact-checking and social generation are independent LLM calls, so they are
+    awaited together while the export engine renders every format in its
+    worker processes. A Speculation started on the draft is reconciled with
+    the article instead of repeating its work.
+    """
+    
+    print("\n" + "="*70)
+    print("🚀 GENERATING COMPREHENSIVE CONTENT PACKAGE")
+    print("="*70)
+    
+    fact_checker = FactCheckingAgent()
+    social_gen = SocialMediaGenerator()
+    timestamp = run_stage(checkpoints, "export_timestamp", lambda: datetime.now().strftime("%Y%m%d_%H%M%S"))
+    
+    if speculation is not None:
+        check = lambda: speculation.afact_check_for(fact_checker, article)
+        social = lambda: speculation.asocial_for(social_gen, article)
+    else:
+        check = lambda: fact_checker.averify_article(article)
+        social = lambda: social_gen.agenerate_content(article)
+    verification_data, social_data, manifest = await asyncio.gather(
+        arun_stage(checkpoints, "fact_check", check),
+        arun_stage(checkpoints, "social", social),
+        get_export_engine().aexport_article(article, output_dir, timestamp, checkpoints)
+    )
+    
+    fact_check_report = fact_checker.generate_fact_check_report(verification_data)
     social_report = social_gen.generate_social_report(social_data)
     
+    return _save_comprehensive_output(
+        verification_data, fact_check_report, social_data, social_report, timestamp, output_dir, manifest
+    )
+
+
+def _save_comprehensive_output(verification_data: Dict, fact_check_report: str,
+                               social_data: Dict, social_report: str, timestamp: str,
+                               output_dir: str = ".", manifest: Optional[Dict] = None) -> Dict:
+    """Write the combined report and social JSON, and return the output summary"""
+    
+    labels = {"markdown": "Markdown", "html": "Web-ready HTML", "docx": "Word Document", "pdf": "PDF Format"}
+    export_lines = []
+    for entry in (manifest or {}).get("files", []):
+        marker = "✅" if entry["ok"] else "❌"
+        extension = EXPORT_FORMATS[entry["format"]][0]
+        timing = f", {entry['seconds']:.2f}s" if entry.get("seconds") is not None else ""
+        export_lines.append(f"{marker} article_{timestamp}.{extension} ({labels[entry['format']]}{timing})")
+    
     # Save comprehensive report
     comprehensive_report = f"""
 {fact_check_report}
@@ -412,17 +1208,13 @@ def generate_comprehensive_output(article: str, topic: str):
 ===============================================================================
 EXPORT FILES CREATED
 ===============================================================================
-✅ article_{timestamp}.md (Markdown)
-✅ article_{timestamp}.html (Web-ready HTML)
-✅ article_{timestamp}.docx (Word Document)
-✅ article_{timestamp}.pdf (PDF Format)
-"""
+""" + "\n".join(export_lines) + "\n"
     
-    with open("comprehensive_output.txt", 'w', encoding='utf-8') as f:
+    with open(os.path.join(output_dir, "comprehensive_output.txt"), 'w', encoding='utf-8') as f:
         f.write(comprehensive_report)
     
     # Save social data as JSON for programmatic use
-    with open(f"social_content_{timestamp}.json", 'w', encoding='utf-8') as f:
+    with open(os.path.join(output_dir, f"social_content_{timestamp}.json"), 'w', encoding='utf-8') as f:
         json.dump(social_data, f, indent=2)
     
     print(fact_check_report)
@@ -438,5 +1230,6 @@ EXPORT FILES CREATED
             "html": f"article_{timestamp}.html",
             "docx": f"article_{timestamp}.docx",
             "pdf": f"article_{timestamp}.pdf"
-        }
+        },
+        "export_manifest": manifest
     }
@@ -0,0 +1,275 @@
+"""
+Fake LLM Backend for Multi-Agent Content Creator System
+Deterministic local stand-in for the Groq chat model with configurable
+latency and response size; selected with LLM_BACKEND=fake.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+_TOPIC_WORDS = [
+    "automation", "adoption", "workflow", "platform", "analysis", "strategy",
+    "efficiency", "teams", "customers", "investment", "research", "operations",
+    "markets", "innovation", "governance", "infrastructure", "productivity", "risk"
+]
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic offline chat model for local runs and benchmarks
+
+    Each response is seeded from the prompt text, so the same prompt always
+    produces the same reply and latency regardless of call order or
+    concurrency. Latency is drawn from a fixed, uniform or lognormal
+    distribution around ``latency_ms``, plus ``ms_per_token`` for every
+    completion token to mimic generation time; ``error_rate`` makes that
+    fraction of prompts fail with a RuntimeError.
+    """
+
+    model_name: str = "fake"
+    temperature: float = 0.7
+    max_tokens: Optional[int] = 2000
+    latency_ms: float = 200.0
+    latency_dist: str = "lognormal"
+    jitter: float = 0.3
+    ms_per_token: float = 0.0
+    words: int = 400
+    error_rate: float = 0.0
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @classmethod
+    def from_env(cls, **overrides) -> "FakeChatModel":
+        """Build a fake model from FAKE_LLM_* environment variables"""
+        options = {
+            "latency_ms": float(os.getenv("FAKE_LLM_LATENCY_MS", "200")),
+            "latency_dist": os.getenv("FAKE_LLM_LATENCY_DIST", "lognormal"),
+            "jitter": float(os.getenv("FAKE_LLM_JITTER", "0.3")),
+            "ms_per_token": float(os.getenv("FAKE_LLM_MS_PER_TOKEN", "0")),
+            "words": int(os.getenv("FAKE_LLM_WORDS", "400")),
+            "error_rate": float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            "seed": int(os.getenv("FAKE_LLM_SEED", "0")),
+        }
+        options.update(overrides)
+        return cls(**options)
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _latency(self, rng: random.Random) -> float:
+        """Seconds to wait before answering"""
+        if self.latency_dist == "fixed" or self.jitter <= 0:
+            latency = self.latency_ms
+        elif self.latency_dist == "uniform":
+            latency = rng.uniform(self.latency_ms * (1 - self.jitter), self.latency_ms * (1 + self.jitter))
+        elif self.latency_dist == "lognormal":
+            latency = self.latency_ms * math.exp(rng.gauss(0, self.jitter))
+        else:
+            raise ValueError(f"Unknown fake latency distribution: {self.latency_dist}")
+        return max(latency, 0.0) / 1000
+
+    def _article(self, rng: random.Random, words: Optional[int] = None) -> str:
+        """Markdown-ish article text of roughly `words` words, capped by max_tokens"""
+        budget = words or self.words
+        if self.max_tokens:
+            budget = min(budget, int(self.max_tokens * 0.75))
+        sections = []
+        written = 0
+        while written < budget:
+            heading = " ".join(rng.choice(_TOPIC_WORDS).title() for _ in range(3))
+            sections.append(f"**{heading}**")
+            for _ in range(2):
+                sentences = []
+                for _ in range(4):
+                    words = [rng.choice(_TOPIC_WORDS) for _ in range(rng.randint(8, 14))]
+                    if rng.random() < 0.3:
+                        words.insert(2, f"grew {rng.randint(5, 95)}% in {rng.randint(2015, 2024)}")
+                    sentences.append(" ".join(words).capitalize() + ".")
+                paragraph = " ".join(sentences)
+                sections.append(paragraph)
+                written += len(paragraph.split())
+            sections.append(f"- Key point on *{rng.choice(_TOPIC_WORDS)}*\n- Key point on **{rng.choice(_TOPIC_WORDS)}**")
+        return "\n\n".join(sections)
+
+    def _outline(self, prompt: str, rng: random.Random) -> str:
+        limit = re.search(r'at most (\d+) sections', prompt)
+        count = min(int(limit.group(1)), 6) if limit else 5
+        titles = ["Introduction"] + [" ".join(rng.choice(_TOPIC_WORDS).title() for _ in range(2))
+                                     for _ in range(count - 2)] + ["Conclusion"]
+        return "\n".join(f"{i}. {title}: how {rng.choice(_TOPIC_WORDS)} shapes {rng.choice(_TOPIC_WORDS)}"
+                         for i, title in enumerate(titles, 1))
+
+    def _outlined_section(self, prompt: str, rng: random.Random) -> str:
+        title = re.search(r'starting with the line "## (.+)"', prompt)
+        words = re.search(r'Write about (\d+) words', prompt)
+        body = self._article(rng, int(words.group(1)) if words else None).split("\n\n", 1)[1]
+        return f"## {title.group(1) if title else 'Section'}\n\n{body}"
+
+    def _transitions(self, prompt: str, rng: random.Random) -> str:
+        count = re.search(r'Return only (\d+) numbered lines', prompt)
+        return "\n".join(f"{i}. With {rng.choice(_TOPIC_WORDS)} in mind, we turn to {rng.choice(_TOPIC_WORDS)}."
+                         for i in range(1, (int(count.group(1)) if count else 1) + 1))
+
+    def _section(self, prompt: str, rng: random.Random) -> str:
+        """A rewrite of the one section in a refinement prompt, about as long as the original"""
+        section = prompt.split("Section to revise:", 1)[1].split("\n\nReturn only", 1)[0].strip()
+        lines = section.split("\n", 1)
+        heading = lines[0] if lines[0].startswith(("#", "**")) else ""
+        target = max(len(section.split()) - len(heading.split()), 8)
+        sentences = []
+        while sum(len(s.split()) for s in sentences) < target:
+            words = [rng.choice(_TOPIC_WORDS) for _ in range(rng.randint(8, 14))]
+            sentences.append("Revised: " + " ".join(words) + ".")
+        body = " ".join(sentences)
+        return f"{heading}\n\n{body}" if heading else body
+
+    def _verification(self, prompt: str, rng: random.Random) -> str:
+        if "Claims:" in prompt:
+            block = prompt.split("Claims:", 1)[1].split("\n\n", 1)[0]
+            claims = re.findall(r'^\d+\.\s+(.+)$', block, re.MULTILINE)
+        else:
+            article = prompt.split("Article:", 1)[-1]
+            claims = [s for s in re.split(r'(?<=[.!?])\s+', article) if re.search(r'\d', s)]
+        claims = claims[:20] or ["Sample claim from the article"]
+        verified, unverified = [], []
+        for claim in claims:
+            if rng.random() < 0.8:
+                verified.append({"claim": claim, "confidence": rng.randint(70, 99), "source": "Offline source",
+                                 "verified": True})
+            else:
+                unverified.append({"claim": claim, "reason": "No offline source", "needs_source": True})
+        return json.dumps({
+            "verified_claims": verified,
+            "unverified_claims": unverified,
+            "overall_accuracy": rng.randint(80, 98),
+            "improvements": ["Cite a primary source for each statistic"]
+        })
+
+    def _social(self, rng: random.Random) -> str:
+        tags = [f"#{word}" for word in rng.sample(_TOPIC_WORDS, 4)]
+        return json.dumps({
+            "twitter_thread": [f"Tweet {i} about {rng.choice(_TOPIC_WORDS)}" for i in range(1, 4)],
+            "linkedin_post": f"Why {rng.choice(_TOPIC_WORDS)} matters for {rng.choice(_TOPIC_WORDS)}.",
+            "instagram_caption": "A closer look at " + " ".join(tags),
+            "email_subject": f"The state of {rng.choice(_TOPIC_WORDS)}",
+            "email_preview": "What changed this year",
+            "hashtags": tags,
+            "key_quote": f"{rng.choice(_TOPIC_WORDS).title()} is a team sport."
+        })
+
+    def _repair(self, prompt: str, rng: random.Random) -> str:
+        """Values for just the fields a structured-output repair prompt lists"""
+        fields = {}
+        for name, kind in re.findall(r'^- (\w+): (.+)$', prompt.split("corrected fields", 1)[1], re.MULTILINE):
+            if kind.startswith("list"):
+                fields[name] = [f"{rng.choice(_TOPIC_WORDS)}"] if "claim" not in kind else []
+            elif kind.startswith(("number", "integer")):
+                fields[name] = rng.randint(70, 95)
+            elif kind.startswith("boolean"):
+                fields[name] = True
+            else:
+                fields[name] = f"{rng.choice(_TOPIC_WORDS).title()} update"
+        return json.dumps(fields)
+
+    def _respond(self, messages: List[BaseMessage]) -> Tuple[Optional[str], float]:
+        """Reply text (None for a simulated failure) and latency in seconds"""
+        content, latency = self._respond_first(messages)
+        if content is not None:
+            latency += self.ms_per_token * (len(content) // 4 + 1) / 1000
+        return content, latency
+
+    def _respond_first(self, messages: List[BaseMessage]) -> Tuple[Optional[str], float]:
+        """Reply text and the latency before its first token"""
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = self._rng(prompt)
+        latency = self._latency(rng)
+        if self.error_rate and rng.random() < self.error_rate:
+            content = None
+        elif "corrected fields" in prompt:
+            content = self._repair(prompt, rng)
+        elif "fact-checking agent" in prompt:
+            content = self._verification(prompt, rng)
+        elif "planning an article outline" in prompt:
+            content = self._outline(prompt, rng)
+        elif "writing one section of an article" in prompt:
+            content = self._outlined_section(prompt, rng)
+        elif "smoothing the flow between sections" in prompt:
+            content = self._transitions(prompt, rng)
+        elif "Section to revise:" in prompt:
+            content = self._section(prompt, rng)
+        elif "social media content" in prompt:
+            content = self._social(rng)
+        else:
+            content = self._article(rng)
+        return content, latency
+
+    def _result(self, messages: List[BaseMessage], content: Optional[str]) -> ChatResult:
+        if content is None:
+            raise RuntimeError("Simulated fake LLM failure")
+        prompt_text = "".join(str(message.content) for message in messages)
+        prompt_tokens = len(prompt_text) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        message = AIMessage(content=content, response_metadata={"token_usage": usage, "model_name": self.model_name})
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"token_usage": usage})
+
+    def _chunks(self, messages: List[BaseMessage], content: str) -> Iterator[Tuple[ChatGenerationChunk, float]]:
+        """Word-sized chunks and the delay before each; usage rides on the last chunk"""
+        pieces = re.findall(r'\S+\s*|\s+', content)
+        usage = self._result(messages, content).llm_output["token_usage"]
+        for index, piece in enumerate(pieces):
+            metadata = {"token_usage": usage, "model_name": self.model_name} if index == len(pieces) - 1 else {}
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece, response_metadata=metadata))
+            yield chunk, self.ms_per_token * (len(piece) // 4 + 1) / 1000
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        content, latency = self._respond_first(messages)
+        time.sleep(latency)
+        if content is None:
+            raise RuntimeError("Simulated fake LLM failure")
+        for chunk, delay in self._chunks(messages, content):
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        content, latency = self._respond_first(messages)
+        await asyncio.sleep(latency)
+        if content is None:
+            raise RuntimeError("Simulated fake LLM failure")
+        for chunk, delay in self._chunks(messages, content):
+            if delay:
+                await asyncio.sleep(delay)
+            yield chunk
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        content, latency = self._respond(messages)
+        time.sleep(latency)
+        return self._result(messages, content)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        content, latency = self._respond(messages)
+        await asyncio.sleep(latency)
+        return self._result(messages, content)
@@ -0,0 +1,313 @@
+"""
+LLM Backends for Multi-Agent Content Creator System
+Agents get their chat model from get_llm(stage), a process-wide registry
+that builds one client per distinct model configuration and shares a
+pooled keep-alive HTTP transport between all of them. LLM_BACKEND picks
+the backend: "groq" (the default) talks to the Groq API; "fake" is a
+deterministic local stand-in with configurable latency and response size,
+so the pipeline can be run and benchmarked without an API key. Backend
+libraries are imported only when their backend is built.
+
+Stages are routed to models by cost: the writer, editor and researcher use
+the large model, while short JSON outputs (social posts, claim checks) and
+research compression go to a small fast one. Each route has an alternate
+model that takes over when its own is overloaded.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+SMALL_MODEL = "llama-3.1-8b-instant"
+
+# Stages served by the small model unless MODEL_ROUTING=off or GROQ_MODEL_<STAGE> says otherwise
+DEFAULT_STAGE_MODELS = {"fact_check": SMALL_MODEL, "social": SMALL_MODEL, "compress": SMALL_MODEL}
+
+# Pipeline stages, each configurable via GROQ_MODEL_<STAGE>, GROQ_TEMPERATURE_<STAGE>,
+# GROQ_MAX_TOKENS_<STAGE> and GROQ_FALLBACK_MODEL_<STAGE> (falling back to GROQ_MODEL etc.)
+STAGES = ("research", "outline", "write", "transition", "edit", "refine", "fact_check", "social", "compress")
+
+
+class GroqTransport:
+    """Groq SDK clients over shared keep-alive connection pools
+
+    Every ChatGroq built by the registry reuses these clients, so all
+    models and agents draw from one bounded set of connections and TLS
+    sessions. An httpx.AsyncClient cannot outlive the event loop it first
+    ran on, so each running loop gets its own async pool, created on first use.
+    """
+
+    def __init__(self, max_connections: int = 16, keepalive_seconds: float = 60.0,
+                 timeout: Optional[float] = 60.0):
+        import groq
+        import httpx
+
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections,
+                                    keepalive_expiry=keepalive_seconds)
+        # Retries and backoff are owned by resilience.ResilientCaller, not the SDK
+        self._options = {"api_key": os.getenv("GROQ_API_KEY"), "base_url": os.getenv("GROQ_API_BASE") or None,
+                         "timeout": timeout, "max_retries": 0}
+        self.http_client = httpx.Client(limits=self._limits)
+        self.client = groq.Groq(http_client=self.http_client, **self._options)
+        self.async_completions = _LoopCompletions(self)
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Tuple[object, object]] = {}
+        self._async_lock = threading.Lock()
+
+    def async_groq(self):
+        """The AsyncGroq client of the running event loop"""
+        import groq
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            clients = self._async_clients.get(loop)
+            if clients is None:
+                # Pools of loops that have since closed cannot be reused; drop them
+                for closed in [other for other in self._async_clients if other.is_closed()]:
+                    del self._async_clients[closed]
+                http_client = httpx.AsyncClient(limits=self._limits)
+                clients = (http_client, groq.AsyncGroq(http_client=http_client, **self._options))
+                self._async_clients[loop] = clients
+        return clients[1]
+
+    def close(self):
+        self.http_client.close()
+
+    async def aclose(self):
+        """Close the async pool of every event loop"""
+        with self._async_lock:
+            clients, self._async_clients = self._async_clients, {}
+        for http_client, _ in clients.values():
+            try:
+                await http_client.aclose()
+            except RuntimeError:
+                pass  # its loop has already closed
+
+
+class _LoopCompletions:
+    """AsyncGroq().chat.completions of whichever event loop awaits create()"""
+
+    def __init__(self, transport: GroqTransport):
+        self._transport = transport
+
+    async def create(self, **kwargs):
+        return await self._transport.async_groq().chat.completions.create(**kwargs)
+
+
+_transport: Optional[GroqTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_groq_transport() -> GroqTransport:
+    """The process-wide Groq transport, sized by GROQ_MAX_CONNECTIONS"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = GroqTransport(
+                    max_connections=int(os.getenv("GROQ_MAX_CONNECTIONS", "16")),
+                    keepalive_seconds=float(os.getenv("GROQ_KEEPALIVE_SECONDS", "60")),
+                    timeout=float(os.getenv("LLM_TIMEOUT", "60")) or None
+                )
+    return _transport
+
+
+def _groq_backend(model: str, temperature: float, max_tokens: int, json_mode: bool = False):
+    from langchain_groq import ChatGroq
+    transport = get_groq_transport()
+    return ChatGroq(
+        model=model,
+        temperature=temperature,
+        groq_api_key=os.getenv("GROQ_API_KEY"),
+        max_tokens=max_tokens,
+        max_retries=0,
+        client=transport.client.chat.completions,
+        async_client=transport.async_completions,
+        # JSON mode: the API only returns syntactically valid JSON objects
+        model_kwargs={"response_format": {"type": "json_object"}} if json_mode else {}
+    )
+
+
+def _fake_backend(model: str, temperature: float, max_tokens: int, json_mode: bool = False):
+    from fake_llm import FakeChatModel
+    return FakeChatModel.from_env(model_name=f"fake:{model}", temperature=temperature, max_tokens=max_tokens)
+
+
+_BACKENDS: Dict[str, Callable] = {
+    "groq": _groq_backend,
+    "fake": _fake_backend,
+}
+
+
+def register_backend(name: str, factory: Callable):
+    """Make factory(model, temperature, max_tokens) selectable via LLM_BACKEND=name
+
+    Factories that support a JSON output mode also accept ``json_mode=True``.
+    """
+    _BACKENDS[name] = factory
+
+
+def backend_name() -> str:
+    return os.getenv("LLM_BACKEND", "groq").lower()
+
+
+def json_mode_enabled() -> bool:
+    return os.getenv("LLM_JSON_MODE", "on").lower() not in ("off", "0", "false", "no")
+
+
+def create_llm(model: str, temperature: Optional[float] = None, max_tokens: Optional[int] = None,
+               json_mode: bool = False):
+    """Build a new chat model for the configured backend (prefer get_llm)"""
+    name = backend_name()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{name}' (available: {', '.join(sorted(_BACKENDS))})")
+    if temperature is None:
+        temperature = float(os.getenv("GROQ_TEMPERATURE", "0.7"))
+    if max_tokens is None:
+        max_tokens = int(os.getenv("GROQ_MAX_TOKENS", "2000"))
+    if json_mode:
+        return _BACKENDS[name](model, temperature, max_tokens, json_mode=True)
+    return _BACKENDS[name](model, temperature, max_tokens)
+
+
+def _stage_setting(name: str, stage: Optional[str], default: str) -> str:
+    if stage:
+        value = os.getenv(f"{name}_{stage.upper()}")
+        if value:
+            return value
+    return os.getenv(name) or default
+
+
+def routing_enabled() -> bool:
+    return os.getenv("MODEL_ROUTING", "on").lower() not in ("off", "0", "false", "no")
+
+
+def stage_model(stage: Optional[str] = None) -> str:
+    """Model for a stage: GROQ_MODEL_<STAGE>, then the stage's routed default, then GROQ_MODEL"""
+    if stage:
+        model = os.getenv(f"GROQ_MODEL_{stage.upper()}")
+        if model:
+            return model
+        if routing_enabled() and stage in DEFAULT_STAGE_MODELS:
+            return DEFAULT_STAGE_MODELS[stage]
+    return os.getenv("GROQ_MODEL") or DEFAULT_MODEL
+
+
+def fallback_model(stage: Optional[str], model: str) -> Optional[str]:
+    """Alternate model for a stage's route, or None when fallback is off
+
+    GROQ_FALLBACK_MODEL_<STAGE> / GROQ_FALLBACK_MODEL pick it ("off" disables);
+    by default the large and small models stand in for each other.
+    """
+    fallback = _stage_setting("GROQ_FALLBACK_MODEL", stage, "")
+    if fallback.lower() in ("off", "none", "0", "false", "no"):
+        return None
+    if not fallback:
+        fallback = SMALL_MODEL if model != SMALL_MODEL else os.getenv("GROQ_MODEL") or DEFAULT_MODEL
+    return fallback if fallback != model else None
+
+
+def stage_config(stage: Optional[str] = None) -> Tuple[str, float, int]:
+    """(model, temperature, max_tokens) for a pipeline stage"""
+    return (
+        stage_model(stage),
+        float(_stage_setting("GROQ_TEMPERATURE", stage, "0.7")),
+        int(_stage_setting("GROQ_MAX_TOKENS", stage, "2000"))
+    )
+
+
+class LLMRegistry:
+    """One chat model per (backend, model, temperature, max_tokens, json_mode)
+
+    Stages that resolve to the same configuration share a client. Clients
+    are created on first request; override() pins a model for tests and
+    benchmarks.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple, object] = {}
+        self._keys: Dict[int, Tuple] = {}  # id(client) -> its configuration
+        self._overrides: Dict[Optional[str], object] = {}
+        self._lock = threading.Lock()
+
+    def get(self, stage: Optional[str] = None, json_mode: bool = False):
+        override = self._overrides.get(stage, self._overrides.get(None))
+        if override is not None:
+            return override
+        return self._client((backend_name(),) + stage_config(stage) + (json_mode and json_mode_enabled(),))
+
+    def _client(self, key: Tuple):
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = create_llm(*key[1:4], json_mode=key[4])
+                    self._clients[key] = client
+                    self._keys[id(client)] = key
+        return client
+
+    def fallback(self, llm, stage: Optional[str] = None):
+        """Client for the stage's alternate model with llm's other settings, or None
+
+        Models the registry did not build (e.g. test overrides) have no fallback.
+        """
+        key = self._keys.get(id(llm))
+        if key is None or self._clients.get(key) is not llm:
+            return None
+        model = fallback_model(stage, key[1])
+        if model is None:
+            return None
+        return self._client((key[0], model) + key[2:])
+
+    def json_mode(self, llm) -> bool:
+        """Whether llm was built to return JSON-only output"""
+        key = self._keys.get(id(llm))
+        if key is not None and self._clients.get(key) is llm:
+            return key[4]
+        return "response_format" in (getattr(llm, "model_kwargs", None) or {})
+
+    def override(self, llm, stage: Optional[str] = None):
+        """Serve llm for one stage, or for every stage when stage is None"""
+        with self._lock:
+            if llm is None:
+                self._overrides.pop(stage, None)
+            else:
+                self._overrides[stage] = llm
+
+    def clear(self):
+        """Drop cached clients and overrides; the next get() rebuilds"""
+        with self._lock:
+            self._clients.clear()
+            self._keys.clear()
+            self._overrides.clear()
+
+
+registry = LLMRegistry()
+
+
+def get_llm(stage: Optional[str] = None, json_mode: bool = False):
+    """Shared chat model for a pipeline stage; json_mode asks the provider for JSON-only output"""
+    return registry.get(stage, json_mode)
+
+
+def get_fallback_llm(llm, stage: Optional[str] = None):
+    """Alternate chat model to use when llm is overloaded, if its stage has one"""
+    return registry.fallback(llm, stage)
+
+
+def is_json_mode(llm) -> bool:
+    """Whether llm asks its provider for JSON-only output"""
+    return registry.json_mode(llm)
+
+
+def override_llm(llm, stage: Optional[str] = None):
+    """Route one stage (or all stages) to llm; pass None to remove the override"""
+    registry.override(llm, stage)
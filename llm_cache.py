@@ -0,0 +1,150 @@
+"""
+Persistent LLM Response Cache for Multi-Agent Content Creator System
+SQLite-backed, content-addressed store so reruns of an identical prompt
+(same model and sampling settings) are answered locally.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class LLMCache:
+    """Content-addressed response cache with TTL and LRU eviction
+
+    Keys are a SHA-256 of the rendered prompt, model, temperature,
+    max_tokens and JSON mode. Entries older than ``ttl_seconds`` are treated
+    as misses (``None`` or 0 keeps them indefinitely). When the cache grows
+    past ``max_entries`` or ``max_bytes`` the least recently used entries are
+    dropped first. Entry count and size are tracked in memory and re-read
+    from the table every SWEEP_EVERY writes, when expired entries are purged.
+    """
+
+    SWEEP_EVERY = 100
+
+    def __init__(self, path: str = ".llm_cache.sqlite", max_entries: int = 5000,
+                 max_bytes: int = 200 * 1024 * 1024, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds or None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._writes = 0
+        self._count, self._bytes = self._totals()
+
+    @staticmethod
+    def make_key(prompt: str, model: str, temperature: Optional[float], max_tokens: Optional[int],
+                 json_mode: bool = False) -> str:
+        """Hash everything that determines the model's answer"""
+        payload = json.dumps([prompt, model, temperature, max_tokens] + ([True] if json_mode else []),
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, size, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, size, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= size
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: str):
+        """Store a response and evict least recently used entries if over budget"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            self._count += 0 if old else 1
+            self._bytes += size - (old[0] if old else 0)
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                self._sweep()
+            self._evict()
+
+    def _totals(self):
+        return self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def _sweep(self):
+        """Purge expired entries and resync the totals (other processes may share the file)"""
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self._count, self._bytes = self._totals()
+
+    def _evict(self):
+        while self._count > self.max_entries or self._bytes > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._count, self._bytes = 0, 0
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self._count -= 1
+            self._bytes -= row[1]
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._count, self._bytes = 0, 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cache_from_env() -> Optional[LLMCache]:
+    """Build the cache described by LLM_CACHE* environment variables
+
+    ``LLM_CACHE=off`` disables caching entirely. LLM_CACHE_TTL defaults to a
+    week; set it to 0 or leave it empty to keep entries until evicted.
+    """
+    if os.getenv("LLM_CACHE", "on").lower() in ("off", "0", "false", "no"):
+        return None
+    ttl = os.getenv("LLM_CACHE_TTL")
+    if ttl is None:
+        ttl_seconds: Optional[float] = 7 * 24 * 3600
+    else:
+        ttl_seconds = float(ttl) if ttl.strip() else None
+    return LLMCache(
+        path=os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite"),
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+        max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024,
+        ttl_seconds=ttl_seconds or None,
+    )
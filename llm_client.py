@@ -0,0 +1,430 @@
+"""
+LLM Call Layer for Multi-Agent Content Creator System
+Every agent sends its prompts through here so cross-cutting concerns such as
+Groq rate limits, caching and retries apply to the whole process, not to a
+single agent.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+import token_budget
+import tracing
+from llm_backends import get_fallback_llm, is_json_mode
+from llm_cache import LLMCache, cache_from_env
+from resilience import ResilientCaller
+
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+
+
+class TokenBucket:
+    """Token bucket that refills continuously up to its capacity
+
+    Callers reserve an amount up front and are told how long to wait before
+    using it. The balance may go negative, which queues later callers behind
+    earlier ones in arrival order. The same bucket serves threads and
+    coroutines because the lock is only held for the arithmetic.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return the seconds to wait before using them"""
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_per_second
+
+    def refund(self, amount: float):
+        """Return unused tokens, e.g. when a reservation was overestimated"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by all agents"""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        return wait
+
+    def acquire(self, estimated_tokens: int):
+        """Block the calling thread until the request fits within the limits"""
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, estimated_tokens: int):
+        """Wait on the event loop until the request fits within the limits"""
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Credit back the difference between the estimate and real usage"""
+        if self.tokens and actual_tokens is not None and actual_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def refund(self, estimated_tokens: int):
+        """Credit back the tokens of a request given up on (timed out or cancelled)
+
+        The request slot is kept: the request was sent and counts against the
+        provider's requests-per-minute limit either way.
+        """
+        if self.tokens:
+            self.tokens.refund(estimated_tokens)
+
+
+load_dotenv()
+
+
+def _limit_from_env(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+rate_limiter = RateLimiter(_limit_from_env("GROQ_RPM"), _limit_from_env("GROQ_TPM"))
+
+
+def configure_rate_limits(requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+    """Replace the process-wide limiter; None disables that limit"""
+    global rate_limiter
+    rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+
+resilient_caller = ResilientCaller.from_env()
+
+
+def configure_resilience(max_attempts: Optional[int] = None, timeout: Optional[float] = None,
+                         hedge: Optional[bool] = None):
+    """Replace the process-wide retry/circuit-breaker/hedging layer; None keeps the env setting"""
+    global resilient_caller
+    caller = ResilientCaller.from_env()
+    if max_attempts is not None:
+        caller.policy.max_attempts = max(1, max_attempts)
+    if timeout is not None:
+        caller.policy.timeout = timeout if timeout > 0 else None
+    if hedge is not None:
+        caller.hedge = hedge
+    resilient_caller = caller
+
+
+_cache: Optional[LLMCache] = None
+_cache_loaded = False
+
+
+def get_cache() -> Optional[LLMCache]:
+    """Process-wide response cache, opened from the environment on first use"""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        _cache = cache_from_env()
+        _cache_loaded = True
+    return _cache
+
+
+def configure_cache(enabled: bool = True, **options):
+    """Replace the process-wide cache; ``enabled=False`` bypasses it entirely
+
+    Keyword options are passed to LLMCache (path, max_entries, max_bytes,
+    ttl_seconds).
+    """
+    global _cache, _cache_loaded
+    _cache = LLMCache(**options) if enabled else None
+    _cache_loaded = True
+
+
+def _model_name(llm) -> str:
+    return getattr(llm, "model_name", None) or type(llm).__name__
+
+
+def _cache_key(llm, rendered_prompt: str) -> str:
+    return LLMCache.make_key(
+        rendered_prompt,
+        _model_name(llm),
+        getattr(llm, "temperature", None),
+        getattr(llm, "max_tokens", None),
+        is_json_mode(llm),
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def _routes(llm, stage: str, attempt_for):
+    """Attempt on llm, plus (model name, attempt) on the stage's alternate model if it has one"""
+    fallback = get_fallback_llm(llm, stage)
+    return attempt_for(llm), (_model_name(fallback), attempt_for(fallback)) if fallback is not None else None
+
+
+class _Admission:
+    """Rate-limit hooks for one call
+
+    Each request (retry or hedge) waits for the limiter before ResilientCaller
+    starts timing it, and requests given up on have their tokens refunded.
+    """
+
+    def __init__(self, reserved: int):
+        self.reserved = reserved
+        self.queue_wait = 0.0
+
+    def admit(self):
+        waited = time.perf_counter()
+        rate_limiter.acquire(self.reserved)
+        self.queue_wait += time.perf_counter() - waited
+
+    async def aadmit(self):
+        waited = time.perf_counter()
+        await rate_limiter.aacquire(self.reserved)
+        self.queue_wait += time.perf_counter() - waited
+
+    def abandon(self):
+        rate_limiter.refund(self.reserved)
+
+
+def _settle(prompt_tokens: int, reserved: int, message, span):
+    usage = getattr(message, "response_metadata", None) or {}
+    usage = usage.get("token_usage") or usage.get("usage") or {}
+    completion_tokens = usage.get("completion_tokens")
+    if completion_tokens is None:
+        completion_tokens = estimate_tokens(message.content)
+        span.set(tokens_estimated=True)
+    prompt_tokens = usage.get("prompt_tokens", prompt_tokens)
+    span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    rate_limiter.settle(reserved, usage.get("total_tokens", prompt_tokens + completion_tokens))
+
+
+def invoke_llm(llm, prompt: "PromptTemplate", inputs: Dict, stage: str, compress: Optional[str] = None) -> str:
+    """Run `prompt | llm` for one pipeline stage and return the response text
+
+    ``compress`` names the input that may be shrunk (whole sentences at a
+    time) to fit the stage's token budget; see token_budget.
+
+    Cached responses are returned without touching the network or the rate
+    limiter. The token reservation covers the prompt plus the full
+    `max_tokens` completion budget, and the unused part is credited back
+    afterwards. Transient failures are retried with backoff (each retry
+    waits for the rate limiter again); if the model is overloaded the call
+    moves to the stage's alternate model, whose responses are cached under
+    its own name. Each call is recorded as a tracing span.
+    """
+    with tracing.get_tracer().span(stage, "llm", model=getattr(llm, "model_name", None), retries=0) as span:
+        if compress:
+            inputs = token_budget.fit_input(llm, prompt, inputs, compress, stage, span)
+        rendered = prompt.format(**inputs)
+        cache = get_cache()
+        key = _cache_key(llm, rendered) if cache else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                span.set(cache_hit=True, queue_wait_ms=0)
+                return cached
+        span.set(cache_hit=False)
+
+        prompt_tokens = estimate_tokens(rendered)
+        reserved = prompt_tokens + (getattr(llm, "max_tokens", None) or 0)
+        admission = _Admission(reserved)
+
+        def attempt_for(model):
+            def attempt():
+                return model, (prompt | model).invoke(inputs)
+            return attempt
+
+        attempt, fallback = _routes(llm, stage, attempt_for)
+        try:
+            served, message = resilient_caller.call(attempt, stage, _model_name(llm), span, fallback,
+                                                    admission.admit, admission.abandon)
+        finally:
+            span.set(queue_wait_ms=round(admission.queue_wait * 1000, 3))
+        if served is not llm:
+            span.set(model=_model_name(served))
+            key = _cache_key(served, rendered) if cache else None
+        _settle(prompt_tokens, reserved, message, span)
+        if cache:
+            cache.set(key, message.content)
+        return message.content
+
+
+async def ainvoke_llm(llm, prompt: "PromptTemplate", inputs: Dict, stage: str,
+                      compress: Optional[str] = None) -> str:
+    """Asynchronous counterpart of invoke_llm"""
+    with tracing.get_tracer().span(stage, "llm", model=getattr(llm, "model_name", None), retries=0) as span:
+        if compress:
+            inputs = await token_budget.afit_input(llm, prompt, inputs, compress, stage, span)
+        rendered = prompt.format(**inputs)
+        cache = get_cache()
+        key = _cache_key(llm, rendered) if cache else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                span.set(cache_hit=True, queue_wait_ms=0)
+                return cached
+        span.set(cache_hit=False)
+
+        prompt_tokens = estimate_tokens(rendered)
+        reserved = prompt_tokens + (getattr(llm, "max_tokens", None) or 0)
+        admission = _Admission(reserved)
+
+        def attempt_for(model):
+            async def attempt():
+                return model, await (prompt | model).ainvoke(inputs)
+            return attempt
+
+        attempt, fallback = _routes(llm, stage, attempt_for)
+        try:
+            served, message = await resilient_caller.acall(attempt, stage, _model_name(llm), span, fallback,
+                                                           admission.aadmit, admission.abandon)
+        finally:
+            span.set(queue_wait_ms=round(admission.queue_wait * 1000, 3))
+        if served is not llm:
+            span.set(model=_model_name(served))
+            key = _cache_key(served, rendered) if cache else None
+        _settle(prompt_tokens, reserved, message, span)
+        if cache:
+            cache.set(key, message.content)
+        return message.content
+
+
+def stream_llm(llm, prompt: "PromptTemplate", inputs: Dict, stage: str,
+               compress: Optional[str] = None) -> Iterator[str]:
+    """Yield one stage's response text as it is generated
+
+    Same cache, budget, rate-limit and tracing behaviour as invoke_llm. Retries,
+    timeouts and hedging cover the wait for the first token; once text has
+    been yielded a failure is raised to the caller. The span records
+    time-to-first-token as first_token_ms.
+    """
+    with tracing.get_tracer().span(stage, "llm", model=getattr(llm, "model_name", None), retries=0,
+                                   streamed=True) as span:
+        if compress:
+            inputs = token_budget.fit_input(llm, prompt, inputs, compress, stage, span)
+        rendered = prompt.format(**inputs)
+        cache = get_cache()
+        key = _cache_key(llm, rendered) if cache else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                span.set(cache_hit=True, queue_wait_ms=0, first_token_ms=0)
+                yield cached
+                return
+        span.set(cache_hit=False)
+
+        prompt_tokens = estimate_tokens(rendered)
+        reserved = prompt_tokens + (getattr(llm, "max_tokens", None) or 0)
+        admission = _Admission(reserved)
+        started = time.perf_counter()
+
+        def attempt_for(model):
+            def attempt():
+                chunks = iter((prompt | model).stream(inputs))
+                return model, next(chunks, None), chunks
+            return attempt
+
+        attempt, fallback = _routes(llm, stage, attempt_for)
+        try:
+            served, message, chunks = resilient_caller.call(attempt, stage, _model_name(llm), span, fallback,
+                                                            admission.admit, admission.abandon)
+        finally:
+            span.set(queue_wait_ms=round(admission.queue_wait * 1000, 3))
+        if served is not llm:
+            span.set(model=_model_name(served))
+            key = _cache_key(served, rendered) if cache else None
+        if message is None:
+            raise RuntimeError(f"{stage}: model returned an empty stream")
+        span.set(first_token_ms=round((time.perf_counter() - started) * 1000, 3))
+        try:
+            yield message.content
+            for chunk in chunks:
+                message = message + chunk
+                yield chunk.content
+        except GeneratorExit:
+            span.set(stopped_early=True)
+            return
+        _settle(prompt_tokens, reserved, message, span)
+        if cache:
+            cache.set(key, message.content)
+
+
+async def astream_llm(llm, prompt: "PromptTemplate", inputs: Dict, stage: str,
+                      compress: Optional[str] = None) -> AsyncIterator[str]:
+    """Asynchronous counterpart of stream_llm"""
+    with tracing.get_tracer().span(stage, "llm", model=getattr(llm, "model_name", None), retries=0,
+                                   streamed=True) as span:
+        if compress:
+            inputs = await token_budget.afit_input(llm, prompt, inputs, compress, stage, span)
+        rendered = prompt.format(**inputs)
+        cache = get_cache()
+        key = _cache_key(llm, rendered) if cache else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                span.set(cache_hit=True, queue_wait_ms=0, first_token_ms=0)
+                yield cached
+                return
+        span.set(cache_hit=False)
+
+        prompt_tokens = estimate_tokens(rendered)
+        reserved = prompt_tokens + (getattr(llm, "max_tokens", None) or 0)
+        admission = _Admission(reserved)
+        started = time.perf_counter()
+
+        def attempt_for(model):
+            async def attempt():
+                chunks = (prompt | model).astream(inputs).__aiter__()
+                try:
+                    return model, await chunks.__anext__(), chunks
+                except StopAsyncIteration:
+                    return model, None, chunks
+            return attempt
+
+        attempt, fallback = _routes(llm, stage, attempt_for)
+        try:
+            served, message, chunks = await resilient_caller.acall(attempt, stage, _model_name(llm), span,
+                                                                   fallback, admission.aadmit, admission.abandon)
+        finally:
+            span.set(queue_wait_ms=round(admission.queue_wait * 1000, 3))
+        if served is not llm:
+            span.set(model=_model_name(served))
+            key = _cache_key(served, rendered) if cache else None
+        if message is None:
+            raise RuntimeError(f"{stage}: model returned an empty stream")
+        span.set(first_token_ms=round((time.perf_counter() - started) * 1000, 3))
+        try:
+            yield message.content
+            async for chunk in chunks:
+                message = message + chunk
+                yield chunk.content
+        except GeneratorExit:
+            span.set(stopped_early=True)
+            return
+        _settle(prompt_tokens, reserved, message, span)
+        if cache:
+            cache.set(key, message.content)
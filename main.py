@@ -4,86 +4,142 @@ Specialized agents for research, writing, and editing content
 Enhanced with: Fact-Checking, Multi-Format Export, Social Media Generation
 """
 
+import argparse
+import asyncio
+import csv
 import os
-from typing import Dict
+import re
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
 from datetime import datetime
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
 import json
-from content_tools import generate_comprehensive_output
+from llm_backends import backend_name, get_llm
+from llm_client import invoke_llm, ainvoke_llm, stream_llm, astream_llm
+from llm_client import configure_rate_limits, configure_cache, configure_resilience
+from checkpoints import CheckpointStore, run_stage, arun_stage
+from tracing import bind_trace, configure_tracing, print_summary, set_trace_id
+from refinement import join_sections, merge_revision, outline, select_sections, split_sections
+from memory_store import MemoryStore, get_memory_store
+from streaming import ConsoleStream, MarkdownStream, StreamConsumer, arelay, relay, stream_enabled
+from version_history import VersionHistory
 
 # Load environment variables
 load_dotenv()
 
-# Configure LLM - Using Groq (Free API with no limitations!)
-model = os.getenv("GROQ_MODEL", "mixtral-8x7b-32768")
-temperature = float(os.getenv("GROQ_TEMPERATURE", "0.7"))
-max_tokens = int(os.getenv("GROQ_MAX_TOKENS", "2000"))
-
-llm = ChatGroq(
-    model=model,
-    temperature=temperature,
-    groq_api_key=os.getenv("GROQ_API_KEY"),
-    max_tokens=max_tokens
-)
-
+# LLM clients come from the shared registry in llm_backends (Groq by default;
+# LLM_BACKEND=fake runs offline). Per-stage models: GROQ_MODEL_RESEARCH etc.
 
 class ContentCreatorMemory:
-    """Persistent memory system for agents"""
+    """Persistent memory system for agents
+    
+    The lists hold this run's history for the agents. Every record is also
+    appended to the shared MemoryStore (``.memory.sqlite``, MEMORY_STORE=off
+    to disable) as it is produced, indexed by run ID, topic and time.
+    
+    Drafts and edits are also kept once each in a delta-encoded
+    VersionHistory; their history entries carry the version ID alongside the
+    text, for text() and diff().
+    """
     
-    def __init__(self):
+    def __init__(self, run_id: Optional[str] = None, store: Optional[MemoryStore] = None):
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.store = store if store is not None else get_memory_store()
+        self.topic: Optional[str] = None
         self.research_history = []
         self.draft_history = []
         self.edit_history = []
+        self.versions = VersionHistory()
         self.metadata = {
+            "run_id": self.run_id,
             "created_at": datetime.now().isoformat(),
             "total_iterations": 0
         }
     
     def add_research(self, topic: str, content: str):
         """Store research data"""
+        self.topic = topic
         self.research_history.append({
             "topic": topic,
             "content": content,
             "timestamp": datetime.now().isoformat()
         })
+        self._append("research", content)
     
     def add_draft(self, draft: str, iteration: int):
         """Store draft versions"""
         self.draft_history.append({
             "content": draft,
+            "version": self.versions.add(draft),
             "iteration": iteration,
             "timestamp": datetime.now().isoformat()
         })
+        self._append("draft", draft, iteration)
     
     def add_edit_feedback(self, feedback: str, iteration: int):
         """Store editing feedback"""
         self.edit_history.append({
             "feedback": feedback,
+            "version": self.versions.add(feedback),
             "iteration": iteration,
             "timestamp": datetime.now().isoformat()
         })
+        self._append("edit", feedback, iteration)
+    
+    def _append(self, kind: str, content: str, iteration: Optional[int] = None):
+        if self.store is not None:
+            self.store.append(self.run_id, kind, content, topic=self.topic, iteration=iteration)
+    
+    def text(self, version: str) -> str:
+        """Full text of a stored draft or edit"""
+        return self.versions.get(version)
+    
+    def diff(self, old: int, new: int) -> str:
+        """Unified diff between two versions, numbered from 1 in the order they were stored"""
+        return self.versions.diff(old, new)
+    
+    def latest_research(self, topic: str) -> Optional[Dict]:
+        """Most recent research on a topic from any run, or None"""
+        return self.store.latest("research", topic=topic) if self.store is not None else None
     
     def save_to_file(self, filename: str = "memory_log.json"):
-        """Save memory to file"""
+        """Save this run's memory to file; earlier runs stay in the memory store"""
         data = {
             "metadata": self.metadata,
             "research_history": self.research_history,
             "draft_history": self.draft_history,
-            "edit_history": self.edit_history
+            "edit_history": self.edit_history,
+            "versions": self.versions.to_dict()
         }
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+            json.dump(data, f)
+        if self.store is not None:
+            self.store.save_run(self.run_id, self.metadata, topic=self.topic)
         print(f"✅ Memory saved to {filename}")
 
 
 class ResearcherAgent:
-    """Agent specialized in research and information gathering"""
+    """Agent specialized in research and information gathering
     
-    def __init__(self, memory: ContentCreatorMemory):
+    With RESEARCH_REUSE=reuse or update, research from an earlier run whose
+    topic scores at least RESEARCH_REUSE_THRESHOLD against the new one (see
+    topic_index) is reused as is, or updated for the new topic by a cheaper
+    call that only adds what is missing. "ask" defers the choice to
+    confirm_reuse (the interactive prompt) and otherwise researches afresh.
+    """
+    
+    def __init__(self, memory: ContentCreatorMemory, reuse: Optional[str] = None):
         self.memory = memory
         self.role = "Content Researcher"
+        self.reuse = (reuse or os.getenv("RESEARCH_REUSE", "off")).lower()
+        self.reuse_threshold = float(os.getenv("RESEARCH_REUSE_THRESHOLD", "0.7"))
+        self.reuse_max_age_days = float(os.getenv("RESEARCH_REUSE_MAX_AGE_DAYS", "30"))
+        # Called with the match in "ask" mode; returns "reuse", "update" or "off"
+        self.confirm_reuse: Optional[Callable[[Dict], str]] = None
+        from langchain.prompts import PromptTemplate  # deferred: langchain is slow to import
         self.research_template = PromptTemplate(
             input_variables=["topic"],
             template="""You are an expert research agent. Your task is to provide a comprehensive, 
@@ -101,26 +157,105 @@ Please include:
 Format the research as a structured brief with clear sections.
 Make it informative, accurate, and accessible to a general audience."""
         )
+        self.update_template = PromptTemplate(
+            input_variables=["topic", "previous_topic", "research"],
+            template="""You are an expert research agent. An earlier research brief on "{previous_topic}" is
+being reused for a closely related topic:
+
+Topic: {topic}
+
+Earlier Research Brief:
+{research}
+
+List only what the brief is missing for the new topic: additional key facts and statistics (cite
+sources where possible), recent developments, and angles specific to the new topic. Do not repeat
+material already in the brief. Format the additions as a short structured section."""
+        )
     
     def research(self, topic: str) -> str:
         """Execute research task"""
         print(f"\n📚 {self.role} is researching: {topic}")
         
-        chain = self.research_template | llm
-        research_content = chain.invoke({"topic": topic}).content
+        match, mode = self._prior_research(topic)
+        if mode == "reuse":
+            research_content = match["content"]
+        elif mode == "update":
+            additions = invoke_llm(get_llm("research"), self.update_template, self._update_inputs(topic, match),
+                                   "research", compress="research")
+            research_content = self._updated(match, additions)
+        else:
+            research_content = invoke_llm(get_llm("research"), self.research_template, {"topic": topic}, "research")
         
         self.memory.add_research(topic, research_content)
         print(f"✅ Research completed - {len(research_content)} characters generated")
         
         return research_content
+    
+    async def aresearch(self, topic: str) -> str:
+        """Execute research task asynchronously"""
+        print(f"\n📚 {self.role} is researching: {topic}")
+        
+        match, mode = self._prior_research(topic)
+        if mode == "reuse":
+            research_content = match["content"]
+        elif mode == "update":
+            additions = await ainvoke_llm(get_llm("research"), self.update_template,
+                                          self._update_inputs(topic, match), "research", compress="research")
+            research_content = self._updated(match, additions)
+        else:
+            research_content = await ainvoke_llm(get_llm("research"), self.research_template, {"topic": topic},
+                                                 "research")
+        
+        self.memory.add_research(topic, research_content)
+        print(f"✅ Research completed - {len(research_content)} characters generated")
+        
+        return research_content
+    
+    def _prior_research(self, topic: str):
+        """Closest earlier research for the topic and what to do with it: reuse, update or off"""
+        if self.reuse == "off" or self.memory.store is None:
+            return None, "off"
+        from topic_index import get_topic_index  # deferred: numpy is slow to import
+        match = get_topic_index(self.memory.store).best_match(topic, self.reuse_threshold,
+                                                              self.reuse_max_age_days * 24 * 3600)
+        if match is None:
+            return None, "off"
+        mode = self.reuse
+        if mode == "ask":
+            mode = self.confirm_reuse(match) if self.confirm_reuse else "off"
+        if mode in ("reuse", "update"):
+            print(f"   ♻️  {'Reusing' if mode == 'reuse' else 'Updating'} research on '{match['topic']}' "
+                  f"from run {match['run_id']} (similarity {match['score']:.2f})")
+            return match, mode
+        return None, "off"
+    
+    def _update_inputs(self, topic: str, match: Dict) -> Dict:
+        return {"topic": topic, "previous_topic": match["topic"], "research": match["content"]}
+    
+    def _updated(self, match: Dict, additions: str) -> str:
+        return f"{match['content'].rstrip()}\n\nUpdates for this topic:\n{additions.strip()}"
 
 
 class WriterAgent:
-    """Agent specialized in content writing"""
+    """Agent specialized in content writing
     
-    def __init__(self, memory: ContentCreatorMemory):
+    WRITER_MODE=single (default) drafts the article in one call. In
+    "sections" mode the writer drafts an outline, writes every section
+    concurrently and stitches them with generated transitions, so long
+    articles take about as long as their longest section.
+    
+    With stream consumers attached, single-pass drafts are streamed to them
+    as they are generated.
+    """
+    
+    def __init__(self, memory: ContentCreatorMemory, mode: Optional[str] = None):
         self.memory = memory
         self.role = "Content Writer"
+        self.stream_consumers: List[StreamConsumer] = []
+        self.mode = (mode or os.getenv("WRITER_MODE", "single")).lower()
+        self.max_sections = int(os.getenv("WRITER_MAX_SECTIONS", "6"))
+        self.section_words = int(os.getenv("WRITER_SECTION_WORDS", "350"))
+        from langchain.prompts import PromptTemplate
         self.writing_template = PromptTemplate(
             input_variables=["research"],
             template="""You are a professional content writer. Your task is to create an engaging, 
@@ -140,19 +275,207 @@ Requirements:
 
 Create a complete article draft that is ready for editing."""
         )
+        self.outline_template = PromptTemplate(
+            input_variables=["research", "max_sections"],
+            template="""You are a professional content writer planning an article outline from the following research data:
+
+Research Data:
+{research}
+
+Plan at most {max_sections} sections: an introduction that hooks the reader, the body sections in a
+logical order, and a conclusion that summarizes key points.
+
+Return only a numbered list, one section per line, in the form:
+1. Section title: what the section covers"""
+        )
+        self.section_template = PromptTemplate(
+            input_variables=["research", "outline", "number", "title", "focus", "role", "words"],
+            template="""You are a professional content writer writing one section of an article.
+
+Research Data:
+{research}
+
+Article outline:
+{outline}
+
+Write section {number}, "{title}": {focus}
+This section is {role}. Write about {words} words in compelling, accessible language, consistent
+with the rest of the outline. Do not cover other sections' material.
+
+Return only the section, starting with the line "## {title}"."""
+        )
+        self.transition_template = PromptTemplate(
+            input_variables=["boundaries", "count"],
+            template="""You are a professional content writer smoothing the flow between sections of an article.
+For each boundary below, write one transition sentence that leads from the end of the
+previous section into the next one.
+
+{boundaries}
+
+Return only {count} numbered lines, one transition sentence per boundary, in order."""
+        )
     
     def write(self, research_content: str) -> str:
         """Execute writing task"""
+        if self.mode == "sections":
+            return self._write_sections(research_content)
+        if self.stream_consumers:
+            return "".join(self.write_stream(research_content))
         print(f"\n✍️  {self.role} is drafting article...")
         
-        chain = self.writing_template | llm
-        draft_content = chain.invoke({"research": research_content}).content
+        draft_content = invoke_llm(get_llm("write"), self.writing_template, {"research": research_content}, "write",
+                                   compress="research")
         
+        return self._store_draft(draft_content)
+    
+    async def awrite(self, research_content: str) -> str:
+        """Execute writing task asynchronously"""
+        if self.mode == "sections":
+            return await self._awrite_sections(research_content)
+        if self.stream_consumers:
+            return "".join([chunk async for chunk in self.awrite_stream(research_content)])
+        print(f"\n✍️  {self.role} is drafting article...")
+        
+        draft_content = await ainvoke_llm(get_llm("write"), self.writing_template, {"research": research_content},
+                                          "write", compress="research")
+        
+        return self._store_draft(draft_content)
+    
+    def write_stream(self, research_content: str) -> Iterator[str]:
+        """Draft the article in a single pass, yielding text as it is generated; stored once complete"""
+        print(f"\n✍️  {self.role} is drafting article...")
+        chunks = []
+        for chunk in relay(stream_llm(get_llm("write"), self.writing_template, {"research": research_content},
+                                      "write", compress="research"), "write", self.stream_consumers):
+            chunks.append(chunk)
+            yield chunk
+        self._store_draft("".join(chunks))
+    
+    async def awrite_stream(self, research_content: str) -> AsyncIterator[str]:
+        """Asynchronous counterpart of write_stream"""
+        print(f"\n✍️  {self.role} is drafting article...")
+        chunks = []
+        async for chunk in arelay(astream_llm(get_llm("write"), self.writing_template,
+                                              {"research": research_content}, "write", compress="research"),
+                                  "write", self.stream_consumers):
+            chunks.append(chunk)
+            yield chunk
+        self._store_draft("".join(chunks))
+    
+    def _store_draft(self, draft_content: str) -> str:
         iteration = len(self.memory.draft_history) + 1
         self.memory.add_draft(draft_content, iteration)
         print(f"✅ Draft completed - {len(draft_content)} characters generated")
         
         return draft_content
+    
+    def _write_sections(self, research_content: str) -> str:
+        """Outline, then write all sections concurrently and stitch them together"""
+        print(f"\n✍️  {self.role} is outlining article...")
+        outline_text = invoke_llm(get_llm("outline"), self.outline_template,
+                                  {"research": research_content, "max_sections": self.max_sections}, "outline",
+                                  compress="research")
+        sections = self._parse_outline(outline_text)
+        if len(sections) < 2:
+            print("   ⚠️  Outline could not be parsed; drafting in a single pass")
+            return self._store_draft(invoke_llm(get_llm("write"), self.writing_template, {"research": research_content},
+                                                "write", compress="research"))
+        
+        print(f"✍️  {self.role} is drafting {len(sections)} sections in parallel...")
+        inputs = [self._section_inputs(research_content, sections, i) for i in range(len(sections))]
+        with ThreadPoolExecutor(max_workers=min(len(sections), 8)) as pool:
+            bodies = list(pool.map(bind_trace(
+                lambda values: invoke_llm(get_llm("write"), self.section_template, values, "write",
+                                          compress="research")
+            ), inputs))
+        bodies = [self._with_heading(body, title) for body, (title, _) in zip(bodies, sections)]
+        
+        transitions = invoke_llm(get_llm("transition"), self.transition_template,
+                                 self._transition_inputs(bodies), "transition")
+        return self._store_draft(self._stitch(bodies, transitions))
+    
+    async def _awrite_sections(self, research_content: str) -> str:
+        """Asynchronous counterpart of _write_sections"""
+        print(f"\n✍️  {self.role} is outlining article...")
+        outline_text = await ainvoke_llm(get_llm("outline"), self.outline_template,
+                                         {"research": research_content, "max_sections": self.max_sections}, "outline",
+                                         compress="research")
+        sections = self._parse_outline(outline_text)
+        if len(sections) < 2:
+            print("   ⚠️  Outline could not be parsed; drafting in a single pass")
+            return self._store_draft(await ainvoke_llm(get_llm("write"), self.writing_template,
+                                                       {"research": research_content}, "write",
+                                                       compress="research"))
+        
+        print(f"✍️  {self.role} is drafting {len(sections)} sections in parallel...")
+        bodies = await asyncio.gather(*(
+            ainvoke_llm(get_llm("write"), self.section_template,
+                        self._section_inputs(research_content, sections, i), "write", compress="research")
+            for i in range(len(sections))
+        ))
+        bodies = [self._with_heading(body, title) for body, (title, _) in zip(bodies, sections)]
+        
+        transitions = await ainvoke_llm(get_llm("transition"), self.transition_template,
+                                        self._transition_inputs(bodies), "transition")
+        return self._store_draft(self._stitch(bodies, transitions))
+    
+    def _parse_outline(self, outline_text: str) -> List[tuple]:
+        """(title, focus) pairs from a numbered outline"""
+        sections = []
+        for match in re.finditer(r'^\s*\d+[.)]\s+(.+?)\s*$', outline_text, re.MULTILINE):
+            title, _, focus = match.group(1).strip("*# ").partition(":")
+            title = title.strip("*# ")
+            if title:
+                sections.append((title, focus.strip() or title))
+        return sections[:self.max_sections]
+    
+    def _section_inputs(self, research_content: str, sections: List[tuple], index: int) -> Dict:
+        if index == 0:
+            role = "the introduction: open with a hook that draws the reader in"
+        elif index == len(sections) - 1:
+            role = "the conclusion: summarize the key points and close strongly"
+        else:
+            role = f"body section {index} of {len(sections) - 2}"
+        title, focus = sections[index]
+        return {
+            "research": research_content,
+            "outline": "\n".join(f"{i + 1}. {t}: {f}" for i, (t, f) in enumerate(sections)),
+            "number": index + 1,
+            "title": title,
+            "focus": focus,
+            "role": role,
+            "words": self.section_words,
+        }
+    
+    @staticmethod
+    def _with_heading(body: str, title: str) -> str:
+        body = body.strip()
+        first_line = body.split("\n", 1)[0]
+        if first_line.lstrip("#* ").rstrip("*: ").lower() == title.lower():
+            body = body.split("\n", 1)[1].strip() if "\n" in body else ""
+        return f"## {title}\n\n{body}"
+    
+    @staticmethod
+    def _transition_inputs(bodies: List[str]) -> Dict:
+        boundaries = []
+        for i in range(1, len(bodies)):
+            previous_end = bodies[i - 1].strip()[-300:]
+            next_start = bodies[i].split("\n", 1)[-1].strip()[:300]
+            boundaries.append(f"Boundary {i}:\n...{previous_end}\n--- next section ---\n{next_start}...")
+        return {"boundaries": "\n\n".join(boundaries), "count": len(bodies) - 1}
+    
+    @staticmethod
+    def _stitch(bodies: List[str], transitions: str) -> str:
+        """Join sections, ending each (but the last) with its transition sentence when one was returned"""
+        sentences = [m.group(1).strip() for m in re.finditer(r'^\s*\d+[.)]\s+(.+)$', transitions, re.MULTILINE)]
+        if len(sentences) != len(bodies) - 1:
+            sentences = []  # mismatched reply: stitch without transitions rather than misplace them
+        parts = []
+        for i, body in enumerate(bodies):
+            if i < len(sentences):
+                body = f"{body}\n\n{sentences[i]}"
+            parts.append(body)
+        return "\n\n".join(parts)
 
 
 class EditorAgent:
@@ -161,6 +484,8 @@ class EditorAgent:
     def __init__(self, memory: ContentCreatorMemory):
         self.memory = memory
         self.role = "Content Editor"
+        self.stream_consumers: List[StreamConsumer] = []
+        from langchain.prompts import PromptTemplate
         self.editing_template = PromptTemplate(
             input_variables=["draft", "iteration"],
             template="""You are a meticulous editor and proofreader. Your task is to review and 
@@ -182,102 +507,488 @@ Return the final polished article followed by a brief summary of improvements ma
     
     def edit(self, draft_content: str) -> str:
         """Execute editing task"""
+        if self.stream_consumers:
+            return "".join(self.edit_stream(draft_content))
         print(f"\n✏️  {self.role} is reviewing and polishing...")
         
         iteration = len(self.memory.edit_history) + 1
-        chain = self.editing_template | llm
-        final_content = chain.invoke({"draft": draft_content, "iteration": iteration}).content
+        final_content = invoke_llm(
+            get_llm("edit"), self.editing_template, {"draft": draft_content, "iteration": iteration}, "edit",
+            compress="draft"
+        )
         
         self.memory.add_edit_feedback(final_content, iteration)
         print(f"✅ Editing completed - Article polished and refined")
         
         return final_content
+    
+    async def aedit(self, draft_content: str) -> str:
+        """Execute editing task asynchronously"""
+        if self.stream_consumers:
+            return "".join([chunk async for chunk in self.aedit_stream(draft_content)])
+        print(f"\n✏️  {self.role} is reviewing and polishing...")
+        
+        iteration = len(self.memory.edit_history) + 1
+        final_content = await ainvoke_llm(
+            get_llm("edit"), self.editing_template, {"draft": draft_content, "iteration": iteration}, "edit",
+            compress="draft"
+        )
+        
+        self.memory.add_edit_feedback(final_content, iteration)
+        print("✅ Editing completed - Article polished and refined")
+        
+        return final_content
+    
+    def edit_stream(self, draft_content: str) -> Iterator[str]:
+        """Edit the draft, yielding the polished article as it is generated; stored once complete"""
+        print(f"\n✏️  {self.role} is reviewing and polishing...")
+        iteration = len(self.memory.edit_history) + 1
+        chunks = []
+        for chunk in relay(stream_llm(get_llm("edit"), self.editing_template,
+                                      {"draft": draft_content, "iteration": iteration}, "edit", compress="draft"),
+                           "edit", self.stream_consumers):
+            chunks.append(chunk)
+            yield chunk
+        self.memory.add_edit_feedback("".join(chunks), iteration)
+        print("✅ Editing completed - Article polished and refined")
+    
+    async def aedit_stream(self, draft_content: str) -> AsyncIterator[str]:
+        """Asynchronous counterpart of edit_stream"""
+        print(f"\n✏️  {self.role} is reviewing and polishing...")
+        iteration = len(self.memory.edit_history) + 1
+        chunks = []
+        async for chunk in arelay(astream_llm(get_llm("edit"), self.editing_template,
+                                              {"draft": draft_content, "iteration": iteration}, "edit",
+                                              compress="draft"), "edit", self.stream_consumers):
+            chunks.append(chunk)
+            yield chunk
+        self.memory.add_edit_feedback("".join(chunks), iteration)
+        print("✅ Editing completed - Article polished and refined")
+
+
+class RefinerAgent:
+    """Agent that applies reader feedback to only the sections it concerns"""
+    
+    def __init__(self, memory: ContentCreatorMemory):
+        self.memory = memory
+        self.role = "Content Refiner"
+        from langchain.prompts import PromptTemplate
+        self.refine_template = PromptTemplate(
+            input_variables=["feedback", "research", "outline", "section"],
+            template="""You are an editor revising one section of a finished article to address reader feedback.
+
+Feedback:
+{feedback}
+
+Research notes:
+{research}
+
+Article outline:
+{outline}
+
+Section to revise:
+{section}
+
+Return only the revised section, starting with its heading unchanged. Keep what the feedback
+does not ask to change, do not repeat other sections, and add no commentary."""
+        )
+    
+    def _plan(self, article: str, feedback: str):
+        sections = split_sections(article)
+        targets = select_sections(sections, feedback)
+        print(f"\n🔧 {self.role} is revising {len(targets)} of {len(sections)} section(s)...")
+        return sections, targets
+    
+    def _inputs(self, sections: List[Dict], index: int, research: str, feedback: str) -> Dict:
+        return {"feedback": feedback, "research": research, "outline": outline(sections),
+                "section": sections[index]["text"].strip()}
+    
+    def _finish(self, sections: List[Dict], targets: List[int], revisions: List[str]) -> Dict:
+        for index, revised in zip(targets, revisions):
+            sections[index]["text"] = merge_revision(sections[index], revised)
+        article = join_sections(sections)
+        
+        iteration = len(self.memory.edit_history) + 1
+        self.memory.add_edit_feedback(article, iteration)
+        print(f"✅ Refinement completed - {len(targets)} section(s) rewritten, "
+              f"{len(sections) - len(targets)} kept as is")
+        
+        return {"article": article, "changed_sections": targets, "total_sections": len(sections)}
+    
+    def refine(self, article: str, research: str, feedback: str) -> Dict:
+        """Rewrite the sections of `article` that `feedback` concerns, reusing stored research"""
+        sections, targets = self._plan(article, feedback)
+        
+        def revise(index: int) -> str:
+            return invoke_llm(get_llm("refine"), self.refine_template,
+                              self._inputs(sections, index, research, feedback), "refine",
+                              compress="research")
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(len(targets), 8))) as pool:
+            revisions = list(pool.map(bind_trace(revise), targets))
+        return self._finish(sections, targets, revisions)
+    
+    async def arefine(self, article: str, research: str, feedback: str) -> Dict:
+        """Asynchronous refinement; affected sections are revised concurrently"""
+        sections, targets = self._plan(article, feedback)
+        
+        revisions = await asyncio.gather(*(
+            ainvoke_llm(get_llm("refine"), self.refine_template,
+                        self._inputs(sections, index, research, feedback), "refine",
+                        compress="research")
+            for index in targets
+        ))
+        return self._finish(sections, targets, list(revisions))
 
 
 class MultiAgentContentCreator:
     """Orchestrates multi-agent content creation workflow"""
     
-    def __init__(self, max_iterations: int = 3):
-        self.memory = ContentCreatorMemory()
+    def __init__(self, max_iterations: int = 3, checkpoints: Optional[CheckpointStore] = None,
+                 stream: Optional[bool] = None, speculative: Optional[bool] = None):
+        self.memory = ContentCreatorMemory(run_id=checkpoints.run_id if checkpoints else None)
         self.max_iterations = max_iterations
         self.current_iteration = 0
+        # Optional per-run stage checkpoints; completed stages are restored on resume
+        self.checkpoints = checkpoints
         
         # Initialize agents
         self.researcher = ResearcherAgent(self.memory)
         self.writer = WriterAgent(self.memory)
         self.editor = EditorAgent(self.memory)
+        self.refiner = RefinerAgent(self.memory)
+        # STREAM_OUTPUT=on echoes writer and editor output to the console as it is generated
+        if stream_enabled() if stream is None else stream:
+            self.add_stream_consumer(ConsoleStream())
+        # SPECULATIVE_OUTPUTS=on fact-checks and drafts social content on the writer draft while
+        # the editor runs; export_results reconciles them with the edited article
+        if speculative is None:
+            speculative = os.getenv("SPECULATIVE_OUTPUTS", "off").lower() in ("1", "true", "yes", "on")
+        self.speculative = speculative
+        self.speculation = None
         
-        # Store results
+        # Store results; draft_versions and the iterations' *_version fields are memory.versions IDs
         self.results = {
             "research": "",
             "drafts": [],
+            "draft_versions": [],
             "final_article": "",
             "iterations": []
         }
     
+    def add_stream_consumer(self, consumer: StreamConsumer):
+        """Receive writer and editor output (tokens and completed paragraphs) as it is generated"""
+        self.writer.stream_consumers.append(consumer)
+        self.editor.stream_consumers.append(consumer)
+    
     def execute_iteration(self, topic: str) -> Dict:
         """Execute one complete iteration of the content creation workflow"""
+        iteration_result = self._start_iteration()
+        
+        # Step 1: Research
+        research_content = run_stage(
+            self.checkpoints, self._stage_name("research"),
+            lambda: self.researcher.research(topic),
+            lambda content: self.memory.add_research(topic, content)
+        )
+        self._record_research(iteration_result, research_content)
+        
+        # Step 2: Writing
+        draft_content = run_stage(
+            self.checkpoints, self._stage_name("draft"),
+            lambda: self.writer.write(research_content),
+            self._restore_draft
+        )
+        self._record_draft(iteration_result, draft_content)
+        if self._should_speculate():
+            from content_tools import Speculation
+            self.speculation = Speculation.start(draft_content)
+        
+        # Step 3: Editing
+        try:
+            final_content = run_stage(
+                self.checkpoints, self._stage_name("edit"),
+                lambda: self.editor.edit(draft_content),
+                self._restore_edit
+            )
+        except BaseException:
+            # A failed or cancelled edit has no article for the speculation to serve
+            self._drop_speculation()
+            raise
+        self._record_final(iteration_result, final_content)
+        
+        print(f"\n✅ Iteration {self.current_iteration} completed successfully!")
+        return iteration_result
+    
+    async def aexecute_iteration(self, topic: str) -> Dict:
+        """Execute one complete iteration of the workflow on the event loop"""
+        iteration_result = self._start_iteration()
+        
+        research_content = await arun_stage(
+            self.checkpoints, self._stage_name("research"),
+            lambda: self.researcher.aresearch(topic),
+            lambda content: self.memory.add_research(topic, content)
+        )
+        self._record_research(iteration_result, research_content)
+        
+        draft_content = await arun_stage(
+            self.checkpoints, self._stage_name("draft"),
+            lambda: self.writer.awrite(research_content),
+            self._restore_draft
+        )
+        self._record_draft(iteration_result, draft_content)
+        if self._should_speculate():
+            from content_tools import Speculation
+            self.speculation = Speculation.astart(draft_content)
+        
+        try:
+            final_content = await arun_stage(
+                self.checkpoints, self._stage_name("edit"),
+                lambda: self.editor.aedit(draft_content),
+                self._restore_edit
+            )
+        except BaseException:
+            # A failed or cancelled edit has no article for the speculation to serve
+            self._drop_speculation()
+            raise
+        self._record_final(iteration_result, final_content)
+        
+        print(f"\n✅ Iteration {self.current_iteration} completed successfully!")
+        return iteration_result
+    
+    def refine_iteration(self, topic: str, feedback: str) -> Dict:
+        """Apply feedback to the current article, reusing its research
+        
+        Only the sections the feedback concerns are rewritten; research and
+        the full write/edit passes are skipped. Falls back to a complete
+        iteration when there is no article to refine yet.
+        """
+        if not self._can_refine():
+            return self.execute_iteration(f"{topic} - Refined based on: {feedback}")
+        iteration_result = self._start_iteration()
+        research_content = self.memory.research_history[-1]["content"]
+        
+        refined = run_stage(
+            self.checkpoints, self._stage_name("refine"),
+            lambda: self.refiner.refine(self.results["final_article"], research_content, feedback),
+            self._restore_refine
+        )
+        self._record_refinement(iteration_result, research_content, feedback, refined)
+        
+        print(f"\n✅ Iteration {self.current_iteration} completed successfully!")
+        return iteration_result
+    
+    async def arefine_iteration(self, topic: str, feedback: str) -> Dict:
+        """Asynchronous counterpart of refine_iteration"""
+        if not self._can_refine():
+            return await self.aexecute_iteration(f"{topic} - Refined based on: {feedback}")
+        iteration_result = self._start_iteration()
+        research_content = self.memory.research_history[-1]["content"]
+        
+        refined = await arun_stage(
+            self.checkpoints, self._stage_name("refine"),
+            lambda: self.refiner.arefine(self.results["final_article"], research_content, feedback),
+            self._restore_refine
+        )
+        self._record_refinement(iteration_result, research_content, feedback, refined)
+        
+        print(f"\n✅ Iteration {self.current_iteration} completed successfully!")
+        return iteration_result
+    
+    def _should_speculate(self) -> bool:
+        """Whether to start downstream stages on the new draft, dropping any earlier speculation"""
+        self._drop_speculation()
+        restored = self.checkpoints is not None and all(self.checkpoints.has(stage)
+                                                         for stage in ("fact_check", "social"))
+        return self.speculative and not restored
+    
+    def _drop_speculation(self):
+        if self.speculation is not None:
+            self.speculation.cancel()
+            self.speculation = None
+    
+    def _can_refine(self) -> bool:
+        return bool(self.results["final_article"] and self.memory.research_history)
+    
+    def _restore_refine(self, refined: Dict):
+        """Replay a checkpointed refinement into memory"""
+        self._restore_edit(refined["article"])
+    
+    def _record_refinement(self, iteration_result: Dict, research_content: str, feedback: str, refined: Dict):
+        """Store a refinement pass as the current iteration"""
+        iteration_result["research"] = research_content
+        iteration_result["feedback"] = feedback
+        iteration_result["changed_sections"] = refined["changed_sections"]
+        iteration_result["total_sections"] = refined["total_sections"]
+        self._record_final(iteration_result, refined["article"])
+    
+    def _stage_name(self, stage: str) -> str:
+        """Checkpoint name of a stage within the current iteration"""
+        return f"iteration{self.current_iteration}_{stage}"
+    
+    def _restore_draft(self, draft_content: str):
+        """Replay a checkpointed draft into memory"""
+        self.memory.add_draft(draft_content, len(self.memory.draft_history) + 1)
+    
+    def _restore_edit(self, final_content: str):
+        """Replay a checkpointed edit into memory"""
+        self.memory.add_edit_feedback(final_content, len(self.memory.edit_history) + 1)
+    
+    def _start_iteration(self) -> Dict:
+        """Advance the iteration counter and return an empty iteration record"""
         self.current_iteration += 1
         print(f"\n{'='*70}")
         print(f"🔄 ITERATION {self.current_iteration}")
         print(f"{'='*70}")
         
-        iteration_result = {
+        return {
             "iteration": self.current_iteration,
             "research": "",
             "draft": "",
-            "final_article": ""
+            "final_article": "",
+            "draft_version": None,
+            "article_version": None
         }
-        
-        # Step 1: Research
-        research_content = self.researcher.research(topic)
+    
+    def _record_research(self, iteration_result: Dict, research_content: str):
+        """Store research output for the current iteration"""
         iteration_result["research"] = research_content
         self.results["research"] = research_content
-        
-        # Step 2: Writing
-        draft_content = self.writer.write(research_content)
+    
+    def _record_draft(self, iteration_result: Dict, draft_content: str):
+        """Store the writer draft for the current iteration"""
+        version = self.memory.draft_history[-1]["version"]  # added by the writer or checkpoint restore
         iteration_result["draft"] = draft_content
+        iteration_result["draft_version"] = version
         self.results["drafts"].append(draft_content)
-        
-        # Step 3: Editing
-        final_content = self.editor.edit(draft_content)
+        self.results["draft_versions"].append(version)
+    
+    def _record_final(self, iteration_result: Dict, final_content: str):
+        """Store the edited article and close the current iteration"""
         iteration_result["final_article"] = final_content
+        iteration_result["article_version"] = self.memory.edit_history[-1]["version"]
         self.results["final_article"] = final_content
         self.results["iterations"].append(iteration_result)
-        
-        print(f"\n✅ Iteration {self.current_iteration} completed successfully!")
-        return iteration_result
     
-    def create_content(self, topic: str, enable_refinement: bool = False) -> str:
-        """Main method to orchestrate the entire content creation process"""
-        print("\n" + "="*70)
-        print("🚀 MULTI-AGENT CONTENT CREATOR STARTED")
-        print("="*70)
-        print(f"Topic: {topic}")
-        print(f"Max iterations: {self.max_iterations}\n")
+    def create_content(self, topic: str, enable_refinement: bool = False, feedback: Optional[str] = None) -> str:
+        """Main method to orchestrate the entire content creation process
+        
+        ``feedback`` is applied once, without prompting, after the first
+        iteration; ``enable_refinement`` then asks for more interactively.
+        """
+        self._print_banner(topic)
         
         # Execute initial iteration
         self.execute_iteration(topic)
+        if feedback:
+            self.refine_iteration(topic, feedback)
         
         # Execute refinement iterations if enabled
         if enable_refinement and self.max_iterations > 1:
             for i in range(self.max_iterations - 1):
-                user_input = input("\n🔄 Would you like to refine the article further? (yes/no): ").strip().lower()
-                if user_input != 'yes':
+                feedback = self._ask_for_feedback()
+                if not feedback:
                     break
-                
-                feedback = input("📝 Enter specific feedback for refinement: ").strip()
-                if feedback:
-                    print(f"\n📌 Applying feedback: {feedback}")
-                    self.execute_iteration(f"{topic} - Refined based on: {feedback}")
-                else:
+                self.refine_iteration(topic, feedback)
+        
+        self.memory.metadata["total_iterations"] = self.current_iteration
+        return self.results["final_article"]
+    
+    async def acreate_content(self, topic: str, enable_refinement: bool = False,
+                              feedback: Optional[str] = None) -> str:
+        """Asynchronous counterpart of create_content built on ainvoke
+        
+        Many creators can run concurrently on one event loop; stages within a
+        single article remain sequential because each depends on the last.
+        """
+        self._print_banner(topic)
+        
+        await self.aexecute_iteration(topic)
+        if feedback:
+            await self.arefine_iteration(topic, feedback)
+        
+        if enable_refinement and self.max_iterations > 1:
+            loop = asyncio.get_running_loop()
+            for i in range(self.max_iterations - 1):
+                # input() blocks, so keep it off the event loop
+                feedback = await loop.run_in_executor(None, self._ask_for_feedback)
+                if not feedback:
                     break
+                await self.arefine_iteration(topic, feedback)
         
         self.memory.metadata["total_iterations"] = self.current_iteration
         return self.results["final_article"]
     
-    def export_results(self, filename: str = "article_output.txt"):
+    def _print_banner(self, topic: str):
+        """Print the start-of-run banner"""
+        print("\n" + "="*70)
+        print("🚀 MULTI-AGENT CONTENT CREATOR STARTED")
+        print("="*70)
+        print(f"Topic: {topic}")
+        print(f"Max iterations: {self.max_iterations}\n")
+    
+    def _ask_for_feedback(self) -> str:
+        """Prompt the user for refinement feedback; empty string means stop"""
+        user_input = input("\n🔄 Would you like to refine the article further? (yes/no): ").strip().lower()
+        if user_input != 'yes':
+            return ""
+        
+        feedback = input("📝 Enter specific feedback for refinement: ").strip()
+        if feedback:
+            print(f"\n📌 Applying feedback: {feedback}")
+        return feedback
+    
+    def _ask_reuse(self, match: Dict) -> str:
+        """Offer earlier research on a similar topic; returns reuse, update or off"""
+        print(f"\n♻️  Found research on a similar topic: '{match['topic']}' (similarity {match['score']:.2f})")
+        answer = input("   Reuse it as is, update it for this topic, or research afresh? (reuse/update/new): ")
+        answer = answer.strip().lower()
+        return answer if answer in ("reuse", "update") else "off"
+    
+    def export_results(self, filename: str = "article_output.txt", output_dir: str = "."):
         """Export results to file"""
+        self._write_article_output(filename, output_dir)
+        
+        # Generate comprehensive output with new tools
+        print("\n" + "="*70)
+        print("📦 GENERATING ENHANCED CONTENT PACKAGE")
+        print("="*70)
+        
+        # Create exports directory
+        os.makedirs(os.path.join(output_dir, "exports"), exist_ok=True)
+        
+        # Generate all additional content
+        from content_tools import generate_comprehensive_output
+        comprehensive_results = generate_comprehensive_output(
+            self.results["final_article"],
+            "article",
+            output_dir,
+            self.checkpoints,
+            self.speculation
+        )
+    
+    async def aexport_results(self, filename: str = "article_output.txt", output_dir: str = ".") -> Dict:
+        """Export results to file, running fact-check, social and exports concurrently"""
+        self._write_article_output(filename, output_dir)
+        
+        print("\n" + "="*70)
+        print("📦 GENERATING ENHANCED CONTENT PACKAGE")
+        print("="*70)
+        
+        os.makedirs(os.path.join(output_dir, "exports"), exist_ok=True)
+        
+        from content_tools import agenerate_comprehensive_output
+        return await agenerate_comprehensive_output(
+            self.results["final_article"],
+            "article",
+            output_dir,
+            self.checkpoints,
+            self.speculation
+        )
+    
+    def _write_article_output(self, filename: str, output_dir: str = "."):
+        """Write the plain-text article report and save memory"""
+        filename = os.path.join(output_dir, filename)
         with open(filename, 'w', encoding='utf-8') as f:
             f.write("="*70 + "\n")
             f.write("MULTI-AGENT CONTENT CREATOR - FINAL OUTPUT\n")
@@ -302,21 +1013,7 @@ class MultiAgentContentCreator:
             f.write(f"Editor Agent (✏️ ): Polished content for quality and clarity\n")
         
         print(f"\n📄 Results exported to {filename}")
-        self.memory.save_to_file("memory_log.json")
-        
-        # Generate comprehensive output with new tools
-        print("\n" + "="*70)
-        print("📦 GENERATING ENHANCED CONTENT PACKAGE")
-        print("="*70)
-        
-        # Create exports directory
-        os.makedirs("exports", exist_ok=True)
-        
-        # Generate all additional content
-        comprehensive_results = generate_comprehensive_output(
-            self.results["final_article"],
-            "article"
-        )
+        self.memory.save_to_file(os.path.join(output_dir, "memory_log.json"))
     
     def display_results(self):
         """Display results in console"""
@@ -327,8 +1024,207 @@ class MultiAgentContentCreator:
         print("\n" + "="*70)
 
 
-def main():
+def load_topics(path: str) -> List[str]:
+    """Read batch topics from a CSV or JSONL file
+    
+    CSV files use the ``topic`` column when present, otherwise the first
+    column. JSONL lines may be objects with a ``topic`` key or bare strings.
+    """
+    topics = []
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.reader(f))
+            if rows and "topic" in [cell.strip().lower() for cell in rows[0]]:
+                column = [cell.strip().lower() for cell in rows[0]].index("topic")
+                rows = rows[1:]
+            else:
+                column = 0
+            topics = [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+        else:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                topic = entry.get("topic", "") if isinstance(entry, dict) else str(entry)
+                if topic.strip():
+                    topics.append(topic.strip())
+    return topics
+
+
+def _slugify(text: str, max_length: int = 40) -> str:
+    """Filesystem-safe directory name for a topic"""
+    slug = re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+    return slug[:max_length] or "topic"
+
+
+async def run_batch(topics: List[str], concurrency: int = 4, output_root: str = "batch_output") -> List[Dict]:
+    """Generate and export many topics concurrently
+    
+    At most ``concurrency`` topics are in flight at once. A failing topic is
+    recorded in the report and never cancels the others. Groq rate limits are
+    enforced across every agent by the shared limiter in ``llm_client``.
+    Each topic's edited article is appended to ``article_live.md`` in its
+    folder paragraph by paragraph, ahead of the full export.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    os.makedirs(output_root, exist_ok=True)
+    
+    async def run_topic(index: int, topic: str) -> Dict:
+        async with semaphore:
+            output_dir = os.path.join(output_root, f"{index:04d}_{_slugify(topic)}")
+            os.makedirs(output_dir, exist_ok=True)
+            checkpoints = CheckpointStore()
+            checkpoints.save_run_info(topic=topic, output_dir=output_dir)
+            set_trace_id(checkpoints.run_id)  # each gathered task has its own context
+            record = {"index": index, "topic": topic, "output_dir": output_dir, "run_id": checkpoints.run_id}
+            started = time.monotonic()
+            try:
+                creator = MultiAgentContentCreator(max_iterations=1, checkpoints=checkpoints, stream=False)
+                creator.add_stream_consumer(MarkdownStream(os.path.join(output_dir, "article_live.md")))
+                await creator.acreate_content(topic)
+                await creator.aexport_results(output_dir=output_dir)
+                record.update(status="ok", error=None)
+                print(f"\n✅ [{index}/{len(topics)}] {topic}")
+            except Exception as e:
+                record.update(status="failed", error=f"{type(e).__name__}: {e}")
+                print(f"\n❌ [{index}/{len(topics)}] {topic}: {e}")
+            record["seconds"] = round(time.monotonic() - started, 2)
+            return record
+    
+    results = await asyncio.gather(*(run_topic(i, topic) for i, topic in enumerate(topics, 1)))
+    
+    report_path = os.path.join(output_root, "batch_report.jsonl")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        for record in results:
+            f.write(json.dumps(record) + "\n")
+    
+    succeeded = sum(1 for record in results if record["status"] == "ok")
+    print("\n" + "="*70)
+    print(f"📊 BATCH COMPLETE: {succeeded}/{len(results)} topics succeeded")
+    print("="*70)
+    for record in results:
+        marker = "✅" if record["status"] == "ok" else "❌"
+        detail = record["output_dir"] if record["status"] == "ok" else record["error"]
+        print(f"  {marker} {record['topic']} ({record['seconds']}s) - {detail}")
+    print(f"\n📄 Batch report saved to {report_path}")
+    
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options; with no options the interactive mode runs"""
+    parser = argparse.ArgumentParser(description="Multi-Agent Content Creator System")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="JSONL or CSV file of topics to generate non-interactively")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="resume an interrupted run from its first incomplete stage")
+    parser.add_argument("--serve", action="store_true",
+                        help="run an HTTP job service instead of the interactive prompt")
+    parser.add_argument("--host", default="127.0.0.1", help="service bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="service port (default: 8080)")
+    parser.add_argument("--queue-size", type=int, default=100,
+                        help="maximum queued service jobs before POST /jobs returns 503 (default: 100)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="maximum number of topics in flight in batch or service mode (default: 4)")
+    parser.add_argument("--output-dir",
+                        help="root directory for per-topic outputs (default: batch_output, or service_output with --serve)")
+    parser.add_argument("--rpm", type=int, default=os.getenv("GROQ_RPM") or None,
+                        help="Groq requests-per-minute limit shared by all agents (default: $GROQ_RPM)")
+    parser.add_argument("--tpm", type=int, default=os.getenv("GROQ_TPM") or None,
+                        help="Groq tokens-per-minute limit shared by all agents (default: $GROQ_TPM)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the on-disk LLM response cache for this run")
+    parser.add_argument("--write-mode", choices=("single", "sections"), default=os.getenv("WRITER_MODE", "single"),
+                        help="draft in one call, or outline then write sections in parallel (default: $WRITER_MODE or single)")
+    parser.add_argument("--reuse-research", choices=("off", "ask", "reuse", "update"),
+                        default=os.getenv("RESEARCH_REUSE", "off"),
+                        help="reuse or update earlier research on near-duplicate topics; ask prompts for each match "
+                             "and needs the interactive mode (default: $RESEARCH_REUSE or off)")
+    parser.add_argument("--refine", action="store_true",
+                        help="after the article is written, ask for feedback and rewrite only the sections it concerns")
+    parser.add_argument("--feedback", metavar="TEXT",
+                        help="apply this feedback once to the finished article without prompting (not with --batch)")
+    parser.add_argument("--speculative", action="store_true",
+                        help="fact-check and draft social content on the writer draft while the editor runs")
+    parser.add_argument("--stream", action="store_true",
+                        help="print writer and editor output as it is generated (default: $STREAM_OUTPUT)")
+    parser.add_argument("--hedge", action="store_true",
+                        help="send a duplicate request when an LLM call outlives its stage's p95 latency")
+    parser.add_argument("--trace-file",
+                        help="JSONL file that per-stage tracing spans are appended to; turns tracing on even with "
+                             "TRACE=off (default: $TRACE_FILE or traces.jsonl)")
+    parser.add_argument("--trace-summary", action="store_true",
+                        help="print per-stage latency percentiles from the trace file and exit")
+    args = parser.parse_args(argv)
+    if args.batch and (args.refine or args.feedback):
+        parser.error("--refine and --feedback apply to a single article, not --batch")
+    if (args.batch or args.serve) and args.reuse_research == "ask":
+        parser.error("--reuse-research ask needs the interactive prompt; use off, reuse or update with "
+                     "--batch and --serve")
+    return args
+
+
+def _check_api_key() -> bool:
+    """Print setup instructions and return False when no Groq key is configured"""
+    if os.getenv("GROQ_API_KEY") or backend_name() != "groq":
+        return True
+    print("\n❌ ERROR: GROQ_API_KEY environment variable not set!")
+    print("   Please create a .env file with your Groq API key:")
+    print("   GROQ_API_KEY=your_actual_key_here")
+    print("\n   Get a free API key at: https://console.groq.com/keys")
+    return False
+
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function"""
+    args = parse_args(argv)
+    if args.trace_summary:
+        print_summary(args.trace_file or os.getenv("TRACE_FILE", "traces.jsonl"))
+        return 0
+    configure_rate_limits(args.rpm, args.tpm)
+    if args.no_cache:
+        configure_cache(enabled=False)
+    if args.hedge:
+        configure_resilience(hedge=True)
+    os.environ["WRITER_MODE"] = args.write_mode
+    if args.stream:
+        os.environ["STREAM_OUTPUT"] = "on"
+    if args.speculative:
+        os.environ["SPECULATIVE_OUTPUTS"] = "on"
+    os.environ["RESEARCH_REUSE"] = args.reuse_research
+    # An explicit --trace-file turns tracing on; without it TRACE / TRACE_FILE decide
+    if args.trace_file:
+        configure_tracing(args.trace_file)
+    
+    if args.serve:
+        if not _check_api_key():
+            return 1
+        from service import serve
+        return serve(args.host, args.port, args.concurrency, args.output_dir or "service_output",
+                     args.queue_size, creator_class=MultiAgentContentCreator)
+    
+    if args.batch:
+        if not _check_api_key():
+            return 1
+        topics = load_topics(args.batch)
+        print(f"\n📦 Batch mode: {len(topics)} topic(s), concurrency {args.concurrency}")
+        results = asyncio.run(run_batch(topics, args.concurrency, args.output_dir or "batch_output"))
+        return 0 if all(record["status"] == "ok" for record in results) else 1
+    
+    if args.resume:
+        if not _check_api_key():
+            return 1
+        try:
+            checkpoints = CheckpointStore.open(args.resume)
+        except FileNotFoundError as e:
+            print(f"\n❌ {e}")
+            return 1
+        run_info = checkpoints.load_run_info()
+        print(f"\n♻️  Resuming run {checkpoints.run_id}: {run_info['topic']}")
+        return _run_single(run_info["topic"], checkpoints, run_info.get("output_dir", "."), args.refine,
+                           args.feedback or run_info.get("feedback"))
+    
     print("\n" + "="*70)
     print("🤖 MULTI-AGENT CONTENT CREATOR SYSTEM")
     print("="*70)
@@ -345,27 +1241,35 @@ def main():
         print(f"   Using default topic: {topic}\n")
     
     # Check for API key
-    if not os.getenv("GROQ_API_KEY"):
-        print("\n❌ ERROR: GROQ_API_KEY environment variable not set!")
-        print("   Please create a .env file with your Groq API key:")
-        print("   GROQ_API_KEY=your_actual_key_here")
-        print("\n   Get a free API key at: https://console.groq.com/keys")
+    if not _check_api_key():
         return
     
     print("\n✅ Groq API key found. Initializing agents...\n")
     
+    checkpoints = CheckpointStore()
+    checkpoints.save_run_info(topic=topic, output_dir=".", feedback=args.feedback)
+    print(f"💾 Run ID: {checkpoints.run_id} (stages are checkpointed as they complete)")
+    
+    return _run_single(topic, checkpoints, refine=args.refine, feedback=args.feedback)
+
+
+def _run_single(topic: str, checkpoints: CheckpointStore, output_dir: str = ".", refine: bool = False,
+                feedback: Optional[str] = None):
+    """Create, display and export one article, checkpointing every stage"""
+    set_trace_id(checkpoints.run_id)
     # Create the content creator instance
-    creator = MultiAgentContentCreator(max_iterations=3)
+    creator = MultiAgentContentCreator(max_iterations=3, checkpoints=checkpoints)
+    creator.researcher.confirm_reuse = creator._ask_reuse
     
     try:
         # Generate content
-        final_article = creator.create_content(topic, enable_refinement=False)
+        final_article = creator.create_content(topic, enable_refinement=refine, feedback=feedback)
         
         # Display results
         creator.display_results()
         
         # Export results
-        creator.export_results()
+        creator.export_results(output_dir=output_dir)
         
         print("\n✨ Content creation completed successfully!")
         print("📁 Output files created:")
@@ -382,8 +1286,9 @@ def main():
     except Exception as e:
         print(f"\n❌ Error during content creation: {str(e)}")
         print("   Please ensure your Groq API key is valid and you have sufficient credits.")
-        return
+        print(f"   Completed stages were saved. Resume with: python main.py --resume {checkpoints.run_id}")
+        return 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
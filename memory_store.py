@@ -0,0 +1,248 @@
+"""
+Persistent Agent Memory Store for Multi-Agent Content Creator System
+Append-only SQLite log of every research brief, draft and edit across runs,
+indexed by run ID, topic and time. Records are written as they are produced,
+so saving never rewrites history, and queries such as "latest research for
+this topic" read a single row instead of loading every run. Successive
+drafts and edits of a run are stored as line-level deltas against the
+previous one (see version_history), with a full copy every few versions.
+
+Usage:
+    python memory_store.py runs [TOPIC]
+    python memory_store.py latest research|draft|edit TOPIC
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from version_history import apply_delta, encode_delta
+
+KINDS = ("research", "draft", "edit")
+DELTA_KINDS = ("draft", "edit")  # successive versions of one article
+
+
+class MemoryStore:
+    """Append-only record log with per-run metadata
+
+    A record is (run_id, kind, topic, iteration, content). Appending the same
+    content twice for the same run, kind and iteration is a no-op, so
+    restoring a resumed run from its checkpoints does not duplicate history;
+    a later iteration that reproduces earlier text is still recorded. Records
+    carry their SHA-256 digest as ``version``, the same ID VersionHistory
+    uses; draft and edit rows whose ``base`` is set hold a JSON delta
+    against that record instead of the full text.
+    """
+
+    def __init__(self, path: str = ".memory.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                topic TEXT,
+                iteration INTEGER,
+                content TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                base INTEGER,
+                depth INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        # Research has no iteration; IFNULL keeps its rows unique too (NULLs never collide)
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_records_run "
+                           "ON records (run_id, kind, IFNULL(iteration, -1), digest)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_topic ON records (topic, kind, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_time ON records (created_at)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                topic TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                metadata TEXT
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_topic ON runs (topic, created_at)")
+        # run_id -> (record id, text, chain depth) of its newest draft or edit, the base for the next delta
+        self._latest: "OrderedDict[str, Tuple[int, str, int]]" = OrderedDict()
+        self._latest_runs = 64
+
+    def append(self, run_id: str, kind: str, content: str, topic: Optional[str] = None,
+               iteration: Optional[int] = None):
+        """Record one research brief, draft or edit"""
+        now = time.time()
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        stored, base, depth = content, None, 0
+        previous = self._latest.get(run_id) if kind in DELTA_KINDS else None
+        if previous is not None:
+            delta = encode_delta(previous[1], content, previous[2] + 1)
+            if delta is not None:
+                stored, base, depth = json.dumps(delta, separators=(",", ":")), previous[0], previous[2] + 1
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO records "
+                "(run_id, kind, topic, iteration, content, digest, created_at, base, depth) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, kind, topic, iteration, stored, digest, now, base, depth),
+            )
+            if kind in DELTA_KINDS and cursor.rowcount:
+                self._latest[run_id] = (cursor.lastrowid, content, depth)
+                self._latest.move_to_end(run_id)
+                if len(self._latest) > self._latest_runs:
+                    self._latest.popitem(last=False)
+            self._conn.execute(
+                "INSERT INTO runs (run_id, topic, created_at, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET updated_at = excluded.updated_at, "
+                "topic = COALESCE(runs.topic, excluded.topic)",
+                (run_id, topic, now, now),
+            )
+
+    def save_run(self, run_id: str, metadata: Dict, topic: Optional[str] = None):
+        """Create or update a run's metadata"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, topic, created_at, updated_at, metadata) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET updated_at = excluded.updated_at, "
+                "metadata = excluded.metadata, topic = COALESCE(runs.topic, excluded.topic)",
+                (run_id, topic, now, now, json.dumps(metadata, default=str)),
+            )
+
+    def latest(self, kind: str, topic: Optional[str] = None, run_id: Optional[str] = None) -> Optional[Dict]:
+        """Most recent record of a kind, optionally for one topic or run"""
+        where, params = ["kind = ?"], [kind]
+        if topic is not None:
+            where.append("topic = ?")
+            params.append(topic)
+        if run_id is not None:
+            where.append("run_id = ?")
+            params.append(run_id)
+        rows = self._select(f"WHERE {' AND '.join(where)} ORDER BY created_at DESC, id DESC LIMIT 1", params)
+        return rows[0] if rows else None
+
+    def history(self, run_id: str, kind: Optional[str] = None) -> List[Dict]:
+        """Every record of a run in the order it was produced"""
+        if kind is None:
+            return self._select("WHERE run_id = ? ORDER BY id", [run_id])
+        return self._select("WHERE run_id = ? AND kind = ? ORDER BY id", [run_id, kind])
+
+    def since(self, timestamp: float, kind: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Records created at or after a Unix timestamp, oldest first"""
+        if kind is None:
+            return self._select("WHERE created_at >= ? ORDER BY created_at, id LIMIT ?", [timestamp, limit])
+        return self._select("WHERE created_at >= ? AND kind = ? ORDER BY created_at, id LIMIT ?",
+                            [timestamp, kind, limit])
+
+    def scan(self, kind: str, after_id: int = 0, excerpt_chars: int = 2000) -> List[Dict]:
+        """Records of a kind added after a record ID, with only the start of their content"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, run_id, topic, created_at, substr(content, 1, ?), base FROM records "
+                "WHERE kind = ? AND id > ? ORDER BY id",
+                (excerpt_chars, kind, after_id),
+            ).fetchall()
+        return [{"id": record_id, "run_id": run_id, "topic": topic, "created_at": created_at,
+                 "excerpt": excerpt if base is None else self._text(record_id)[:excerpt_chars]}
+                for record_id, run_id, topic, created_at, excerpt, base in rows]
+
+    def get(self, record_id: int) -> Optional[Dict]:
+        rows = self._select("WHERE id = ?", [record_id])
+        return rows[0] if rows else None
+
+    def runs(self, topic: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Most recent runs first, optionally for one topic"""
+        query = "SELECT run_id, topic, created_at, updated_at, metadata FROM runs"
+        params: List = []
+        if topic is not None:
+            query += " WHERE topic = ?"
+            params.append(topic)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{"run_id": run_id, "topic": run_topic, "created_at": created_at, "updated_at": updated_at,
+                 "metadata": json.loads(metadata) if metadata else {}}
+                for run_id, run_topic, created_at, updated_at, metadata in rows]
+
+    def _select(self, clause: str, params: List) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, run_id, kind, topic, iteration, content, digest, created_at, base FROM records {clause}",
+                params
+            ).fetchall()
+        return [{"run_id": run_id, "kind": kind, "topic": topic, "iteration": iteration,
+                 "content": content if base is None else self._text(record_id), "version": digest,
+                 "created_at": created_at}
+                for record_id, run_id, kind, topic, iteration, content, digest, created_at, base in rows]
+
+    def _text(self, record_id: int) -> str:
+        """Full text of a record, rebuilt from its nearest full copy"""
+        with self._lock:
+            content, base = self._conn.execute("SELECT content, base FROM records WHERE id = ?",
+                                               (record_id,)).fetchone()
+        if base is None:
+            return content
+        return apply_delta(self._text(base), json.loads(content))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def memory_store_from_env() -> Optional[MemoryStore]:
+    """Build the store described by MEMORY_STORE* environment variables
+
+    ``MEMORY_STORE=off`` keeps memory in-process only.
+    """
+    if os.getenv("MEMORY_STORE", "on").lower() in ("off", "0", "false", "no"):
+        return None
+    return MemoryStore(path=os.getenv("MEMORY_STORE_PATH", ".memory.sqlite"))
+
+
+_store: Optional[MemoryStore] = None
+_store_loaded = False
+
+
+def get_memory_store() -> Optional[MemoryStore]:
+    """Process-wide store shared by every ContentCreatorMemory, opened on first use"""
+    global _store, _store_loaded
+    if not _store_loaded:
+        _store = memory_store_from_env()
+        _store_loaded = True
+    return _store
+
+
+def configure_memory_store(enabled: bool = True, **options):
+    """Replace the process-wide store; ``enabled=False`` keeps memory in-process only"""
+    global _store, _store_loaded
+    _store = MemoryStore(**options) if enabled else None
+    _store_loaded = True
+
+
+if __name__ == "__main__":
+    store = MemoryStore(os.getenv("MEMORY_STORE_PATH", ".memory.sqlite"))
+    if len(sys.argv) >= 2 and sys.argv[1] == "runs":
+        for run in store.runs(sys.argv[2] if len(sys.argv) > 2 else None):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["created_at"]))
+            print(f"{run['run_id']}  {started}  {run['topic'] or ''}")
+    elif len(sys.argv) == 4 and sys.argv[1] == "latest" and sys.argv[2] in KINDS:
+        record = store.latest(sys.argv[2], topic=sys.argv[3])
+        if record is None:
+            print(f"No {sys.argv[2]} recorded for '{sys.argv[3]}'")
+            sys.exit(1)
+        print(record["content"])
+    else:
+        print(__doc__.strip())
+        sys.exit(1)
@@ -0,0 +1,108 @@
+"""
+Incremental Refinement for Multi-Agent Content Creator System
+Splits an article into heading-delimited sections and picks the sections a
+piece of reader feedback is about, so a refinement pass rewrites only those
+and leaves the rest of the article byte-for-byte unchanged.
+"""
+
+import re
+from typing import Dict, List
+
+# Markdown headings ("## Title") and bold-only lines ("**Title**") start a section
+HEADING = re.compile(r'^(?:#{1,6}\s+\S.*|\*\*[^*\n]+\*\*:?)[ \t]*$', re.MULTILINE)
+
+# Feedback that talks about the article as a whole touches every section (matched as whole words,
+# so "tone" does not fire on "stone")
+GLOBAL_HINTS = ("whole article", "entire article", "overall", "throughout", "every section", "all sections",
+                "each section", "tone", "voice", "style", "more concise", "shorter", "longer", "audience")
+GLOBAL_HINT = re.compile(r"\b(?:" + "|".join(re.escape(hint) for hint in GLOBAL_HINTS) + r")\b")
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "about", "into", "more", "less", "make", "please", "should",
+    "could", "would", "add", "remove", "section", "part", "paragraph", "article", "also", "some", "any",
+    "from", "are", "was", "its", "it's", "their", "there", "than", "then", "them", "they", "what", "which",
+    "have", "has", "not", "but", "too", "very", "can", "our", "your", "you", "use", "using", "include"
+}
+
+
+def split_sections(article: str) -> List[Dict]:
+    """Split an article into sections; "".join of their text restores it exactly
+
+    Text before the first heading (title, introduction) is its own section
+    with an empty heading.
+    """
+    starts = [match.start() for match in HEADING.finditer(article)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(article)]
+    sections = []
+    for begin, end in zip(bounds, bounds[1:]):
+        text = article[begin:end]
+        if not text.strip():
+            if sections:
+                sections[-1]["text"] += text
+            continue
+        first_line = text.lstrip().split("\n", 1)[0].strip()
+        heading = first_line if HEADING.match(first_line) else ""
+        sections.append({"heading": heading, "text": text})
+    return sections
+
+
+def join_sections(sections: List[Dict]) -> str:
+    return "".join(section["text"] for section in sections)
+
+
+def _terms(text: str) -> set:
+    """Content words reduced to a 5-letter stem so 'costs' matches 'costing'"""
+    words = re.findall(r"[a-z0-9][a-z0-9'-]+", text.lower())
+    return {word[:5] for word in words if len(word) > 2 and word not in STOPWORDS}
+
+
+def select_sections(sections: List[Dict], feedback: str) -> List[int]:
+    """Indices of the sections the feedback applies to
+
+    Feedback naming a heading, the introduction or the conclusion targets
+    those sections; otherwise sections are ranked by how many feedback terms
+    they mention. Whole-article feedback, or feedback that matches nothing,
+    selects every section.
+    """
+    lowered = feedback.lower()
+    everything = list(range(len(sections)))
+    if len(sections) <= 1 or GLOBAL_HINT.search(lowered):
+        return everything
+
+    chosen = set()
+    if re.search(r'\bintro(?:duction)?\b|\bopening\b', lowered):
+        chosen.add(0)
+    if re.search(r'\bconclu(?:sion|de|ding)\b|\bending\b|\bsummary\b', lowered):
+        chosen.add(len(sections) - 1)
+
+    wanted = _terms(feedback)
+    scores = []
+    for section in sections:
+        heading_terms = _terms(section["heading"])
+        body_terms = _terms(section["text"])
+        scores.append(3 * len(wanted & heading_terms) + len(wanted & body_terms))
+    best = max(scores)
+    if best > 0:
+        chosen.update(i for i, score in enumerate(scores) if score >= best / 2)
+    return sorted(chosen) or everything
+
+
+def outline(sections: List[Dict]) -> str:
+    """One line per section heading, giving the model context for a single-section rewrite"""
+    return "\n".join(f"{i + 1}. {section['heading'] or '(introduction)'}" for i, section in enumerate(sections))
+
+
+def merge_revision(section: Dict, revised: str) -> str:
+    """Revised section text, keeping the original's heading and trailing spacing"""
+    revised = revised.strip()
+    if section["heading"] and not revised.startswith(section["heading"]):
+        first_line = revised.split("\n", 1)[0].strip()
+        if HEADING.match(first_line):
+            revised = revised.split("\n", 1)[1].lstrip() if "\n" in revised else ""
+        revised = f"{section['heading']}\n\n{revised}"
+    original = section["text"]
+    leading = original[:len(original) - len(original.lstrip())]
+    trailing = original[len(original.rstrip()):]
+    return leading + revised + trailing
@@ -0,0 +1,408 @@
+"""
+Resilient LLM Calls for Multi-Agent Content Creator System
+Retries transient failures (rate limits, timeouts, 5xx) with exponential
+backoff and full jitter, honouring Retry-After; bounds each attempt with a
+timeout; trips a per-model circuit breaker after repeated failures; and can
+hedge a slow call with a duplicate once it outlives the stage's p95 latency.
+When the model is overloaded (or keeps failing) a call can switch to an
+alternate model instead of waiting out the backoff.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError",
+                    "ConnectError", "ReadTimeout", "RemoteProtocolError"}
+# Rate limited or out of capacity (Groq uses 498 for capacity): limits are per model, so another model may answer now
+OVERLOAD_STATUS = {429, 498, 503}
+
+
+class CallTimeout(TimeoutError):
+    """An attempt ran past its per-call timeout"""
+
+
+class CircuitOpenError(RuntimeError):
+    """Calls to a model are short-circuited after repeated failures"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for failures a later attempt may not hit: timeouts, 429s, 5xx, dropped connections"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS:
+        return True
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+def is_overloaded(error: BaseException) -> bool:
+    """True when the model itself is unavailable (rate limited, out of capacity, circuit open)"""
+    if isinstance(error, CircuitOpenError):
+        return True
+    if getattr(error, "status_code", None) in OVERLOAD_STATUS:
+        return True
+    return type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-requested delay from Retry-After / retry-after-ms headers, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class RetryPolicy:
+    """Attempt budget, backoff schedule and per-attempt timeout"""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 timeout: Optional[float] = 60.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        timeout = float(os.getenv("LLM_TIMEOUT", "60"))
+        return cls(
+            max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "4")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "30")),
+            timeout=timeout if timeout > 0 else None
+        )
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)
+
+        Full jitter over an exponentially growing window, but never sooner
+        than the server's Retry-After.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        retry_after = retry_after_seconds(error)
+        return max(backoff, retry_after) if retry_after is not None else backoff
+
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` consecutive failures -> half-open after `reset_after`
+
+    While open every call fails fast with CircuitOpenError; once half-open a
+    single trial call is let through and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self, name: str):
+        """Raise CircuitOpenError unless a call may proceed"""
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_in = max(0.0, self.reset_after - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(f"Circuit open for {name} after {self.failures} failures; retry in {retry_in:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or (self.threshold > 0 and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling per-route (stage and model) latency window used to pick the hedging delay"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(route, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, route: str, pct: float = 95) -> Optional[float]:
+        """None until the route has min_samples observations"""
+        with self._lock:
+            samples = sorted(self._samples.get(route, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(pct / 100 * len(samples)))]
+
+
+class ResilientCaller:
+    """Runs one LLM request with retries, timeouts, circuit breaking and optional hedging
+
+    ``attempt`` callables perform a single request and are invoked once per
+    try, plus once more per hedge. ``admit`` (e.g. a rate-limit wait) runs
+    before each of those requests and is not counted against the timeout;
+    ``abandon`` is called for every request given up on at the timeout or
+    cancelled, so its reservation can be returned. An optional ``fallback``
+    (name, attempt) takes over when the primary model is overloaded or has
+    used up its attempts, with an attempt budget of its own.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, hedge: bool = False,
+                 breaker_threshold: int = 5, breaker_reset: float = 30.0):
+        self.policy = policy or RetryPolicy()
+        self.hedge = hedge
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.latencies = LatencyTracker()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._attempt_pool: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "ResilientCaller":
+        return cls(
+            policy=RetryPolicy.from_env(),
+            hedge=os.getenv("LLM_HEDGE", "off").lower() in ("on", "1", "true", "yes"),
+            breaker_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+            breaker_reset=float(os.getenv("LLM_BREAKER_RESET", "30"))
+        )
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self._breakers[name]
+
+    def _hedge_delay(self, route: str) -> Optional[float]:
+        return self.latencies.percentile(route, 95) if self.hedge else None
+
+    def _should_fall_back(self, error: BaseException, number: int) -> bool:
+        """Switch models at once on overload, or once retrying the primary is exhausted"""
+        return is_overloaded(error) or (is_retryable(error) and number == self.policy.max_attempts)
+
+    def _outcome(self, breaker: CircuitBreaker, route: str, started: float, error: Optional[BaseException]):
+        if error is None:
+            breaker.record_success()
+            self.latencies.record(route, time.monotonic() - started)
+        elif isinstance(error, CircuitOpenError):
+            pass  # short-circuited; nothing was sent
+        elif is_retryable(error):
+            breaker.record_failure()
+        else:
+            breaker.record_success()  # the service answered; the request itself was bad
+
+    def call(self, attempt: Callable, stage: str, name: str, span=None,
+             fallback: Optional[Tuple[str, Callable]] = None, admit: Optional[Callable[[], None]] = None,
+             abandon: Optional[Callable[[], None]] = None):
+        """Synchronous call; each attempt is abandoned once it exceeds the timeout"""
+        breaker = self.breaker(name)
+        number = 1
+        while True:
+            route, started = f"{stage}@{name}", time.monotonic()
+            try:
+                breaker.allow(name)
+                result = self._hedged(attempt, route, span, admit, abandon)
+            except Exception as e:
+                self._outcome(breaker, route, started, e)
+                if fallback is not None and self._should_fall_back(e, number):
+                    self._note_fallback(span, name, fallback[0], e)
+                    (name, attempt), fallback = fallback, None
+                    breaker, number = self.breaker(name), 1
+                    continue
+                if not is_retryable(e) or number == self.policy.max_attempts:
+                    raise
+                delay = self.policy.delay(number, e)
+                self._note_retry(span, number, e, delay)
+                time.sleep(delay)
+                number += 1
+                continue
+            self._outcome(breaker, route, started, None)
+            return result
+
+    def _hedged(self, attempt: Callable, route: str, span, admit: Optional[Callable[[], None]] = None,
+                abandon: Optional[Callable[[], None]] = None):
+        """Run attempt on a worker thread, hedging after the route's p95 and giving up at the timeout
+
+        Only the request itself is timed: admit() returns before the clock
+        starts. A timed-out or losing attempt cannot be interrupted; it
+        finishes in the background and is ended by the HTTP client's own
+        timeout.
+        """
+        delay = self._hedge_delay(route)
+        if admit is not None:
+            admit()
+        if delay is None and self.policy.timeout is None:
+            return attempt()
+        pool = self._pool()
+        started = time.monotonic()
+        hedge_at = started + delay if delay is not None else None
+        deadline = started + self.policy.timeout if self.policy.timeout is not None else None
+        pending = {pool.submit(attempt)}
+        error = None
+        while pending:
+            moments = [moment for moment in (hedge_at, deadline) if moment is not None]
+            timeout = max(0.0, min(moments) - time.monotonic()) if moments else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()  # the loser finishes in the background
+                error = future.exception()
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                for future in pending:
+                    future.cancel()
+                    if abandon is not None:
+                        abandon()
+                raise CallTimeout(f"LLM call exceeded {self.policy.timeout}s")
+            if pending and hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if admit is not None:
+                    admit()
+                    if any(future.done() for future in pending):
+                        if abandon is not None:
+                            abandon()  # answered while the hedge waited for admission
+                        continue
+                if span is not None:
+                    span.set(hedged=True, hedge_after_ms=round(delay * 1000, 3))
+                pending.add(pool.submit(attempt))
+        raise error
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._attempt_pool is None:
+                # Every in-flight sync attempt holds a thread, so size for batch concurrency plus hedges
+                self._attempt_pool = ThreadPoolExecutor(max_workers=256, thread_name_prefix="llm-attempt")
+            return self._attempt_pool
+
+    async def acall(self, attempt: Callable[[], Awaitable], stage: str, name: str, span=None,
+                    fallback: Optional[Tuple[str, Callable[[], Awaitable]]] = None,
+                    admit: Optional[Callable[[], Awaitable]] = None, abandon: Optional[Callable[[], None]] = None):
+        """Asynchronous call; each attempt is cancelled once it exceeds the timeout"""
+        breaker = self.breaker(name)
+        number = 1
+        while True:
+            route, started = f"{stage}@{name}", time.monotonic()
+            try:
+                breaker.allow(name)
+                result = await self._ahedged(attempt, route, span, admit, abandon)
+            except Exception as e:
+                self._outcome(breaker, route, started, e)
+                if fallback is not None and self._should_fall_back(e, number):
+                    self._note_fallback(span, name, fallback[0], e)
+                    (name, attempt), fallback = fallback, None
+                    breaker, number = self.breaker(name), 1
+                    continue
+                if not is_retryable(e) or number == self.policy.max_attempts:
+                    raise
+                delay = self.policy.delay(number, e)
+                self._note_retry(span, number, e, delay)
+                await asyncio.sleep(delay)
+                number += 1
+                continue
+            self._outcome(breaker, route, started, None)
+            return result
+
+    async def _atimed(self, attempt: Callable[[], Awaitable], abandon: Optional[Callable[[], None]] = None):
+        try:
+            return await asyncio.wait_for(attempt(), self.policy.timeout)
+        except asyncio.TimeoutError:
+            if abandon is not None:
+                abandon()
+            raise CallTimeout(f"LLM call exceeded {self.policy.timeout}s") from None
+        except asyncio.CancelledError:
+            if abandon is not None:
+                abandon()
+            raise
+
+    async def _ahedged(self, attempt: Callable[[], Awaitable], route: str, span,
+                       admit: Optional[Callable[[], Awaitable]] = None, abandon: Optional[Callable[[], None]] = None):
+        """Await attempt, hedging after the route's p95; only the request itself is timed"""
+        delay = self._hedge_delay(route)
+        if admit is not None:
+            await admit()
+        if delay is None:
+            return await self._atimed(attempt, abandon)
+        primary = asyncio.ensure_future(self._atimed(attempt, abandon))
+        pending = {primary}
+        error = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and admit is not None:
+                await admit()
+                if primary.done():
+                    if abandon is not None:
+                        abandon()  # answered while the hedge waited for admission
+                    done = {primary}
+            if done:
+                return primary.result()
+            if span is not None:
+                span.set(hedged=True, hedge_after_ms=round(delay * 1000, 3))
+            pending.add(asyncio.ensure_future(self._atimed(attempt, abandon)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _note_retry(self, span, number: int, error: BaseException, delay: float):
+        if span is not None:
+            span.set(retries=number, last_error=f"{type(error).__name__}: {error}")
+        print(f"   ⏳ {type(error).__name__}; retrying in {delay:.1f}s "
+              f"(attempt {number + 1}/{self.policy.max_attempts})")
+
+    def _note_fallback(self, span, name: str, fallback: str, error: BaseException):
+        if span is not None:
+            span.set(fallback_from=name, fallback_reason=f"{type(error).__name__}: {error}")
+        print(f"   🔀 {type(error).__name__} from {name}; falling back to {fallback}")
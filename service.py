@@ -0,0 +1,280 @@
+"""
+HTTP Service Mode for Multi-Agent Content Creator System
+Queues create_content + export_results jobs and runs them on a bounded pool
+of async workers. Clients poll job status and results or stream progress
+events (Server-Sent Events) built from the per-stage tracing spans.
+
+Endpoints:
+    POST /jobs                {"topic": "...", "feedback": "..."} -> 202 {"job_id": ...}
+                              (feedback is optional and is applied once to the finished article)
+    GET  /jobs                recent jobs
+    GET  /jobs/{id}           status and progress
+    GET  /jobs/{id}/result    final article and content package
+    GET  /jobs/{id}/events    text/event-stream of progress events and completed
+                              paragraphs of the draft and edited article
+    GET  /health              queue depth and worker counts
+
+Usage:
+    python main.py --serve [--host 127.0.0.1] [--port 8080] [--concurrency 4]
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+import tracing
+from checkpoints import CheckpointStore
+from streaming import CallbackStream
+
+TERMINAL = ("succeeded", "failed")
+
+
+class Job:
+    """One queued topic, its progress events and its outcome"""
+
+    def __init__(self, topic: str, output_dir: str, checkpoints: CheckpointStore, feedback: Optional[str] = None):
+        self.id = checkpoints.run_id
+        self.topic = topic
+        self.feedback = feedback
+        self.output_dir = output_dir
+        self.checkpoints = checkpoints
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Optional[Dict] = None
+        self.events: List[Dict] = []
+        self._changed = asyncio.Event()
+
+    def emit(self, event: str, **data):
+        """Append a progress event and wake every stream; call on the event loop"""
+        self.events.append({"seq": len(self.events), "event": event, "ts": datetime.now().isoformat(), **data})
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_events(self, seen: int, timeout: float):
+        if len(self.events) <= seen:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def summary(self) -> Dict:
+        finished = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "queue_seconds": round((self.started_at or finished) - self.created_at, 3),
+            "run_seconds": round(finished - self.started_at, 3) if self.started_at else None,
+            "stages_completed": [e["stage"] for e in self.events if e["event"] == "stage" and e.get("ok", True)],
+            "events": len(self.events),
+            "error": self.error,
+            "output_dir": self.output_dir,
+        }
+
+
+class ContentService:
+    """Bounded job queue drained by a fixed number of async workers"""
+
+    def __init__(self, workers: int = 4, queue_size: int = 100, output_root: str = "service_output",
+                 max_iterations: int = 1, keep_jobs: int = 1000, creator_class=None):
+        if creator_class is None:
+            from main import MultiAgentContentCreator as creator_class
+        self.creator_class = creator_class
+        self.workers = workers
+        self.queue_size = queue_size
+        self.output_root = output_root
+        self.max_iterations = max_iterations
+        self.keep_jobs = keep_jobs
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.queue: Optional[asyncio.Queue] = None
+        self.busy = 0
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        os.makedirs(self.output_root, exist_ok=True)
+        tracing.add_listener(self._on_span)
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        tracing.remove_listener(self._on_span)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, topic: str, feedback: Optional[str] = None) -> Job:
+        """Queue a topic; raises asyncio.QueueFull when the backlog is at capacity"""
+        checkpoints = CheckpointStore()
+        output_dir = os.path.join(self.output_root, checkpoints.run_id)
+        job = Job(topic, output_dir, checkpoints, feedback)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            os.rmdir(checkpoints.directory)  # still empty; don't leave a run behind for a rejected topic
+            raise
+        checkpoints.save_run_info(topic=topic, output_dir=output_dir, feedback=feedback)
+        self.jobs[job.id] = job
+        job.emit("queued", position=self.queue.qsize())
+        self._evict()
+        return job
+
+    def _evict(self):
+        """Forget the oldest finished jobs beyond keep_jobs (their files stay on disk)"""
+        excess = len(self.jobs) - self.keep_jobs
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.status in TERMINAL][:max(excess, 0)]:
+            del self.jobs[job_id]
+
+    def _on_span(self, record: Dict):
+        """Route tracing spans to their job as progress events; runs on any thread"""
+        job = self.jobs.get(record.get("trace_id"))
+        if job is not None and self._loop is not None:
+            event = {key: record.get(key) for key in ("stage", "kind", "wall_ms", "ok", "cache_hit", "retries")}
+            self._loop.call_soon_threadsafe(lambda: job.emit("stage", **event))
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            self.busy += 1
+            job.status = "running"
+            job.started_at = time.time()
+            job.emit("started")
+            tracing.set_trace_id(job.id)
+            status, error = "succeeded", None
+            try:
+                os.makedirs(job.output_dir, exist_ok=True)
+                creator = self.creator_class(max_iterations=self.max_iterations, checkpoints=job.checkpoints,
+                                             stream=False)
+                creator.add_stream_consumer(CallbackStream(self._paragraph_emitter(job)))
+                article = await creator.acreate_content(job.topic, feedback=job.feedback)
+                package = await creator.aexport_results(output_dir=job.output_dir)
+                job.result = {"topic": job.topic, "final_article": article, "package": package}
+            except Exception as e:
+                status, error = "failed", f"{type(e).__name__}: {e}"
+            finally:
+                job.finished_at = time.time()
+                self.busy -= 1
+                self.queue.task_done()
+            await asyncio.sleep(0)  # deliver stage events already scheduled by _on_span first
+            job.status, job.error = status, error
+            job.emit(status, error=error, run_seconds=round(job.finished_at - job.started_at, 3))
+
+    def _paragraph_emitter(self, job: Job):
+        """Callback that publishes each completed paragraph as a job event, in order with stage events"""
+        def on_paragraph(stage: str, paragraph: str):
+            self._loop.call_soon_threadsafe(lambda: job.emit("paragraph", stage=stage, text=paragraph))
+        return on_paragraph
+
+    def health(self) -> Dict:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "busy": self.busy, "queued": self.queue.qsize(),
+                "queue_capacity": self.queue_size, "jobs": counts}
+
+
+def _json(data, status: int = 200) -> web.Response:
+    return web.Response(text=json.dumps(data, default=str), status=status, content_type="application/json")
+
+
+def create_app(service: ContentService) -> web.Application:
+    """aiohttp application exposing the job API for one ContentService"""
+    routes = web.RouteTableDef()
+
+    def find(request) -> Job:
+        job = service.jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": "unknown job"}), content_type="application/json")
+        return job
+
+    @routes.post("/jobs")
+    async def create_job(request):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return _json({"error": "body must be JSON"}, 400)
+        topic = str(body.get("topic", "")).strip() if isinstance(body, dict) else ""
+        if not topic:
+            return _json({"error": "'topic' is required"}, 400)
+        feedback = str(body.get("feedback") or "").strip() or None
+        try:
+            job = service.submit(topic, feedback)
+        except asyncio.QueueFull:
+            return _json({"error": "job queue is full, retry later"}, 503)
+        return _json({"job_id": job.id, "status": job.status,
+                      "links": {"status": f"/jobs/{job.id}", "result": f"/jobs/{job.id}/result",
+                                "events": f"/jobs/{job.id}/events"}}, 202)
+
+    @routes.get("/jobs")
+    async def list_jobs(request):
+        return _json([job.summary() for job in reversed(service.jobs.values())])
+
+    @routes.get("/jobs/{job_id}")
+    async def job_status(request):
+        return _json(find(request).summary())
+
+    @routes.get("/jobs/{job_id}/result")
+    async def job_result(request):
+        job = find(request)
+        if job.status == "succeeded":
+            return _json(job.result)
+        if job.status == "failed":
+            return _json({"status": job.status, "error": job.error}, 500)
+        return _json({"status": job.status, "error": "job has not finished"}, 409)
+
+    @routes.get("/jobs/{job_id}/events")
+    async def job_events(request):
+        job = find(request)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        seen = 0
+        while True:
+            for event in job.events[seen:]:
+                await response.write(f"id: {event['seq']}\nevent: {event['event']}\n"
+                                     f"data: {json.dumps(event, default=str)}\n\n".encode("utf-8"))
+            seen = len(job.events)
+            if job.status in TERMINAL and seen == len(job.events):
+                break
+            await job.wait_for_events(seen, timeout=15)
+            if len(job.events) == seen:
+                await response.write(b": keep-alive\n\n")
+        await response.write_eof()
+        return response
+
+    @routes.get("/health")
+    async def health(request):
+        return _json(service.health())
+
+    app = web.Application()
+    app.add_routes(routes)
+
+    async def on_startup(app):
+        await service.start()
+
+    async def on_cleanup(app):
+        await service.stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080, workers: int = 4, output_root: str = "service_output",
+          queue_size: int = 100, creator_class=None):
+    """Run the job service until interrupted"""
+    service = ContentService(workers=workers, queue_size=queue_size, output_root=output_root,
+                             creator_class=creator_class)
+    print(f"\n🌐 Content service on http://{host}:{port} ({workers} workers, queue {queue_size})")
+    web.run_app(create_app(service), host=host, port=port, print=None)
+    return 0
@@ -0,0 +1,175 @@
+"""
+Streaming Output for Multi-Agent Content Creator System
+Consumers that receive a stage's text while the model is still generating
+it: raw tokens as they arrive and, via ParagraphSplitter, each paragraph as
+soon as it is complete, so exporters and service clients can start on the
+beginning of an article before its end has been written.
+"""
+
+import os
+import sys
+from datetime import datetime
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional
+
+from article_document import has_open_fence, parse_article, render_markdown
+
+
+class ParagraphSplitter:
+    """Buffers streamed text and hands out complete (blank-line terminated) paragraphs"""
+
+    def __init__(self, on_paragraph: Callable[[str], None]):
+        self.on_paragraph = on_paragraph
+        self.buffer = ""
+
+    def feed(self, text: str):
+        self.buffer += text
+        while "\n\n" in self.buffer:
+            paragraph, self.buffer = self.buffer.split("\n\n", 1)
+            if paragraph.strip():
+                self.on_paragraph(paragraph.strip())
+
+    def close(self):
+        """Flush the final paragraph, which has no blank line after it"""
+        if self.buffer.strip():
+            self.on_paragraph(self.buffer.strip())
+        self.buffer = ""
+
+
+class StreamConsumer:
+    """Receives one stage's output as it is generated; override the hooks you need"""
+
+    def on_start(self, stage: str):
+        pass
+
+    def on_token(self, stage: str, text: str):
+        pass
+
+    def on_paragraph(self, stage: str, paragraph: str):
+        pass
+
+    def on_end(self, stage: str, text: str):
+        pass
+
+
+class ConsoleStream(StreamConsumer):
+    """Echo tokens to the terminal as they arrive"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def on_start(self, stage: str):
+        (self.stream or sys.stdout).write("\n")
+
+    def on_token(self, stage: str, text: str):
+        out = self.stream or sys.stdout
+        out.write(text)
+        out.flush()
+
+    def on_end(self, stage: str, text: str):
+        (self.stream or sys.stdout).write("\n\n")
+
+
+class MarkdownStream(StreamConsumer):
+    """Append each completed block of a stage to a Markdown file while generation continues
+
+    Blocks are rendered through the document tree, like the Markdown export. A
+    fenced code block is held back until its closing fence, since blank lines
+    inside it do not end it.
+    """
+
+    def __init__(self, path: str, stages: Iterable[str] = ("edit",)):
+        self.path = path
+        self.stages = set(stages)
+        self.pending = ""
+
+    def on_start(self, stage: str):
+        if stage in self.stages:
+            self.pending = ""
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(f"# Article\n\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+    def on_token(self, stage: str, text: str):
+        if stage in self.stages:
+            self.pending += text
+            cut = self.pending.rfind("\n\n")
+            while cut >= 0 and has_open_fence(self.pending[:cut]):
+                cut = self.pending.rfind("\n\n", 0, cut)
+            if cut >= 0:
+                self._write(self.pending[:cut])
+                self.pending = self.pending[cut + 2:]
+
+    def on_end(self, stage: str, text: str):
+        if stage in self.stages:
+            self._write(self.pending)
+            self.pending = ""
+
+    def _write(self, text: str):
+        markdown = render_markdown(parse_article(text))
+        if markdown:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(markdown)
+                f.write("\n")
+
+
+class CallbackStream(StreamConsumer):
+    """Forward completed paragraphs (and optionally tokens) to plain callables"""
+
+    def __init__(self, on_paragraph: Callable[[str, str], None],
+                 on_token: Optional[Callable[[str, str], None]] = None):
+        self._on_paragraph = on_paragraph
+        self._on_token = on_token
+
+    def on_token(self, stage: str, text: str):
+        if self._on_token:
+            self._on_token(stage, text)
+
+    def on_paragraph(self, stage: str, paragraph: str):
+        self._on_paragraph(stage, paragraph)
+
+
+class _Fanout:
+    """Dispatches one stage's chunks to every consumer, each with its own paragraph splitter"""
+
+    def __init__(self, stage: str, consumers: List[StreamConsumer]):
+        self.stage = stage
+        self.consumers = consumers
+        self.splitters = [ParagraphSplitter(lambda p, c=c: c.on_paragraph(stage, p)) for c in consumers]
+        self.parts: List[str] = []
+        for consumer in consumers:
+            consumer.on_start(stage)
+
+    def feed(self, text: str):
+        self.parts.append(text)
+        for consumer, splitter in zip(self.consumers, self.splitters):
+            consumer.on_token(self.stage, text)
+            splitter.feed(text)
+
+    def close(self) -> str:
+        text = "".join(self.parts)
+        for consumer, splitter in zip(self.consumers, self.splitters):
+            splitter.close()
+            consumer.on_end(self.stage, text)
+        return text
+
+
+def relay(chunks: Iterable[str], stage: str, consumers: List[StreamConsumer]) -> Iterator[str]:
+    """Pass chunks through unchanged while feeding them to consumers"""
+    fanout = _Fanout(stage, consumers)
+    for chunk in chunks:
+        fanout.feed(chunk)
+        yield chunk
+    fanout.close()
+
+
+async def arelay(chunks: AsyncIterator[str], stage: str, consumers: List[StreamConsumer]) -> AsyncIterator[str]:
+    """Asynchronous counterpart of relay"""
+    fanout = _Fanout(stage, consumers)
+    async for chunk in chunks:
+        fanout.feed(chunk)
+        yield chunk
+    fanout.close()
+
+
+def stream_enabled() -> bool:
+    return os.getenv("STREAM_OUTPUT", "off").lower() in ("on", "1", "true", "yes")
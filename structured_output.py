@@ -0,0 +1,519 @@
+"""
+Structured Output for Multi-Agent Content Creator System
+Schemas for the JSON payloads agents ask the model for, an incremental JSON
+parser that validates each top-level field of a streamed response as soon
+as it is complete, local syntax repair for the usual model slips (code
+fences, trailing commas, Python literals, truncated output) and a targeted
+repair call that asks the model for only the fields that are still missing
+or invalid. For streamed responses the repair starts as soon as the first
+field fails, while the rest of the response is still being generated.
+"""
+
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+
+
+class StructuredOutputError(ValueError):
+    """A model response could not be turned into a valid payload"""
+
+    def __init__(self, message: str, errors: List[str], partial: Optional[Dict] = None):
+        super().__init__(message)
+        self.errors = errors
+        self.partial = partial
+
+
+class Field:
+    """One expected value: its type, whether it is required, and simple constraints"""
+
+    def __init__(self, kind: type, required: bool = True, items=None, minimum: Optional[float] = None,
+                 maximum: Optional[float] = None, max_length: Optional[int] = None, min_items: int = 0,
+                 description: str = ""):
+        self.kind = kind
+        self.required = required
+        self.items = items
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_length = max_length
+        self.min_items = min_items
+        self.description = description
+
+    def describe(self) -> str:
+        if self.kind is list:
+            inner = self.items.name if isinstance(self.items, Schema) else self.items.__name__
+            text = f"list of {inner}"
+        else:
+            text = {str: "string", float: "number", int: "integer", bool: "boolean"}.get(self.kind, self.kind.__name__)
+        if self.minimum is not None or self.maximum is not None:
+            text += f" {self.minimum}-{self.maximum}"
+        if self.max_length:
+            text += f", at most {self.max_length} characters"
+        if self.description:
+            text += f" ({self.description})"
+        return text
+
+    def coerce(self, value: Any, path: str, errors: List[str]) -> Any:
+        """Value converted to the field's type where that is unambiguous; problems go to errors"""
+        if self.kind in (int, float):
+            if isinstance(value, str):
+                match = re.fullmatch(r'\s*(-?\d+(?:\.\d+)?)\s*%?\s*', value)
+                value = float(match.group(1)) if match else value
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"{path}: expected a number, got {json.dumps(value)[:60]}")
+                return None
+            too_low = self.minimum is not None and value < self.minimum
+            if too_low or (self.maximum is not None and value > self.maximum):
+                errors.append(f"{path}: {value} is outside {self.minimum}-{self.maximum}")
+                return None
+            return int(value) if self.kind is int or float(value).is_integer() else value
+        if self.kind is bool:
+            if isinstance(value, str) and value.lower() in ("true", "false", "yes", "no"):
+                return value.lower() in ("true", "yes")
+            if not isinstance(value, bool):
+                errors.append(f"{path}: expected true or false")
+                return None
+            return value
+        if self.kind is str:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            if not isinstance(value, str) or not value.strip():
+                errors.append(f"{path}: expected non-empty text")
+                return None
+            if self.max_length and len(value) > self.max_length:
+                errors.append(f"{path}: {len(value)} characters, at most {self.max_length} allowed")
+                return None
+            return value.strip()
+        if self.kind is list:
+            if isinstance(value, (str, dict)):
+                value = [value]
+            if not isinstance(value, list):
+                errors.append(f"{path}: expected a list")
+                return None
+            cleaned = []
+            for i, item in enumerate(value):
+                if isinstance(self.items, Schema):
+                    item = self.items.coerce(item, f"{path}[{i}]", errors)
+                else:
+                    item = Field(self.items, max_length=self.max_length).coerce(item, f"{path}[{i}]", errors)
+                if item is not None:
+                    cleaned.append(item)
+            if len(cleaned) < self.min_items:
+                errors.append(f"{path}: expected at least {self.min_items} item(s)")
+                return None
+            return cleaned
+        return value
+
+
+class Schema:
+    """Named set of fields; validate() returns a cleaned copy and a list of problems"""
+
+    def __init__(self, name: str, fields: Dict[str, Field], primary: Optional[str] = None):
+        self.name = name
+        self.fields = fields
+        # A bare string where an object is expected is read as this field
+        self.primary = primary
+
+    def describe(self) -> str:
+        return "\n".join(f"- {key}: {spec.describe()}{'' if spec.required else ' (optional)'}"
+                         for key, spec in self.fields.items())
+
+    def coerce(self, value: Any, path: str, errors: List[str]) -> Optional[Dict]:
+        if isinstance(value, str) and self.primary:
+            value = {self.primary: value}
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object")
+            return None
+        item_errors: List[str] = []
+        cleaned = self.validate_fields(value, item_errors, prefix=f"{path}.")
+        errors.extend(item_errors)
+        return None if item_errors else cleaned
+
+    def validate_field(self, key: str, value: Any, errors: List[str], prefix: str = "") -> Any:
+        spec = self.fields.get(key)
+        if spec is None:
+            return value
+        return spec.coerce(value, f"{prefix}{key}", errors)
+
+    def validate_fields(self, data: Dict, errors: List[str], prefix: str = "") -> Dict:
+        """Cleaned copy of data; invalid optional fields are dropped rather than reported"""
+        cleaned = {}
+        for key, value in data.items():
+            spec = self.fields.get(key)
+            field_errors: List[str] = []
+            value = self.validate_field(key, value, field_errors, prefix)
+            if spec is None or spec.required:
+                errors.extend(field_errors)
+            if value is not None:
+                cleaned[key] = value
+        for key, spec in self.fields.items():
+            if spec.required and key not in data:
+                errors.append(f"{prefix}{key}: missing")
+        return cleaned
+
+    def validate(self, data: Any) -> Tuple[Dict, List[str]]:
+        errors: List[str] = []
+        if not isinstance(data, dict):
+            return {}, ["response is not a JSON object"]
+        return self.validate_fields(data, errors), errors
+
+
+VERIFIED_CLAIM = Schema("verified claim", {
+    "claim": Field(str),
+    "confidence": Field(float, required=False, minimum=0, maximum=100),
+    "source": Field(str, required=False),
+    "verified": Field(bool, required=False),
+}, primary="claim")
+
+UNVERIFIED_CLAIM = Schema("unverified claim", {
+    "claim": Field(str),
+    "reason": Field(str, required=False),
+    "needs_source": Field(bool, required=False),
+}, primary="claim")
+
+FACT_CHECK_SCHEMA = Schema("fact-check result", {
+    "verified_claims": Field(list, items=VERIFIED_CLAIM),
+    "unverified_claims": Field(list, items=UNVERIFIED_CLAIM),
+    "overall_accuracy": Field(float, minimum=0, maximum=100, description="percentage"),
+    "improvements": Field(list, items=str, required=False),
+})
+
+SOCIAL_SCHEMA = Schema("social media package", {
+    "twitter_thread": Field(list, items=str, max_length=280, min_items=1),
+    "linkedin_post": Field(str, max_length=3000),
+    "instagram_caption": Field(str, max_length=2200),
+    "email_subject": Field(str, max_length=150),
+    "email_preview": Field(str, max_length=150),
+    "hashtags": Field(list, items=str, min_items=1),
+    "key_quote": Field(str),
+})
+
+
+class IncrementalJSONParser:
+    """Finds the first JSON object in a stream of text chunks
+
+    Text before the object (prose, code fences) is skipped. Each top-level
+    member is decoded as soon as its value ends and passed to ``on_field``,
+    so a schema can flag a bad field while the rest is still arriving.
+    """
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.on_field = on_field
+        self.buffer = ""
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.fields: Dict[str, Any] = {}
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: Optional[int] = None
+        self._scanned = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def feed(self, chunk: str):
+        self.buffer += chunk
+        if self.complete:
+            return
+        for position in range(self._scanned, len(self.buffer)):
+            char = self.buffer[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if self.start is None:
+                if char == "{":
+                    self.start = position
+                    self._depth = 1
+                    self._member_start = position + 1
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_member(position)
+                    self.end = position + 1
+                    self._scanned = position + 1
+                    return
+            elif char == "," and self._depth == 1:
+                self._finish_member(position)
+                self._member_start = position + 1
+        self._scanned = len(self.buffer)
+
+    def _finish_member(self, position: int):
+        member = self.buffer[self._member_start:position].strip()
+        if not member:
+            return
+        try:
+            decoded = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return  # left for close() and repair to deal with
+        for key, value in decoded.items():
+            self.fields[key] = value
+            if self.on_field:
+                self.on_field(key, value)
+
+    def close(self) -> Dict:
+        """The parsed object; locally repaired when it is malformed or was cut off"""
+        if self.start is None:
+            raise StructuredOutputError("no JSON object in response", ["response contains no JSON object"])
+        text = self.buffer[self.start:self.end] if self.complete else self.buffer[self.start:]
+        for candidate in (text, repair_json(text)):
+            try:
+                data = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                return data
+        if self.fields:
+            return dict(self.fields)
+        raise StructuredOutputError("JSON object could not be parsed", ["response JSON is malformed"])
+
+
+def repair_json(text: str) -> str:
+    """Fix common syntax slips: fences, smart quotes, Python literals, trailing commas, truncation"""
+    text = re.sub(r'^```(?:json)?\s*|\s*```\s*$', '', text.strip())
+    text = text.replace("“", '"').replace("”", '"')
+    text = re.sub(r'(?<=[:\[,\s])(True|False|None)(?=\s*[,}\]])',
+                  lambda m: {"True": "true", "False": "false", "None": "null"}[m.group(1)], text)
+    text = re.sub(r',\s*([}\]])', r'\1', text)
+
+    # Close whatever a truncated response left open
+    stack = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+    if in_string:
+        text += '"'
+    if stack:
+        text = re.sub(r',\s*"[^"]*"\s*:?\s*$|,\s*$|:\s*$', '', text.rstrip())
+        text += "".join(reversed(stack))
+    return text
+
+
+class StructuredStream:
+    """Validates a response against a schema while its chunks arrive
+
+    ``field_errors`` fills in as soon as a top-level field is complete, so a
+    streaming caller can stop early; result() validates the whole object.
+    """
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.field_errors: Dict[str, List[str]] = {}
+        self.parser = IncrementalJSONParser(on_field=self._check)
+
+    def _check(self, key: str, value: Any):
+        spec = self.schema.fields.get(key)
+        if spec is None or not spec.required:
+            return  # invalid optional fields are dropped, not repaired
+        errors: List[str] = []
+        self.schema.validate_field(key, value, errors)
+        if errors:
+            self.field_errors[key] = errors
+
+    @property
+    def errors(self) -> List[str]:
+        return [error for errors in self.field_errors.values() for error in errors]
+
+    def feed(self, chunk: str):
+        self.parser.feed(chunk)
+
+    def result(self) -> Tuple[Dict, List[str]]:
+        """(cleaned data, problems) for everything received"""
+        try:
+            data = self.parser.close()
+        except StructuredOutputError as e:
+            return {}, e.errors
+        return self.schema.validate(data)
+
+
+def parse_structured(text: str, schema: Schema) -> Tuple[Dict, List[str]]:
+    """Parse and validate a complete response; returns (cleaned data, problems)"""
+    stream = StructuredStream(schema)
+    stream.feed(text)
+    return stream.result()
+
+
+def _repair_prompt() -> "PromptTemplate":
+    from langchain.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["name", "errors", "document", "fields"],
+        template="""A model was asked for a {name} as JSON, but its answer has problems:
+{errors}
+
+Answer so far:
+{document}
+
+Return a JSON object containing only these corrected fields, and nothing else:
+{fields}"""
+    )
+
+
+def _repair_inputs(schema: Schema, text: str, data: Dict, errors: List[str]) -> Dict:
+    broken = {error.split(":", 1)[0].split(".", 1)[0].split("[", 1)[0] for error in errors}
+    broken &= set(schema.fields)
+    if not data or not broken:
+        broken = set(schema.fields)
+    document = json.dumps(data, indent=2) if data else text.strip()[:4000]
+    fields = "\n".join(f"- {key}: {schema.fields[key].describe()}" for key in schema.fields if key in broken)
+    return {"name": schema.name, "errors": "\n".join(f"- {error}" for error in errors[:20]),
+            "document": document, "fields": fields}
+
+
+def _merge_repair(schema: Schema, data: Dict, reply: str) -> Tuple[Dict, List[str]]:
+    patch, _ = parse_structured(reply, Schema(schema.name, {
+        key: Field(spec.kind, required=False, items=spec.items, minimum=spec.minimum, maximum=spec.maximum,
+                   max_length=spec.max_length, min_items=spec.min_items)
+        for key, spec in schema.fields.items()
+    }))
+    merged = {**data, **patch}
+    cleaned, errors = schema.validate(merged)
+    return cleaned, errors
+
+
+def _repair_attempts() -> int:
+    return int(os.getenv("STRUCTURED_REPAIR_ATTEMPTS", "1"))
+
+
+def _announce(stage: str, errors: List[str]):
+    print(f"   🩹 {stage} response had {len(errors)} problem(s) ({errors[0]}); requesting a targeted fix")
+
+
+def _request_repair(schema: Schema, text: str, data: Dict, errors: List[str], stage: str) -> str:
+    from llm_backends import get_llm
+    from llm_client import invoke_llm
+    _announce(stage, errors)
+    return invoke_llm(get_llm(stage, json_mode=True), _repair_prompt(),
+                      _repair_inputs(schema, text, data, errors), f"{stage}_repair")
+
+
+async def _arequest_repair(schema: Schema, text: str, data: Dict, errors: List[str], stage: str) -> str:
+    from llm_backends import get_llm
+    from llm_client import ainvoke_llm
+    _announce(stage, errors)
+    return await ainvoke_llm(get_llm(stage, json_mode=True), _repair_prompt(),
+                             _repair_inputs(schema, text, data, errors), f"{stage}_repair")
+
+
+def _repaired(schema: Schema, text: str, data: Dict, errors: List[str], stage: str, attempts: int) -> Dict:
+    for _ in range(attempts):
+        if not errors:
+            break
+        data, errors = _merge_repair(schema, data, _request_repair(schema, text, data, errors, stage))
+    if errors:
+        raise StructuredOutputError(f"invalid {schema.name}: {errors[0]}", errors, data)
+    return data
+
+
+async def _arepaired(schema: Schema, text: str, data: Dict, errors: List[str], stage: str, attempts: int) -> Dict:
+    for _ in range(attempts):
+        if not errors:
+            break
+        data, errors = _merge_repair(schema, data, await _arequest_repair(schema, text, data, errors, stage))
+    if errors:
+        raise StructuredOutputError(f"invalid {schema.name}: {errors[0]}", errors, data)
+    return data
+
+
+def structured(text: str, schema: Schema, stage: str) -> Dict:
+    """Validated payload from a model response, repairing it with a short follow-up call if needed
+
+    Raises StructuredOutputError when the payload is still invalid.
+    """
+    data, errors = parse_structured(text, schema)
+    return _repaired(schema, text, data, errors, stage, _repair_attempts())
+
+
+async def astructured(text: str, schema: Schema, stage: str) -> Dict:
+    """Asynchronous counterpart of structured"""
+    data, errors = parse_structured(text, schema)
+    return await _arepaired(schema, text, data, errors, stage, _repair_attempts())
+
+
+def _early_repair_failed(stage: str, error: Exception):
+    """The early repair is only a head start; validation carries on without it"""
+    print(f"   ⚠️  Early {stage} repair failed ({type(error).__name__}: {error}); validating the full response")
+
+
+def structured_stream(chunks: Iterator[str], schema: Schema, stage: str) -> Dict:
+    """Validated payload from a streamed model response
+
+    Each top-level field is checked as soon as it is complete. The first
+    invalid one starts the targeted repair call on a worker thread while the
+    rest of the response streams in; its fix is merged once the stream ends,
+    and any problems left after that (or all of them, if the early call
+    failed) go through the usual repair loop.
+    """
+    from tracing import bind_trace
+    stream = StructuredStream(schema)
+    attempts = _repair_attempts()
+    pool = early = None
+    try:
+        for chunk in chunks:
+            stream.feed(chunk)
+            if early is None and attempts > 0 and stream.field_errors:
+                pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="structured-repair")
+                early = pool.submit(bind_trace(_request_repair), schema, stream.parser.buffer,
+                                    dict(stream.parser.fields), stream.errors, stage)
+        data, errors = stream.result()
+        if early is not None:
+            try:
+                data, errors = _merge_repair(schema, data, early.result())
+                attempts -= 1
+            except Exception as e:
+                _early_repair_failed(stage, e)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False)
+    return _repaired(schema, stream.parser.buffer, data, errors, stage, attempts)
+
+
+async def astructured_stream(chunks: AsyncIterator[str], schema: Schema, stage: str) -> Dict:
+    """Asynchronous counterpart of structured_stream; the early repair runs as a task"""
+    stream = StructuredStream(schema)
+    attempts = _repair_attempts()
+    early = None
+    try:
+        async for chunk in chunks:
+            stream.feed(chunk)
+            if early is None and attempts > 0 and stream.field_errors:
+                early = asyncio.ensure_future(_arequest_repair(schema, stream.parser.buffer,
+                                                               dict(stream.parser.fields), stream.errors, stage))
+        data, errors = stream.result()
+        if early is not None:
+            try:
+                data, errors = _merge_repair(schema, data, await early)
+                attempts -= 1
+            except Exception as e:
+                _early_repair_failed(stage, e)
+    finally:
+        if early is not None and not early.done():
+            early.cancel()
+    return await _arepaired(schema, stream.parser.buffer, data, errors, stage, attempts)
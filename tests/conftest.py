@@ -0,0 +1,46 @@
+"""Shared fixtures: an offline pipeline whose files all live in a temporary directory"""
+
+import pytest
+
+import claim_index
+import llm_backends
+import llm_client
+import memory_store
+import tracing
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    """Fake LLM backend, no response cache, tracing or persistent stores; cwd is tmp_path
+
+    Settings main() writes to os.environ are registered here first so they are
+    restored after the test.
+    """
+    monkeypatch.chdir(tmp_path)
+    settings = {
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_MS": "0",
+        "FAKE_LLM_WORDS": "200",
+        "CHECKPOINT_DIR": str(tmp_path / "checkpoints"),
+        "MEMORY_STORE": "off",
+        "CLAIM_INDEX": "off",
+        "RESEARCH_REUSE": "off",
+        "WRITER_MODE": "single",
+        "STREAM_OUTPUT": "off",
+        "SPECULATIVE_OUTPUTS": "off",
+        "MODEL_ROUTING": "off",
+    }
+    for name, value in settings.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(llm_client, "_cache", None)
+    monkeypatch.setattr(llm_client, "_cache_loaded", True)
+    monkeypatch.setattr(llm_client, "rate_limiter", llm_client.RateLimiter())
+    monkeypatch.setattr(llm_client, "resilient_caller", llm_client.resilient_caller)
+    monkeypatch.setattr(tracing, "tracer", tracing.Tracer(None))
+    monkeypatch.setattr(memory_store, "_store", None)
+    monkeypatch.setattr(memory_store, "_store_loaded", True)
+    monkeypatch.setattr(claim_index, "_index", None)
+    monkeypatch.setattr(claim_index, "_index_loaded", True)
+    llm_backends.registry.clear()
+    yield tmp_path
+    llm_backends.registry.clear()
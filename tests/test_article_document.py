@@ -0,0 +1,134 @@
+"""The document tree: Markdown round trips and every export format showing the same content"""
+
+from html.parser import HTMLParser
+
+import pytest
+
+from article_document import Block, Span, has_open_fence, parse_article, parse_inline, render_markdown
+from content_tools import MultiFormatExporter
+
+ARTICLE = (
+    "## Running costs\n\n"
+    "Panels are **cheap *and* clean** today.\n\n"
+    "3. Survey the roof\n"
+    "4. Install the inverter\n\n"
+    "| Part | Price |\n"
+    "|:--|--:|\n"
+    "| Panel | 200 USD |\n"
+    "| Battery | 900 USD |\n\n"
+    "```python\n"
+    "output = panels * hours\n"
+    "\n"
+    "    total = output\n"
+    "```\n\n"
+    "- Quiet\n"
+    "- Low upkeep"
+)
+
+
+@pytest.mark.parametrize("text", [
+    ARTICLE,
+    "**bold *nested* bold** and ***both*** then *italic **inner***",
+    "2*3 is six, a\\b is a path and \\*stars\\* stay literal",
+    "## Ends with C#\n\n## Trailing \\#\n\n**Bold line**\n\n**Key:** value",
+    "1\\. not a list\n\n\\- not a bullet\n\n\\# not a heading\n\n\\*\\*\\*",
+    "7. seven\n8. eight\n\n- - -\n\n* - -\n\n* ---|---",
+    "| a \\| b | **c** |\n|---|:-:|\n| 1 |\n| 2 | 3 | 4 |",
+    "````md\n```\ninner fence\n```\n\n````\n\n~~~\nunclosed",
+])
+def test_rendered_markdown_parses_back_to_the_same_tree(text):
+    tree = parse_article(text)
+    assert parse_article(render_markdown(tree)) == tree
+
+
+def test_emphasis_nests_and_escapes():
+    assert parse_inline("**a *b* c**") == (Span("a ", bold=True), Span("b", bold=True, italic=True),
+                                           Span(" c", bold=True))
+    assert parse_inline("**x*y**") == (Span("x*y", bold=True),)
+    assert parse_inline("\\*not\\* *yes*") == (Span("*not* "), Span("yes", italic=True))
+
+
+def test_tables_code_and_list_numbers_are_kept():
+    blocks = parse_article(ARTICLE)
+    assert [block.kind for block in blocks] == ["heading", "paragraph", "list", "table", "code", "list"]
+    assert blocks[2].start == 3
+    assert blocks[3].aligns == ("left", "right")
+    assert [[parse_text(cell) for cell in row] for row in blocks[3].rows] == [
+        ["Part", "Price"], ["Panel", "200 USD"], ["Battery", "900 USD"]]
+    assert blocks[4] == Block("code", code="output = panels * hours\n\n    total = output", info="python")
+
+
+def test_open_fence_is_detected():
+    assert has_open_fence("Intro\n\n```\ncode\n\nmore")
+    assert not has_open_fence("```\ncode\n```\n\nAfter")
+
+
+def parse_text(spans):
+    return "".join(span.text for span in spans)
+
+
+def expected_texts():
+    """Text every format must show: each span of the headings, paragraphs, list items and table cells, and the code lines
+
+    Spans are checked one by one because PDF writes each bold or italic run separately.
+    """
+    runs = []
+    for block in parse_article(ARTICLE):
+        if block.kind == "list":
+            runs += [span for item in block.items for span in item]
+        elif block.kind == "table":
+            runs += [span for row in block.rows for cell in row for span in cell]
+        elif block.kind == "code":
+            runs += [Span(line) for line in block.code.splitlines()]
+        else:
+            runs += block.spans
+    return [span.text.strip() for span in runs if span.text.strip()]
+
+
+class _TextCollector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.text = []
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+
+def test_formats_show_the_same_document(tmp_path, monkeypatch):
+    from docx import Document
+    from reportlab import rl_config
+
+    monkeypatch.setattr(rl_config, "pageCompression", 0)  # keep PDF text searchable
+    exporter = MultiFormatExporter()
+    paths = {fmt: str(tmp_path / f"article.{fmt}") for fmt in ("md", "html", "docx", "pdf")}
+    exporter.export_to_markdown(ARTICLE, paths["md"])
+    exporter.export_to_html(ARTICLE, paths["html"])
+    exporter.export_to_docx(ARTICLE, paths["docx"])
+    assert exporter.export_to_pdf(ARTICLE, paths["pdf"]) == paths["pdf"]
+
+    with open(paths["md"], encoding="utf-8") as f:
+        markdown = f.read()
+    assert parse_article(markdown.split("\n\n", 2)[2]) == parse_article(ARTICLE)
+
+    collector = _TextCollector()
+    with open(paths["html"], encoding="utf-8") as f:
+        html = f.read()
+    collector.feed(html)
+    html_text = "".join(collector.text)
+    assert '<ol start="3">' in html and '<th style="text-align: left">' in html
+    assert '<pre><code class="language-python">' in html and "<strong><em>and</em></strong>" in html
+
+    document = Document(paths["docx"])
+    docx_text = "\n".join([p.text for p in document.paragraphs] +
+                          [cell.text for table in document.tables for row in table.rows for cell in row.cells])
+    assert [[cell.text for cell in row.cells] for row in document.tables[0].rows] == [
+        ["Part", "Price"], ["Panel", "200 USD"], ["Battery", "900 USD"]]
+
+    with open(paths["pdf"], "rb") as f:
+        pdf = f.read().decode("latin-1")
+    assert "3." in pdf and "4." in pdf
+
+    for text in expected_texts():
+        assert text in html_text
+        assert text in docx_text
+        assert text in pdf
@@ -0,0 +1,53 @@
+"""Stage checkpoints and --resume"""
+
+import os
+
+import pytest
+
+from checkpoints import CheckpointStore, run_stage
+
+
+def test_run_stage_restores_instead_of_producing(tmp_path):
+    store = CheckpointStore(root=str(tmp_path))
+    restored = []
+    assert run_stage(store, "research", lambda: "notes") == "notes"
+    assert run_stage(store, "research", lambda: pytest.fail("should be restored"), restored.append) == "notes"
+    assert restored == ["notes"]
+
+
+def test_run_stage_never_checkpoints_none(tmp_path):
+    store = CheckpointStore(root=str(tmp_path))
+    run_stage(store, "draft", lambda: None)
+    assert not store.has("draft")
+
+
+def test_open_unknown_run(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        CheckpointStore.open("missing", root=str(tmp_path))
+
+
+def test_resume_reruns_from_first_missing_stage(offline, monkeypatch):
+    import main
+
+    store = CheckpointStore()
+    store.save_run_info(topic="Solar power", output_dir=str(offline))
+    creator = main.MultiAgentContentCreator(max_iterations=1, checkpoints=store, stream=False)
+    creator.create_content("Solar power")
+    stages = ["iteration1_research", "iteration1_draft", "iteration1_edit"]
+    assert all(store.has(stage) for stage in stages)
+    research = store.load("iteration1_research")
+    for stage in stages[1:]:
+        os.remove(os.path.join(store.directory, f"{stage}.json"))
+
+    ran = []
+    write, edit = main.WriterAgent.write, main.EditorAgent.edit
+    monkeypatch.setattr(main.ResearcherAgent, "research", lambda self, topic: pytest.fail("research was checkpointed"))
+    monkeypatch.setattr(main.WriterAgent, "write", lambda self, *args: ran.append("draft") or write(self, *args))
+    monkeypatch.setattr(main.EditorAgent, "edit", lambda self, *args: ran.append("edit") or edit(self, *args))
+    monkeypatch.setattr(main.MultiAgentContentCreator, "display_results", lambda self: None)
+    monkeypatch.setattr(main.MultiAgentContentCreator, "export_results", lambda self, **options: None)
+
+    assert main.main(["--resume", store.run_id]) is None
+    assert ran == ["draft", "edit"]
+    assert all(store.has(stage) for stage in stages)
+    assert store.load("iteration1_research") == research
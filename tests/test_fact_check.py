@@ -0,0 +1,88 @@
+"""Chunking, claim extraction and result merging used by the fact-checker"""
+
+import claim_index
+from content_tools import FactCheckingAgent, extract_claims, merge_verifications, split_article
+
+
+def test_split_article_keeps_short_article_whole():
+    article = "# Title\n\nFirst paragraph.\n\nSecond paragraph."
+    assert split_article(article, max_chars=3000) == [article]
+
+
+def test_split_article_packs_paragraphs_up_to_limit():
+    paragraphs = [f"Paragraph {i} " + "word " * 15 for i in range(6)]
+    chunks = split_article("\n\n".join(paragraphs), max_chars=200)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    # No paragraph is split across chunks, and none is lost or reordered
+    assert "\n\n".join(chunks).split("\n\n") == [p.strip() for p in paragraphs]
+
+
+def test_split_article_breaks_long_paragraph_between_sentences():
+    sentences = [f"Sentence number {i} has a handful of words in it." for i in range(10)]
+    chunks = split_article(" ".join(sentences), max_chars=120)
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    for chunk in chunks:
+        assert chunk.endswith(".")
+    assert " ".join(chunks) == " ".join(sentences)
+
+
+def test_split_article_cuts_sentence_longer_than_limit():
+    chunks = split_article("x" * 250, max_chars=100)
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+
+
+def test_extract_claims_picks_factual_sentences_once():
+    article = (
+        "## Market Overview\n\n"
+        "The market grew 12% in 2023 according to analysts.\n"
+        "This is a nice thing to read about.\n"
+        "**The market grew 12% in 2023 according to analysts.**\n"
+        "Short 5%.\n"
+        "Reports from Gartner describe steady adoption across industries."
+    )
+    assert extract_claims(article) == [
+        "The market grew 12% in 2023 according to analysts.",
+        "Reports from Gartner describe steady adoption across industries.",
+    ]
+
+
+def test_merge_verifications_weights_accuracy_by_chunk_length():
+    results = [{"overall_accuracy": 90}, {"overall_accuracy": 60}]
+    assert merge_verifications(results, [3000, 1000])["overall_accuracy"] == 82
+
+
+def test_merge_verifications_skips_missing_accuracy():
+    results = [{"overall_accuracy": 70}, {"overall_accuracy": None}, {"overall_accuracy": "n/a"}]
+    assert merge_verifications(results, [1, 5, 5])["overall_accuracy"] == 70
+    assert merge_verifications([{}], [1])["overall_accuracy"] is None
+
+
+def test_merge_verifications_collapses_duplicate_claims():
+    results = [
+        {"verified_claims": [{"claim": "Sales rose 5%.", "confidence": 60}],
+         "unverified_claims": [{"claim": "Prices fell in May."}],
+         "improvements": ["Cite sources"]},
+        {"verified_claims": [{"claim": "sales rose 5%", "confidence": 90},
+                             {"claim": "Prices fell in May", "confidence": 70}],
+         "unverified_claims": [],
+         "improvements": ["Cite sources", "Add dates"]},
+    ]
+    merged = merge_verifications(results, [1, 1])
+    assert merged["verified_claims"] == [{"claim": "sales rose 5%", "confidence": 90},
+                                         {"claim": "Prices fell in May", "confidence": 70}]
+    # Verified in one chunk, so no longer reported as unverified
+    assert merged["unverified_claims"] == []
+    assert merged["improvements"] == ["Cite sources", "Add dates"]
+
+
+def test_claim_mode_agents_share_one_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAIM_INDEX_PATH", str(tmp_path / "claims.sqlite"))
+    monkeypatch.delenv("CLAIM_INDEX", raising=False)
+    monkeypatch.setattr(claim_index, "_index", None)
+    monkeypatch.setattr(claim_index, "_index_loaded", False)
+    agents = [FactCheckingAgent(extract_claims=True) for _ in range(3)]
+    assert agents[0].claim_index is not None
+    assert all(agent.claim_index is agents[0].claim_index for agent in agents)
+    assert FactCheckingAgent(extract_claims=False).claim_index is None
+    agents[0].claim_index.close()
@@ -0,0 +1,161 @@
+"""Model registry backends: the shared Groq transport and overload fallback between models"""
+
+import asyncio
+from typing import ClassVar, List
+
+import pytest
+
+import llm_backends
+import llm_client
+from fake_llm import FakeChatModel
+from llm_backends import DEFAULT_MODEL, SMALL_MODEL, GroqTransport, fallback_model, get_llm, registry
+from resilience import ResilientCaller, RetryPolicy
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    transport = GroqTransport()
+    yield transport
+    transport.close()
+
+
+def test_each_event_loop_gets_its_own_async_pool(transport):
+    async def clients():
+        first, second = transport.async_groq(), transport.async_groq()
+        assert first is second
+        return first
+
+    one, two = asyncio.run(clients()), asyncio.run(clients())
+    assert one is not two
+    # The pool of the first, now closed, loop was dropped when the second was made
+    assert [client for _, client in transport._async_clients.values()] == [two]
+
+
+def test_aclose_closes_every_loop_pool(transport):
+    async def pool():
+        transport.async_groq()
+        return asyncio.get_running_loop()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(pool())
+        asyncio.run(pool())
+        pools = [http_client for http_client, _ in transport._async_clients.values()]
+        assert len(pools) == 2
+        loop.run_until_complete(transport.aclose())
+    finally:
+        loop.close()
+    assert all(http_client.is_closed for http_client in pools)
+    assert transport._async_clients == {}
+
+
+def test_completions_dispatch_to_the_calling_loop(transport, monkeypatch):
+    calls = []
+
+    class Completions:
+        async def create(self, **kwargs):
+            calls.append((asyncio.get_running_loop(), kwargs))
+            return "response"
+
+    class Client:
+        def __init__(self):
+            self.chat = type("Chat", (), {"completions": Completions()})()
+
+    monkeypatch.setattr(transport, "async_groq", Client)
+    assert asyncio.run(transport.async_completions.create(model="m")) == "response"
+    assert asyncio.run(transport.async_completions.create(model="n")) == "response"
+    assert [kwargs for _, kwargs in calls] == [{"model": "m"}, {"model": "n"}]
+    assert calls[0][0] is not calls[1][0]
+
+
+@pytest.fixture
+def no_fallback_settings(monkeypatch):
+    for name in ("GROQ_MODEL", "GROQ_FALLBACK_MODEL", "GROQ_FALLBACK_MODEL_WRITE", "GROQ_FALLBACK_MODEL_SOCIAL"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_large_and_small_models_stand_in_for_each_other(no_fallback_settings, monkeypatch):
+    assert fallback_model("write", DEFAULT_MODEL) == SMALL_MODEL
+    assert fallback_model("social", SMALL_MODEL) == DEFAULT_MODEL
+    monkeypatch.setenv("GROQ_MODEL", "llama-custom")
+    assert fallback_model("social", SMALL_MODEL) == "llama-custom"
+
+
+def test_fallback_model_settings(no_fallback_settings, monkeypatch):
+    monkeypatch.setenv("GROQ_FALLBACK_MODEL_WRITE", "off")
+    assert fallback_model("write", DEFAULT_MODEL) is None
+    assert fallback_model("edit", DEFAULT_MODEL) == SMALL_MODEL
+    monkeypatch.setenv("GROQ_FALLBACK_MODEL", "mixtral")
+    assert fallback_model("edit", DEFAULT_MODEL) == "mixtral"
+    assert fallback_model("edit", "mixtral") is None  # never falls back to itself
+    monkeypatch.setenv("GROQ_FALLBACK_MODEL", "off")
+    assert fallback_model("edit", DEFAULT_MODEL) is None
+
+
+class RateLimitError(Exception):
+    """Named like the SDK's 429 error, which resilience treats as an overloaded model"""
+
+
+class RecordingModel(FakeChatModel):
+    """Fake model that records which model served each call; overloaded models refuse them"""
+
+    calls: ClassVar[List[str]] = []
+    overloaded: bool = False
+
+    def _refuse(self):
+        RecordingModel.calls.append(self.model_name)
+        if self.overloaded:
+            raise RateLimitError(f"{self.model_name} is over capacity")
+
+    def _generate(self, *args, **kwargs):
+        self._refuse()
+        return super()._generate(*args, **kwargs)
+
+    async def _agenerate(self, *args, **kwargs):
+        self._refuse()
+        return await super()._agenerate(*args, **kwargs)
+
+
+@pytest.fixture
+def overloaded(offline, no_fallback_settings, monkeypatch):
+    """Route stages through RecordingModel; the returned set names the overloaded models"""
+    busy = set()
+
+    def backend(model, temperature, max_tokens, json_mode=False):
+        return RecordingModel.from_env(model_name=model, temperature=temperature, max_tokens=max_tokens,
+                                       overloaded=model in busy)
+
+    monkeypatch.setitem(llm_backends._BACKENDS, "recording", backend)
+    monkeypatch.setenv("LLM_BACKEND", "recording")
+    monkeypatch.setenv("MODEL_ROUTING", "on")
+    monkeypatch.setattr(RecordingModel, "calls", [])
+    monkeypatch.setattr(llm_client, "resilient_caller", ResilientCaller(RetryPolicy(max_attempts=1)))
+    return busy
+
+
+def prompt():
+    from langchain.prompts import PromptTemplate
+    return PromptTemplate(input_variables=["topic"], template="Write about {topic}")
+
+
+def test_overloaded_large_model_moves_to_the_small_one(overloaded):
+    overloaded.add(DEFAULT_MODEL)
+    assert llm_client.invoke_llm(get_llm("write"), prompt(), {"topic": "solar"}, "write")
+    assert RecordingModel.calls == [DEFAULT_MODEL, SMALL_MODEL]
+
+
+def test_overloaded_small_model_moves_to_the_large_one(overloaded):
+    overloaded.add(SMALL_MODEL)
+    llm = get_llm("social")
+    assert asyncio.run(llm_client.ainvoke_llm(llm, prompt(), {"topic": "solar"}, "social"))
+    assert RecordingModel.calls == [SMALL_MODEL, DEFAULT_MODEL]
+
+
+def test_fallback_off_for_a_stage_surfaces_the_overload(overloaded, monkeypatch):
+    overloaded.add(DEFAULT_MODEL)
+    monkeypatch.setenv("GROQ_FALLBACK_MODEL_WRITE", "off")
+    with pytest.raises(RateLimitError):
+        llm_client.invoke_llm(get_llm("write"), prompt(), {"topic": "solar"}, "write")
+    assert RecordingModel.calls == [DEFAULT_MODEL]
+    assert registry.fallback(get_llm("edit"), "edit").model_name == SMALL_MODEL
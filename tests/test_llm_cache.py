@@ -0,0 +1,109 @@
+"""Response cache hits, expiry, eviction and keys"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, cache_from_env
+from llm_client import _cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+def make_cache(tmp_path, **options):
+    return LLMCache(str(tmp_path / "cache.sqlite"), **options)
+
+
+def test_hit_and_miss(tmp_path):
+    cache = make_cache(tmp_path)
+    key = LLMCache.make_key("prompt", "model", 0.7, 100)
+    assert cache.get(key) is None
+    cache.set(key, "answer")
+    assert cache.get(key) == "answer"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_survive_reopening(tmp_path):
+    key = LLMCache.make_key("prompt", "model", 0.7, 100)
+    make_cache(tmp_path).set(key, "answer")
+    assert make_cache(tmp_path).get(key) == "answer"
+
+
+def test_ttl_expiry(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("k", "answer")
+    clock[0] += 59
+    assert cache.get("k") == "answer"
+    clock[0] += 2
+    assert cache.get("k") is None
+    assert cache._totals() == (0, 0)
+
+
+@pytest.mark.parametrize("ttl", [None, 0])
+def test_ttl_disabled(tmp_path, clock, ttl):
+    cache = make_cache(tmp_path, ttl_seconds=ttl)
+    cache.set("k", "answer")
+    clock[0] += 365 * 24 * 3600
+    assert cache.get("k") == "answer"
+
+
+@pytest.mark.parametrize("value, expected", [(None, 7 * 24 * 3600), ("0", None), ("", None), ("60", 60.0)])
+def test_ttl_from_env(tmp_path, monkeypatch, value, expected):
+    monkeypatch.setenv("LLM_CACHE", "on")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "env.sqlite"))
+    if value is None:
+        monkeypatch.delenv("LLM_CACHE_TTL", raising=False)
+    else:
+        monkeypatch.setenv("LLM_CACHE_TTL", value)
+    assert cache_from_env().ttl_seconds == expected
+
+
+def test_lru_eviction_at_entry_cap(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=3)
+    for key in "abc":
+        clock[0] += 1
+        cache.set(key, key)
+    clock[0] += 1
+    cache.get("a")  # now more recent than b and c
+    clock[0] += 1
+    cache.set("d", "d")
+    assert [cache.get(key) for key in "abcd"] == ["a", None, "c", "d"]
+
+
+def test_lru_eviction_at_size_cap(tmp_path, clock):
+    cache = make_cache(tmp_path, max_bytes=250)
+    for key in "abc":
+        clock[0] += 1
+        cache.set(key, key * 100)
+    assert cache.get("a") is None
+    assert cache.get("b") == "b" * 100 and cache.get("c") == "c" * 100
+    assert cache._totals() == (cache._count, cache._bytes) == (2, 200)
+
+
+def test_running_totals_track_replacements(tmp_path):
+    cache = make_cache(tmp_path, max_entries=1000)
+    for i in range(3 * LLMCache.SWEEP_EVERY + 7):
+        cache.set(str(i % 50), "x" * (i % 13))
+    assert (cache._count, cache._bytes) == tuple(cache._totals())
+
+
+def test_key_covers_sampling_settings_and_json_mode():
+    base = LLMCache.make_key("p", "m", 0.7, 100)
+    assert base == LLMCache.make_key("p", "m", 0.7, 100, json_mode=False)
+    others = [LLMCache.make_key("q", "m", 0.7, 100), LLMCache.make_key("p", "n", 0.7, 100),
+              LLMCache.make_key("p", "m", 0.2, 100), LLMCache.make_key("p", "m", 0.7, 50),
+              LLMCache.make_key("p", "m", 0.7, 100, json_mode=True)]
+    assert len({base, *others}) == 6
+
+
+def test_client_key_includes_json_mode():
+    plain = SimpleNamespace(model_name="llama", temperature=0.1, max_tokens=500, model_kwargs={})
+    json_llm = SimpleNamespace(model_name="llama", temperature=0.1, max_tokens=500,
+                               model_kwargs={"response_format": {"type": "json_object"}})
+    assert _cache_key(plain, "prompt") != _cache_key(json_llm, "prompt")
@@ -0,0 +1,89 @@
+"""Append-only memory store: queries, replay de-duplication and delta-encoded drafts"""
+
+import pytest
+
+from memory_store import MemoryStore
+from version_history import KEYFRAME_INTERVAL
+
+ARTICLE = "".join(f"Paragraph {i} of the article says something useful.\n" for i in range(60))
+
+
+def revise(text, i):
+    return text.replace(f"Paragraph {i} ", f"Paragraph {i} (revised {i}) ")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MemoryStore(str(tmp_path / "memory.sqlite"))
+
+
+def test_append_and_query(store):
+    store.append("run1", "research", "notes on solar", topic="Solar")
+    store.append("run1", "draft", "draft one", topic="Solar", iteration=1)
+    store.append("run2", "research", "newer notes on solar", topic="Solar")
+    store.append("run2", "research", "notes on wind", topic="Wind")
+
+    assert store.latest("research", topic="Solar")["content"] == "newer notes on solar"
+    assert store.latest("research", run_id="run1")["content"] == "notes on solar"
+    assert store.latest("edit") is None
+    assert [(r["kind"], r["content"]) for r in store.history("run1")] == [
+        ("research", "notes on solar"), ("draft", "draft one")]
+    assert [r["content"] for r in store.history("run2", "research")] == ["newer notes on solar", "notes on wind"]
+    assert {run["run_id"] for run in store.runs("Solar")} == {"run1", "run2"}
+
+
+def test_scan_pages_through_excerpts(store):
+    for i in range(5):
+        store.append(f"run{i}", "research", f"research {i} " + "x" * 50, topic=f"Topic {i}")
+    first = store.scan("research", excerpt_chars=10)
+    assert [r["excerpt"] for r in first] == [f"research {i}"[:10] for i in range(5)]
+    assert [r["topic"] for r in store.scan("research", after_id=first[2]["id"])] == ["Topic 3", "Topic 4"]
+
+
+def test_replaying_a_record_is_a_no_op(store):
+    store.append("run1", "research", "notes", topic="Solar")
+    store.append("run1", "draft", ARTICLE, topic="Solar", iteration=1)
+    # A resumed run restores the same stages from its checkpoints
+    store.append("run1", "research", "notes", topic="Solar")
+    store.append("run1", "draft", ARTICLE, topic="Solar", iteration=1)
+    assert len(store.history("run1")) == 2
+
+
+def test_identical_text_in_a_later_iteration_is_recorded(store):
+    store.append("run1", "edit", ARTICLE, iteration=1)
+    store.append("run1", "edit", revise(ARTICLE, 3), iteration=2)
+    store.append("run1", "edit", ARTICLE, iteration=3)  # feedback reverted the change
+    history = store.history("run1", "edit")
+    assert [r["iteration"] for r in history] == [1, 2, 3]
+    assert history[0]["content"] == history[2]["content"] == ARTICLE
+    assert history[0]["version"] == history[2]["version"]
+
+
+def test_drafts_are_delta_encoded_and_rebuilt(store):
+    texts = [ARTICLE]
+    for i in range(1, 3 * KEYFRAME_INTERVAL):
+        texts.append(revise(texts[-1], i))
+    for iteration, text in enumerate(texts, 1):
+        store.append("run1", "draft", text, topic="Solar", iteration=iteration)
+
+    assert [r["content"] for r in store.history("run1", "draft")] == texts
+    assert store.latest("draft", run_id="run1")["content"] == texts[-1]
+    assert [r["excerpt"] for r in store.scan("draft", excerpt_chars=80)] == [text[:80] for text in texts]
+
+    rows = store._conn.execute("SELECT base, depth, length(content) FROM records ORDER BY id").fetchall()
+    assert rows[0][0] is None
+    assert sum(base is not None for base, _, _ in rows) >= len(texts) - 3
+    assert max(depth for _, depth, _ in rows) <= KEYFRAME_INTERVAL
+    assert sum(size for _, _, size in rows) < sum(len(text) for text in texts) / 4
+
+
+def test_reopened_store_decodes_earlier_deltas(tmp_path):
+    path = str(tmp_path / "memory.sqlite")
+    first = MemoryStore(path)
+    first.append("run1", "draft", ARTICLE, iteration=1)
+    first.append("run1", "draft", revise(ARTICLE, 1), iteration=2)
+    first.close()
+
+    reopened = MemoryStore(path)
+    reopened.append("run1", "draft", revise(ARTICLE, 2), iteration=3)
+    assert [r["content"] for r in reopened.history("run1")] == [ARTICLE, revise(ARTICLE, 1), revise(ARTICLE, 2)]
@@ -0,0 +1,55 @@
+"""TokenBucket reservations and refill against a controlled clock"""
+
+import pytest
+
+import llm_client
+from llm_client import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_client.time, "monotonic", clock)
+    return clock
+
+
+def test_reserve_within_capacity_does_not_wait(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    assert bucket.reserve(4) == 0.0
+    assert bucket.reserve(6) == 0.0
+
+
+def test_overdraft_waits_for_refill_in_arrival_order(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=2)
+    bucket.reserve(10)
+    assert bucket.reserve(4) == pytest.approx(2.0)
+    # The next caller queues behind the first overdraft
+    assert bucket.reserve(2) == pytest.approx(3.0)
+
+
+def test_refill_is_continuous_and_capped(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=2)
+    bucket.reserve(10)
+    clock.now += 1.5
+    assert bucket.reserve(3) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.5)
+    clock.now += 3600
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.5)
+
+
+def test_refund_returns_tokens_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    bucket.reserve(8)
+    bucket.refund(5)
+    assert bucket.tokens == pytest.approx(7)
+    bucket.refund(100)
+    assert bucket.tokens == pytest.approx(10)
@@ -0,0 +1,79 @@
+"""Section targeting and merging for feedback-driven revisions"""
+
+import pytest
+
+from refinement import join_sections, merge_revision, select_sections, split_sections
+
+ARTICLE = (
+    "# Solar Power Today\n\n"
+    "An introduction to solar adoption.\n\n"
+    "## Costs\n\n"
+    "Panel prices have dropped and installation costs keep falling.\n\n"
+    "## Storage\n\n"
+    "Batteries smooth out supply when the sun sets.\n\n"
+    "## Conclusion\n\n"
+    "Solar keeps getting cheaper.\n"
+)
+
+
+def test_split_sections_round_trips():
+    sections = split_sections(ARTICLE)
+    assert [section["heading"] for section in sections] == [
+        "# Solar Power Today", "## Costs", "## Storage", "## Conclusion"]
+    assert join_sections(sections) == ARTICLE
+
+
+def test_select_sections_by_heading_terms():
+    sections = split_sections(ARTICLE)
+    assert select_sections(sections, "Explain the battery storage numbers better") == [2]
+
+
+def test_select_sections_intro_and_conclusion():
+    sections = split_sections(ARTICLE)
+    assert select_sections(sections, "Strengthen the introduction and the conclusion") == [0, 3]
+
+
+def test_select_sections_whole_article_feedback():
+    sections = split_sections(ARTICLE)
+    assert select_sections(sections, "The tone is too casual") == [0, 1, 2, 3]
+    assert select_sections(sections, "Nothing here matches xyzzy") == [0, 1, 2, 3]
+
+
+def test_select_sections_hints_match_whole_words():
+    sections = split_sections(ARTICLE)
+    # "stone" contains "tone" but is not whole-article feedback
+    assert select_sections(sections, "Add a cornerstone example about installation costs") == [1]
+
+
+def test_merge_revision_keeps_heading_and_spacing():
+    section = split_sections(ARTICLE)[1]
+    merged = merge_revision(section, "Prices fell 80% in a decade.")
+    assert merged == "## Costs\n\nPrices fell 80% in a decade.\n\n"
+
+
+def test_merge_revision_replaces_rewritten_heading():
+    section = split_sections(ARTICLE)[1]
+    merged = merge_revision(section, "## Cost Trends\n\nPrices fell.\n")
+    assert merged == "## Costs\n\nPrices fell.\n\n"
+
+
+def test_feedback_flag_reaches_refinement(monkeypatch):
+    import main
+
+    args = main.parse_args(["--feedback", "Shorten the costs section"])
+    assert args.feedback == "Shorten the costs section" and not args.refine
+    assert main.parse_args(["--refine"]).refine
+    with pytest.raises(SystemExit):
+        main.parse_args(["--batch", "topics.csv", "--refine"])
+
+    calls = []
+    creator = main.MultiAgentContentCreator.__new__(main.MultiAgentContentCreator)
+    creator.max_iterations = 1
+    creator.current_iteration = 1
+    creator.memory = type("Memory", (), {"metadata": {}})()
+    creator.results = {"final_article": "article"}
+    monkeypatch.setattr(creator, "_print_banner", lambda topic: None)
+    monkeypatch.setattr(creator, "execute_iteration", lambda topic: calls.append(("write", topic)))
+    monkeypatch.setattr(creator, "refine_iteration", lambda topic, feedback: calls.append(("refine", feedback)))
+    creator.create_content("Solar", feedback="Shorten the costs section")
+    assert calls == [("write", "Solar"), ("refine", "Shorten the costs section")]
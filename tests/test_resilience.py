@@ -0,0 +1,236 @@
+"""Retries, circuit breaking, timeouts and hedging around LLM attempts"""
+
+import asyncio
+import time
+
+import pytest
+
+import resilience
+from llm_client import RateLimiter
+from resilience import CallTimeout, CircuitBreaker, CircuitOpenError, ResilientCaller, RetryPolicy
+
+
+class Span:
+    def __init__(self):
+        self.fields = {}
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+
+class Flaky:
+    """Attempt that raises the given errors in turn, then returns "ok" """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class Overloaded(Exception):
+    status_code = 429
+
+
+def caller(**policy):
+    options = {"max_attempts": 3, "base_delay": 0.001, "max_delay": 0.01, "timeout": None}
+    options.update(policy)
+    return ResilientCaller(RetryPolicy(**options), breaker_threshold=10)
+
+
+def test_transient_failures_are_retried_with_backoff():
+    attempt = Flaky(ConnectionError("reset"), TimeoutError("slow"))
+    span = Span()
+    assert caller().call(attempt, "write", "model", span) == "ok"
+    assert attempt.calls == 3
+    assert span.fields["retries"] == 2
+
+
+def test_bad_requests_are_not_retried():
+    attempt = Flaky(ValueError("bad prompt"))
+    with pytest.raises(ValueError):
+        caller().call(attempt, "write", "model")
+    assert attempt.calls == 1
+
+
+def test_retries_stop_at_max_attempts():
+    attempt = Flaky(*[ConnectionError("reset")] * 5)
+    with pytest.raises(ConnectionError):
+        caller(max_attempts=2).call(attempt, "write", "model")
+    assert attempt.calls == 2
+
+
+def test_backoff_window_grows_and_honours_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=30.0)
+    error = ConnectionError("reset")
+    assert all(0 <= policy.delay(1, error) <= 1.0 for _ in range(50))
+    assert all(0 <= policy.delay(3, error) <= 4.0 for _ in range(50))
+    assert all(policy.delay(10, error) <= 30.0 for _ in range(50))
+
+    limited = Overloaded("slow down")
+    limited.response = type("Response", (), {"headers": {"retry-after": "7"}})()
+    assert policy.delay(1, limited) >= 7.0
+
+
+def test_breaker_opens_then_lets_one_trial_through(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(threshold=2, reset_after=30)
+    breaker.allow("model")
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError, match="retry in 30s"):
+        breaker.allow("model")
+
+    now[0] += 30
+    assert breaker.state == "half-open"
+    breaker.allow("model")  # the single trial
+    with pytest.raises(CircuitOpenError):
+        breaker.allow("model")
+    breaker.record_failure()  # a failed trial re-opens at once
+    assert breaker.state == "open"
+
+    now[0] += 30
+    breaker.allow("model")
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+    breaker.allow("model")
+
+
+def test_open_breaker_fails_fast_without_calling():
+    resilient = ResilientCaller(RetryPolicy(max_attempts=1, timeout=None), breaker_threshold=1)
+    with pytest.raises(ConnectionError):
+        resilient.call(Flaky(ConnectionError("reset")), "write", "model")
+    attempt = Flaky()
+    with pytest.raises(CircuitOpenError):
+        resilient.call(attempt, "write", "model")
+    assert attempt.calls == 0
+
+
+def test_sync_timeout_abandons_attempt_and_refunds():
+    abandoned = []
+    with pytest.raises(CallTimeout):
+        caller(max_attempts=1, timeout=0.05).call(lambda: time.sleep(0.5), "write", "model",
+                                                  abandon=lambda: abandoned.append(1))
+    assert abandoned == [1]
+
+
+def test_admission_wait_is_not_timed():
+    admitted = []
+
+    def admit():
+        time.sleep(0.2)  # e.g. waiting on the rate limiter
+        admitted.append(1)
+
+    def attempt():
+        time.sleep(0.02)
+        return "ok"
+
+    assert caller(max_attempts=1, timeout=0.1).call(attempt, "write", "model", admit=admit) == "ok"
+    assert admitted == [1]
+
+
+def _warm(resilient, route, seconds=0.01):
+    for _ in range(resilient.latencies.min_samples):
+        resilient.latencies.record(route, seconds)
+
+
+def test_slow_attempt_is_hedged():
+    resilient = caller(timeout=2.0)
+    resilient.hedge = True
+    _warm(resilient, "write@model")
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    admitted = []
+    span = Span()
+    started = time.monotonic()
+    assert resilient.call(attempt, "write", "model", span, admit=lambda: admitted.append(1)) == "fast"
+    assert time.monotonic() - started < 0.4
+    assert span.fields["hedged"] is True
+    assert len(admitted) == 2  # the hedge is rate limited like any other request
+
+
+def test_async_timeout_abandons_attempt():
+    abandoned = []
+
+    async def attempt():
+        await asyncio.sleep(1)
+
+    async def run():
+        await caller(max_attempts=1, timeout=0.05).acall(attempt, "write", "model",
+                                                         abandon=lambda: abandoned.append(1))
+
+    with pytest.raises(CallTimeout):
+        asyncio.run(run())
+    assert abandoned == [1]
+
+
+def test_async_admission_wait_is_not_timed():
+    async def admit():
+        await asyncio.sleep(0.2)
+
+    async def attempt():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    result = asyncio.run(caller(max_attempts=1, timeout=0.1).acall(attempt, "write", "model", admit=admit))
+    assert result == "ok"
+
+
+def test_async_hedge_cancels_and_refunds_the_loser():
+    resilient = caller(timeout=2.0)
+    resilient.hedge = True
+    _warm(resilient, "write@model")
+    calls = []
+    abandoned = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+            return "slow"
+        return "fast"
+
+    async def run():
+        return await resilient.acall(attempt, "write", "model", abandon=lambda: abandoned.append(1))
+
+    assert asyncio.run(run()) == "fast"
+    assert abandoned == [1]
+
+
+def test_cancelled_call_refunds_its_reservation():
+    abandoned = []
+
+    async def attempt():
+        await asyncio.sleep(1)
+
+    async def run():
+        task = asyncio.ensure_future(caller(timeout=None).acall(attempt, "write", "model",
+                                                                abandon=lambda: abandoned.append(1)))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert abandoned == [1]
+
+
+def test_rate_limiter_refund_returns_tokens_but_not_the_request():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    limiter._reserve(5000)
+    limiter.refund(5000)
+    assert limiter.tokens.tokens == pytest.approx(6000, abs=1)
+    assert limiter.requests.tokens == pytest.approx(59, abs=0.1)
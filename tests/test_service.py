@@ -0,0 +1,153 @@
+"""HTTP job API, driven through aiohttp's test client with a stand-in creator"""
+
+import asyncio
+import json
+import os
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from service import TERMINAL, ContentService, create_app
+
+
+class FakeCreator:
+    """Stands in for MultiAgentContentCreator; jobs wait on `gate` when it is set"""
+
+    gate = None
+    feedback = []
+
+    def __init__(self, max_iterations, checkpoints, stream):
+        self.consumers = []
+
+    def add_stream_consumer(self, consumer):
+        self.consumers.append(consumer)
+
+    async def acreate_content(self, topic, feedback=None):
+        FakeCreator.feedback.append(feedback)
+        if FakeCreator.gate is not None:
+            await FakeCreator.gate.wait()
+        if topic == "boom":
+            raise RuntimeError("model exploded")
+        for consumer in self.consumers:
+            consumer.on_paragraph("edit", f"All about {topic}.")
+        return f"# {topic}\n\nAll about {topic}."
+
+    async def aexport_results(self, output_dir):
+        return {"markdown": os.path.join(output_dir, "article.md")}
+
+
+@pytest.fixture
+def serve(tmp_path, monkeypatch):
+    """Run scenario(client, service) against a live app on the test loop"""
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(FakeCreator, "gate", None)
+    monkeypatch.setattr(FakeCreator, "feedback", [])
+
+    def run(scenario, **options):
+        async def main():
+            service = ContentService(output_root=str(tmp_path / "out"), creator_class=FakeCreator, **options)
+            async with TestClient(TestServer(create_app(service))) as client:
+                await scenario(client, service)
+        asyncio.run(main())
+
+    return run
+
+
+async def submit(client, **body):
+    response = await client.post("/jobs", json=body)
+    return response.status, await response.json()
+
+
+async def finished(client, job_id):
+    for _ in range(200):
+        summary = await (await client.get(f"/jobs/{job_id}")).json()
+        if summary["status"] in TERMINAL:
+            return summary
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_submit_returns_links_and_result(serve):
+    async def scenario(client, service):
+        status, body = await submit(client, topic="Solar power", feedback="Shorter intro")
+        assert status == 202
+        job_id = body["job_id"]
+        assert body["links"] == {"status": f"/jobs/{job_id}", "result": f"/jobs/{job_id}/result",
+                                 "events": f"/jobs/{job_id}/events"}
+        assert (await finished(client, job_id))["status"] == "succeeded"
+        response = await client.get(f"/jobs/{job_id}/result")
+        assert response.status == 200
+        result = await response.json()
+        assert result["final_article"].startswith("# Solar power")
+        assert FakeCreator.feedback == ["Shorter intro"]
+
+    serve(scenario)
+
+
+@pytest.mark.parametrize("body", [{}, {"topic": "  "}, ["Solar power"]])
+def test_missing_topic_is_rejected(serve, body):
+    async def scenario(client, service):
+        response = await client.post("/jobs", json=body)
+        assert response.status == 400
+
+    serve(scenario)
+
+
+def test_malformed_body_is_rejected(serve):
+    async def scenario(client, service):
+        response = await client.post("/jobs", data="not json", headers={"Content-Type": "application/json"})
+        assert response.status == 400
+
+    serve(scenario)
+
+
+def test_full_queue_returns_503_and_leaves_no_run_behind(serve, tmp_path):
+    async def scenario(client, service):
+        FakeCreator.gate = asyncio.Event()
+        _, running = await submit(client, topic="first")
+        while service.busy == 0:
+            await asyncio.sleep(0.01)
+        _, queued = await submit(client, topic="second")
+        status, body = await submit(client, topic="third")
+        assert status == 503 and "full" in body["error"]
+        assert sorted(os.listdir(tmp_path / "checkpoints")) == sorted([running["job_id"], queued["job_id"]])
+        FakeCreator.gate.set()
+        await finished(client, queued["job_id"])
+
+    serve(scenario, workers=1, queue_size=1)
+
+
+def test_result_status_codes(serve):
+    async def scenario(client, service):
+        FakeCreator.gate = asyncio.Event()
+        _, pending = await submit(client, topic="Solar power")
+        assert (await client.get(f"/jobs/{pending['job_id']}/result")).status == 409
+        _, failing = await submit(client, topic="boom")
+        FakeCreator.gate.set()
+        await finished(client, pending["job_id"])
+        await finished(client, failing["job_id"])
+        assert (await client.get(f"/jobs/{pending['job_id']}/result")).status == 200
+        response = await client.get(f"/jobs/{failing['job_id']}/result")
+        assert response.status == 500
+        assert (await response.json())["error"] == "RuntimeError: model exploded"
+        assert (await client.get("/jobs/unknown/result")).status == 404
+
+    serve(scenario)
+
+
+def test_event_stream_ends_on_terminal_event(serve):
+    async def scenario(client, service):
+        FakeCreator.gate = asyncio.Event()
+        _, body = await submit(client, topic="Solar power")
+        response = await client.get(f"/jobs/{body['job_id']}/events")
+        assert response.headers["Content-Type"].startswith("text/event-stream")
+        FakeCreator.gate.set()
+        text = await asyncio.wait_for(response.text(), timeout=5)
+        events = [json.loads(line[len("data: "):]) for line in text.splitlines() if line.startswith("data: ")]
+        names = [event["event"] for event in events]
+        assert names[:2] == ["queued", "started"]
+        assert names[-1] == "succeeded"
+        assert {"event": "paragraph", "stage": "edit", "text": "All about Solar power."}.items() <= \
+            next(event for event in events if event["event"] == "paragraph").items()
+
+    serve(scenario)
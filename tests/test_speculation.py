@@ -0,0 +1,143 @@
+"""Speculative fact-check and social content: when draft results are kept or redone"""
+
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+
+from content_tools import Speculation
+
+DRAFT = (
+    "## Solar power\n\n"
+    "Solar capacity in Germany reached 82 GW in 2023.\n"
+    "Panels installed in 2010 still produce 85% of their rated output.\n"
+    "The International Energy Agency expects solar to lead new capacity.\n"
+    "Prices for modules fell 40% during 2023 according to BloombergNEF.\n\n"
+    "Solar is a practical choice for many homes and businesses."
+)
+EDITED = DRAFT.replace("practical choice", "sensible, practical choice")
+ONE_ADDED = EDITED + "\nIn 2024 California produced 28% of its electricity from solar farms."
+REWRITTEN = (
+    "## Solar power\n\n"
+    "Rooftop systems in Spain doubled between 2019 and 2022.\n"
+    "Australia leads the world with 30% of homes running solar panels.\n"
+    "India added 13 GW of solar capacity in 2023 alone.\n"
+    "Prices for modules fell 40% during 2023 according to BloombergNEF."
+)
+SPECULATIVE = {
+    "verified_claims": [{"claim": "Solar capacity in Germany reached 82 GW in 2023.", "confidence": 0.9},
+                        {"claim": "Panels installed in 2010 still produce 85% of their rated output.",
+                         "confidence": 0.8}],
+    "unverified_claims": [],
+    "improvements": [],
+    "overall_accuracy": 90,
+}
+
+
+def done(value=None, error=None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+    return future
+
+
+class FakeChecker:
+    def __init__(self):
+        self.calls = []
+
+    def verify_article(self, article):
+        self.calls.append(("article", article))
+        return {"verified_claims": [], "unverified_claims": [], "improvements": [], "overall_accuracy": 50}
+
+    def verify_claims(self, claims):
+        self.calls.append(("claims", claims))
+        return {"verified_claims": [{"claim": claim, "confidence": 0.7} for claim in claims],
+                "unverified_claims": [], "improvements": [], "overall_accuracy": 60}
+
+
+class FakeSocial:
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, article):
+        self.calls.append(article)
+        return {"twitter": "fresh"}
+
+
+@pytest.fixture
+def speculation(monkeypatch):
+    monkeypatch.setenv("SPECULATIVE_MAX_CHANGE", "0.5")
+    monkeypatch.setenv("SPECULATIVE_MIN_SIMILARITY", "0.6")
+    return Speculation(DRAFT, done(SPECULATIVE), done({"twitter": "speculative"}))
+
+
+def test_unchanged_claims_keep_draft_verdicts(speculation):
+    checker = FakeChecker()
+    assert speculation.fact_check_for(checker, EDITED) == SPECULATIVE
+    assert checker.calls == []
+
+
+def test_only_added_claims_are_checked(speculation):
+    checker = FakeChecker()
+    result = speculation.fact_check_for(checker, ONE_ADDED)
+    added = "In 2024 California produced 28% of its electricity from solar farms."
+    assert checker.calls == [("claims", [added])]
+    assert [claim["claim"] for claim in result["verified_claims"]] == [
+        claim["claim"] for claim in SPECULATIVE["verified_claims"]] + [added]
+    # Weighted by the four carried claims against the one checked claim
+    assert result["overall_accuracy"] == 84
+
+
+def test_too_many_changed_claims_discard_the_draft_check(speculation):
+    checker = FakeChecker()
+    assert speculation.fact_check_for(checker, REWRITTEN)["overall_accuracy"] == 50
+    assert checker.calls == [("article", REWRITTEN)]
+
+
+def test_max_change_sets_the_discard_threshold(speculation):
+    assert speculation._plan_fact_check(ONE_ADDED, SPECULATIVE) is not None
+    speculation.max_change = 0.1
+    assert speculation._plan_fact_check(ONE_ADDED, SPECULATIVE) is None
+
+
+def test_failed_speculation_checks_the_article():
+    checker = FakeChecker()
+    speculation = Speculation(DRAFT, done(error=RuntimeError("rate limited")), done({}))
+    speculation.fact_check_for(checker, EDITED)
+    assert checker.calls == [("article", EDITED)]
+
+
+def test_social_content_kept_while_article_stays_similar(speculation):
+    social = FakeSocial()
+    assert speculation.social_for(social, EDITED) == {"twitter": "speculative"}
+    assert speculation.social_for(social, REWRITTEN) == {"twitter": "fresh"}
+    assert social.calls == [REWRITTEN]
+
+
+def test_failed_edit_cancels_speculation(offline, monkeypatch):
+    import main
+
+    started = []
+
+    def astart(draft):
+        forever = [asyncio.ensure_future(asyncio.sleep(3600)) for _ in range(2)]
+        started.extend(forever)
+        return Speculation(draft, *forever)
+
+    async def failing_edit(self, draft):
+        raise RuntimeError("editor unavailable")
+
+    monkeypatch.setattr(Speculation, "astart", staticmethod(astart))
+    monkeypatch.setattr(main.EditorAgent, "aedit", failing_edit)
+
+    async def run():
+        creator = main.MultiAgentContentCreator(max_iterations=1, stream=False, speculative=True)
+        with pytest.raises(RuntimeError, match="editor unavailable"):
+            await creator.aexecute_iteration("Solar power")
+        await asyncio.sleep(0)
+        assert creator.speculation is None
+        assert len(started) == 2 and all(task.cancelled() for task in started)
+
+    asyncio.run(run())
@@ -0,0 +1,68 @@
+"""Paragraph splitting and the Markdown stream consumer"""
+
+import asyncio
+import os
+
+from article_document import parse_article
+from checkpoints import CheckpointStore
+from streaming import MarkdownStream, ParagraphSplitter, relay
+
+ARTICLE = "## Intro\n\nSolar panels turn light into power.\n\nThey last for decades.\n\n- cheap\n- clean"
+
+
+def test_paragraphs_are_emitted_once_complete():
+    paragraphs = []
+    splitter = ParagraphSplitter(paragraphs.append)
+    for chunk in ["## In", "tro\n", "\nSolar", " panels\n\n\n", "Last"]:
+        splitter.feed(chunk)
+    assert paragraphs == ["## Intro", "Solar panels"]
+    splitter.close()
+    assert paragraphs == ["## Intro", "Solar panels", "Last"]
+
+
+def test_markdown_stream_writes_paragraphs_before_the_stage_ends(tmp_path):
+    path = str(tmp_path / "live" / "article.md")
+    chunks = [ARTICLE[i:i + 7] for i in range(0, len(ARTICLE), 7)]
+    stream = relay(iter(chunks), "edit", [MarkdownStream(path)])
+    seen = ""
+    while "decades" not in seen:
+        seen += next(stream)
+    with open(path, encoding="utf-8") as f:
+        assert "Solar panels turn light into power.\n\n" in f.read()
+    list(stream)
+    with open(path, encoding="utf-8") as f:
+        assert parse_article(f.read().split("\n\n", 2)[2]) == parse_article(ARTICLE)
+
+
+def test_markdown_stream_holds_code_blocks_until_closed(tmp_path):
+    path = str(tmp_path / "article.md")
+    article = "Intro.\n\n```python\nx = 1\n\n\n    y = 2\n```\n\nDone."
+    stream = relay(iter([article[:30], article[30:]]), "edit", [MarkdownStream(path)])
+    next(stream)
+    with open(path, encoding="utf-8") as f:
+        assert f.read().endswith("Intro.\n\n")
+    list(stream)
+    with open(path, encoding="utf-8") as f:
+        assert parse_article(f.read().split("\n\n", 2)[2]) == parse_article(article)
+
+
+def test_markdown_stream_ignores_other_stages(tmp_path):
+    path = str(tmp_path / "article.md")
+    list(relay(iter([ARTICLE]), "write", [MarkdownStream(path)]))
+    assert not os.path.exists(path)
+
+
+def test_batch_streams_each_article_to_its_folder(offline, monkeypatch):
+    import main
+
+    async def no_exports(self, **options):
+        return {}
+
+    monkeypatch.setattr(main.MultiAgentContentCreator, "aexport_results", no_exports)
+    results = asyncio.run(main.run_batch(["Solar power", "Wind power"], concurrency=2))
+    assert [record["status"] for record in results] == ["ok", "ok"]
+    for record in results:
+        with open(os.path.join(record["output_dir"], "article_live.md"), encoding="utf-8") as f:
+            live = f.read()
+        edit = CheckpointStore.open(record["run_id"]).load("iteration1_edit")
+        assert parse_article(live.split("\n\n", 2)[2]) == parse_article(edit)
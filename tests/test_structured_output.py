@@ -0,0 +1,126 @@
+"""JSON repair and schema validation of model responses"""
+
+import asyncio
+import json
+
+import pytest
+
+import structured_output
+from structured_output import (FACT_CHECK_SCHEMA, Field, Schema, astructured_stream, parse_structured, repair_json,
+                               structured_stream)
+
+
+def test_repair_json_strips_fences_and_fixes_literals():
+    text = '```json\n{"ok": True, "missing": None, "items": [1, 2,],}\n```'
+    assert json.loads(repair_json(text)) == {"ok": True, "missing": None, "items": [1, 2]}
+
+
+def test_repair_json_replaces_smart_quotes():
+    assert json.loads(repair_json('{“key”: “value”}')) == {"key": "value"}
+
+
+def test_repair_json_closes_truncated_output():
+    assert json.loads(repair_json('{"a": {"b": [1, 2')) == {"a": {"b": [1, 2]}}
+    assert json.loads(repair_json('{"a": 1, "b": "cut sho')) == {"a": 1, "b": "cut sho"}
+    text = '{"verified_claims": [{"claim": "x", "confidence": 9'
+    assert json.loads(repair_json(text)) == {"verified_claims": [{"claim": "x", "confidence": 9}]}
+
+
+def test_repair_json_drops_truncated_list_item():
+    assert json.loads(repair_json('{"claims": ["a", "half a cla')) == {"claims": ["a"]}
+
+
+def test_repair_json_drops_dangling_key():
+    assert json.loads(repair_json('{"a": 1, "b":')) == {"a": 1}
+    assert json.loads(repair_json('{"a": 1, "b"')) == {"a": 1}
+    assert json.loads(repair_json('{"a": [1, 2,')) == {"a": [1, 2]}
+
+
+def test_repair_json_leaves_braces_inside_strings_alone():
+    text = '{"note": "use {curly} and [square] \\"quoted\\"'
+    assert json.loads(repair_json(text)) == {"note": 'use {curly} and [square] "quoted"'}
+
+
+SCHEMA = Schema("example", {
+    "title": Field(str, max_length=10),
+    "score": Field(float, minimum=0, maximum=100),
+    "tags": Field(list, items=str, min_items=1),
+    "note": Field(str, required=False),
+})
+
+
+def test_schema_accepts_valid_data():
+    data, errors = SCHEMA.validate({"title": "Hi", "score": 50, "tags": ["a"]})
+    assert errors == []
+    assert data["title"] == "Hi" and data["tags"] == ["a"]
+
+
+def test_schema_reports_missing_and_invalid_required_fields():
+    _, errors = SCHEMA.validate({"score": 150, "tags": []})
+    assert any(error.startswith("title") for error in errors)
+    assert any(error.startswith("score") for error in errors)
+    assert any(error.startswith("tags") for error in errors)
+
+
+def test_schema_drops_invalid_optional_fields():
+    data, errors = SCHEMA.validate({"title": "Hi", "score": 5, "tags": ["a"], "note": {"not": "text"}})
+    assert errors == []
+    assert "note" not in data
+
+
+def test_schema_rejects_non_objects():
+    assert SCHEMA.validate(["not", "an", "object"]) == ({}, ["response is not a JSON object"])
+
+
+def test_fact_check_schema_reads_bare_strings_as_claims():
+    data, errors = FACT_CHECK_SCHEMA.validate({
+        "verified_claims": ["Water boils at 100C."],
+        "unverified_claims": [],
+        "overall_accuracy": 90,
+    })
+    assert errors == []
+    assert data["verified_claims"] == [{"claim": "Water boils at 100C."}]
+
+
+def test_parse_structured_handles_prose_around_json():
+    data, errors = parse_structured('Here you go:\n{"title": "Hi", "score": 1, "tags": ["x"]}\nThanks!', SCHEMA)
+    assert errors == []
+    assert data["score"] == 1
+
+
+SMALL_SCHEMA = Schema("small", {"count": Field(int), "name": Field(str)})
+CHUNKS = ['{"count": "many", ', '"name": "solar"}']
+
+
+@pytest.fixture
+def flaky_repair(monkeypatch):
+    """The first (early) repair call fails; later ones fix the count"""
+    calls = []
+
+    def repair(schema, text, data, errors, stage):
+        calls.append(errors)
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        return '{"count": 3}'
+
+    async def arepair(*args):
+        return repair(*args)
+
+    monkeypatch.setenv("STRUCTURED_REPAIR_ATTEMPTS", "1")
+    monkeypatch.setattr(structured_output, "_request_repair", repair)
+    monkeypatch.setattr(structured_output, "_arequest_repair", arepair)
+    return calls
+
+
+def test_failed_early_repair_falls_back_to_post_stream_repair(flaky_repair):
+    assert structured_stream(iter(CHUNKS), SMALL_SCHEMA, "test") == {"count": 3, "name": "solar"}
+    assert len(flaky_repair) == 2
+
+
+def test_failed_early_repair_falls_back_to_post_stream_repair_async(flaky_repair):
+    async def chunks():
+        for chunk in CHUNKS:
+            yield chunk
+
+    assert asyncio.run(astructured_stream(chunks(), SMALL_SCHEMA, "test")) == {"count": 3, "name": "solar"}
+    assert len(flaky_repair) == 2
@@ -0,0 +1,47 @@
+"""Sentence-level compression of oversized prompt inputs"""
+
+import re
+
+from token_budget import compress, count_tokens
+
+FILLER = "This sentence says rather little and mostly pads the paragraph out."
+TEXT = (
+    "## Background\n"
+    f"The project started in 2019 with 12 engineers. {FILLER} {FILLER}\n\n"
+    f"{FILLER} Revenue grew 40% last year. {FILLER}\n\n"
+    f"## Outlook\n"
+    f"{FILLER} {FILLER} Analysts at Morgan Stanley expect further growth."
+)
+
+
+def _sentences(text):
+    return [s for s in re.split(r'(?<=[.!?])\s+|\n+', text) if s.strip()]
+
+
+def test_text_within_budget_is_unchanged():
+    assert compress(TEXT, count_tokens(TEXT)) == TEXT
+
+
+def test_compressed_text_fits_budget_with_whole_sentences_in_order():
+    budget = count_tokens(TEXT) // 2
+    result = compress(TEXT, budget)
+    assert count_tokens(result) <= budget
+    # Every kept sentence appears, whole and in order, in the original
+    remaining = iter(_sentences(TEXT))
+    assert all(any(sentence == candidate for candidate in remaining) for sentence in _sentences(result))
+
+
+def test_informative_sentences_are_preferred():
+    result = compress(TEXT, count_tokens(TEXT) // 2)
+    assert "Revenue grew 40% last year." in result
+    assert "Analysts at Morgan Stanley expect further growth." in result
+    assert result.count(FILLER) < TEXT.count(FILLER)
+
+
+def test_headings_stay_above_their_sentences():
+    result = compress(TEXT, count_tokens(TEXT) // 2)
+    assert result.index("## Outlook") < result.index("Analysts at Morgan Stanley")
+
+
+def test_tiny_budget_returns_single_best_sentence():
+    assert compress(TEXT, 1) == "The project started in 2019 with 12 engineers."
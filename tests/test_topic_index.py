@@ -0,0 +1,128 @@
+"""Similar-topic search and how the researcher chooses between stored and fresh research"""
+
+import pytest
+
+import topic_index
+from memory_store import MemoryStore
+from topic_index import TopicIndex, terms
+
+RESEARCH = {
+    "Impact of AI on business automation": "AI tools automate invoices, support and business workflows.",
+    "Solar power for homes": "Rooftop solar panels, inverters and home batteries.",
+    "Remote work productivity": "Remote teams, async communication and productivity.",
+    "AI in healthcare diagnostics": "AI models read scans and help doctors.",
+}
+STORED = RESEARCH["Impact of AI on business automation"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MemoryStore(str(tmp_path / "memory.sqlite"))
+    for i, (topic, brief) in enumerate(RESEARCH.items()):
+        store.append(f"run{i}", "research", brief, topic=topic)
+    return store
+
+
+def test_terms_drop_framing_words_and_stem():
+    assert terms("The impact of automating AI businesses") == ["automa", "ai", "busine"]
+
+
+def test_search_ranks_near_duplicates_first(store):
+    matches = TopicIndex(store).search("AI in business automation", limit=4)
+    assert [match["topic"] for match in matches] == ["Impact of AI on business automation",
+                                                     "AI in healthcare diagnostics"]
+    assert matches[0]["score"] == 1.0 > matches[1]["score"]
+    assert TopicIndex(store).search("knitting patterns") == []
+
+
+def test_threshold_and_age_filter_matches(store, monkeypatch):
+    index = TopicIndex(store)
+    assert [m["topic"] for m in index.search("solar energy for homes", threshold=0.5)] == ["Solar power for homes"]
+    assert index.search("solar energy for homes", threshold=0.7) == []
+    assert index.best_match("AI in business automation", 0.7)["content"] == STORED
+    now = topic_index.time.time()
+    monkeypatch.setattr(topic_index.time, "time", lambda: now + 3600)
+    assert index.best_match("AI in business automation", 0.7, max_age_seconds=60) is None
+
+
+def test_index_picks_up_new_research_incrementally(store):
+    index = TopicIndex(store)
+    assert index.search("Wind turbines offshore") == []
+    store.append("run9", "research", "Offshore wind farms and turbine sizes.", topic="Offshore wind turbines")
+    store.append("run10", "research", "Newer notes on home solar.", topic="Solar power for homes")
+    assert index.search("Wind turbines offshore")[0]["run_id"] == "run9"
+    assert len(index.entries) == len(RESEARCH) + 1
+    assert index.best_match("Solar power for homes", 0.7)["content"] == "Newer notes on home solar."
+
+
+@pytest.fixture
+def researcher(offline, store, monkeypatch):
+    """ResearcherAgent factory over the seeded store; LLM calls are recorded, not made"""
+    import main
+
+    calls = []
+
+    def invoke(llm, template, inputs, stage, **options):
+        calls.append(template)
+        return "fresh research"
+
+    monkeypatch.setattr(main, "invoke_llm", invoke)
+    monkeypatch.setenv("RESEARCH_REUSE_THRESHOLD", "0.7")
+
+    def make(mode, confirm=None):
+        agent = main.ResearcherAgent(main.ContentCreatorMemory(store=store), reuse=mode)
+        agent.confirm_reuse = confirm
+        return agent
+
+    make.calls = calls
+    return make
+
+
+def test_off_always_researches_afresh(researcher):
+    agent = researcher("off")
+    assert agent.research("AI in business automation") == "fresh research"
+    assert researcher.calls == [agent.research_template]
+
+
+def test_reuse_takes_the_stored_brief_without_a_call(researcher):
+    agent = researcher("reuse")
+    assert agent.research("AI in business automation") == STORED
+    assert researcher.calls == []
+
+
+def test_update_extends_the_stored_brief(researcher):
+    agent = researcher("update")
+    research = agent.research("AI in business automation")
+    assert research.startswith(STORED)
+    assert research.endswith("Updates for this topic:\nfresh research")
+    assert researcher.calls == [agent.update_template]
+
+
+def test_reuse_below_threshold_researches_afresh(researcher):
+    agent = researcher("reuse")
+    assert agent.research("solar energy for homes") == "fresh research"
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ("reuse", STORED),
+    ("update", f"{STORED}\n\nUpdates for this topic:\nfresh research"),
+    ("off", "fresh research"),
+])
+def test_ask_follows_the_answer(researcher, answer, expected):
+    offered = []
+    agent = researcher("ask", confirm=lambda match: offered.append(match["topic"]) or answer)
+    assert agent.research("AI in business automation") == expected
+    assert offered == ["Impact of AI on business automation"]
+
+
+def test_ask_without_a_prompt_researches_afresh(researcher):
+    assert researcher("ask").research("AI in business automation") == "fresh research"
+
+
+@pytest.mark.parametrize("mode", [["--batch", "topics.csv"], ["--serve"]])
+def test_ask_is_rejected_without_the_interactive_prompt(mode, capsys):
+    import main
+
+    with pytest.raises(SystemExit):
+        main.parse_args(mode + ["--reuse-research", "ask"])
+    assert "needs the interactive prompt" in capsys.readouterr().err
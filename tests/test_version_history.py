@@ -0,0 +1,78 @@
+"""Line deltas and the delta-compressed version history"""
+
+import json
+
+import pytest
+
+from version_history import KEYFRAME_INTERVAL, VersionHistory, apply_delta, make_delta
+
+BASE = "".join(f"Line {i} of the original draft.\n" for i in range(40))
+
+
+def _edit(text, i):
+    lines = text.splitlines(keepends=True)
+    lines[i % len(lines)] = f"Edited line in revision {i}.\n"
+    return "".join(lines) + f"Appended in revision {i}.\n"
+
+
+@pytest.mark.parametrize("text", [
+    BASE,
+    "",
+    BASE.replace("Line 7", "Row 7"),
+    "Prefix\n" + BASE + "no trailing newline",
+    BASE[:200],
+])
+def test_delta_round_trip(text):
+    assert apply_delta(BASE, make_delta(BASE, text)) == text
+
+
+def test_delta_copies_unchanged_lines():
+    delta = make_delta(BASE, BASE.replace("Line 20 ", "Line twenty "))
+    assert delta[0] == [0, 20] and delta[-1] == [21, 40]
+
+
+def test_history_round_trip_across_keyframes():
+    history = VersionHistory()
+    texts = [BASE]
+    for i in range(3 * KEYFRAME_INTERVAL):
+        texts.append(_edit(texts[-1], i))
+    ids = [history.add(text) for text in texts]
+
+    blobs = [history.blobs[version] for version in ids]
+    keyframes = [i for i, blob in enumerate(blobs) if "text" in blob]
+    assert len(keyframes) >= 3
+    assert all(blob.get("depth", 0) <= KEYFRAME_INTERVAL for blob in blobs)
+
+    # Rebuild from serialized form, where only the newest text is kept in memory
+    restored = VersionHistory.from_dict(json.loads(json.dumps(history.to_dict())))
+    assert [restored.get(version) for version in ids] == texts
+    stats = restored.stats()
+    assert stats["stored_chars"] < stats["full_chars"] / 3
+
+
+def test_history_stores_repeated_text_once():
+    history = VersionHistory()
+    first = history.add(BASE)
+    history.add(_edit(BASE, 1))
+    assert history.add(BASE) == first
+    assert history.stats()["versions"] == 3 and history.stats()["unique"] == 2
+
+
+def test_resolve_positions_and_prefixes():
+    history = VersionHistory()
+    ids = [history.add(BASE), history.add(_edit(BASE, 1))]
+    assert history.resolve(1) == ids[0]
+    assert history.resolve("2") == ids[1]
+    assert history.resolve(ids[1][:7]) == ids[1]
+    for ref in (0, "0", 3, "-1", ids[0][:6]):
+        with pytest.raises(KeyError):
+            history.resolve(ref)
+
+
+def test_diff_between_versions():
+    history = VersionHistory()
+    history.add(BASE)
+    history.add(BASE.replace("Line 3 ", "Line three "))
+    diff = history.diff(1, 2)
+    assert "-Line 3 of the original draft." in diff
+    assert "+Line three of the original draft." in diff
@@ -0,0 +1,212 @@
+"""
+Prompt Token Budgets for Multi-Agent Content Creator System
+Sizes the variable part of each prompt (research brief, draft, article) to
+what the stage can afford: the model's context window minus its max_tokens
+reservation and the rest of the prompt, capped by an optional per-stage
+input budget. Oversized inputs are compressed by dropping the least
+informative whole sentences, or with PROMPT_COMPRESSION=summarize by asking
+the model to condense them first. Text is never cut mid-sentence.
+"""
+
+import os
+import re
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+
+load_dotenv()
+
+# Context windows of the Groq models this project is used with; others fall
+# back to LLM_CONTEXT_TOKENS
+CONTEXT_WINDOWS = {
+    "llama-3.3-70b-versatile": 131072,
+    "llama-3.1-70b-versatile": 131072,
+    "llama-3.1-8b-instant": 131072,
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "mixtral-8x7b-32768": 32768,
+    "gemma2-9b-it": 8192,
+}
+DEFAULT_CONTEXT_TOKENS = 8192
+
+# Stages that used to slice their input by characters keep budgets of about
+# the same size ([:2000] and [:3000] characters)
+DEFAULT_STAGE_BUDGETS = {"social": 500, "fact_check": 750}
+
+# Tokens kept free for chat formatting and tokenizer disagreement
+SAFETY_MARGIN = 64
+
+_SENTENCE = re.compile(r'(?<=[.!?])\s+')
+_HEADING = re.compile(r'^(?:#{1,6}\s|\*\*[^*]+\*\*:?$|[^.!?]{1,80}:$)')
+_SIGNALS = re.compile(r'\d|%|"|\b[A-Z][a-z]+\s+[A-Z][a-z]+')
+
+_encoding = None
+_encoding_loaded = False
+
+
+def count_tokens(text: str) -> int:
+    """Token count via tiktoken when installed, otherwise ~4 characters per token"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # not installed, or the encoding could not be fetched
+            _encoding = None
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def context_window(model: Optional[str]) -> int:
+    name = (model or "").split(":")[-1]
+    if name in CONTEXT_WINDOWS:
+        return CONTEXT_WINDOWS[name]
+    return int(os.getenv("LLM_CONTEXT_TOKENS", str(DEFAULT_CONTEXT_TOKENS)))
+
+
+def stage_budget(stage: str) -> Optional[int]:
+    """Input budget for a stage from INPUT_BUDGET_<STAGE> or INPUT_BUDGET; None means context-limited only"""
+    value = os.getenv(f"INPUT_BUDGET_{stage.upper()}") or os.getenv("INPUT_BUDGET")
+    if value:
+        return int(value) or None
+    return DEFAULT_STAGE_BUDGETS.get(stage)
+
+
+def input_budget(llm, prompt: "PromptTemplate", inputs: Dict, key: str, stage: str) -> int:
+    """Tokens available to inputs[key] once the rest of the prompt and the completion are reserved"""
+    rest = count_tokens(prompt.format(**{**inputs, key: ""}))
+    available = context_window(getattr(llm, "model_name", None)) - (getattr(llm, "max_tokens", None) or 0)
+    available -= rest + SAFETY_MARGIN
+    budget = stage_budget(stage)
+    return max(0, min(available, budget) if budget else available)
+
+
+def _units(text: str) -> List[Tuple[int, bool, str]]:
+    """(paragraph index, is heading, text) for every heading and sentence"""
+    units = []
+    for number, block in enumerate(re.split(r'\n\s*\n', text.strip())):
+        for line_number, line in enumerate(block.split('\n')):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(('- ', '* ', '• ')) or re.match(r'^\d+[.)]\s', line):
+                units.append((number, False, line))
+                continue
+            if _HEADING.match(line) or (line_number == 0 and len(line) < 80 and not line.endswith('.')
+                                         and '\n' in block):
+                units.append((number, True, line))
+                continue
+            units.extend((number, False, sentence) for sentence in _SENTENCE.split(line) if sentence)
+    return units
+
+
+def compress(text: str, budget: int) -> str:
+    """Shrink text to about `budget` tokens by keeping its most informative whole sentences
+
+    Headings are kept above the sentences they introduce, repeated sentences
+    are dropped first, and sentences with figures, quotes or names and those
+    that open a paragraph are preferred. Kept text stays in its original
+    order. If not even one sentence fits, the single best one is returned.
+    """
+    if count_tokens(text) <= budget:
+        return text
+    units = _units(text)
+    seen = set()
+    candidates = []
+    for index, (paragraph, heading, unit) in enumerate(units):
+        if heading:
+            continue
+        key = re.sub(r'\W+', ' ', unit.lower()).strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        opens_paragraph = index == 0 or units[index - 1][0] != paragraph or units[index - 1][1]
+        score = 1.0 + 2.0 * bool(_SIGNALS.search(unit)) + 1.5 * opens_paragraph
+        candidates.append((-score, index))
+
+    kept = set()
+    used = 0
+    for _, index in sorted(candidates):
+        paragraph = units[index][0]
+        heading = next((i for i in range(index - 1, -1, -1)
+                        if units[i][1] and units[i][0] <= paragraph), None)
+        cost = count_tokens(units[index][2]) + 1
+        if heading is not None and heading not in kept:
+            cost += count_tokens(units[heading][2]) + 1
+        if used + cost > budget:
+            continue
+        kept.add(index)
+        if heading is not None:
+            kept.add(heading)
+        used += cost
+    if not any(not units[i][1] for i in kept) and candidates:
+        kept = {min(candidates)[1]}
+
+    paragraphs: Dict[int, List[str]] = {}
+    for index in sorted(kept):
+        paragraph, heading, unit = units[index]
+        paragraphs.setdefault(paragraph, []).append(unit + ("\n" if heading else " "))
+    return "\n\n".join("".join(parts).strip() for _, parts in sorted(paragraphs.items()))
+
+
+def _summary_prompt():
+    from langchain.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["text", "words"],
+        template="""Condense the following text to at most {words} words. Keep every figure, name, date and
+source, keep its headings and structure, and drop repetition and filler. Return only the condensed text.
+
+Text:
+{text}"""
+    )
+
+
+def _summarize_enabled() -> bool:
+    return os.getenv("PROMPT_COMPRESSION", "extractive").lower() == "summarize"
+
+
+def _report(stage: str, key: str, before: int, after: int, budget: int, span):
+    if span is not None:
+        span.set(input_tokens=before, input_tokens_saved=before - after)
+    print(f"   🗜️  {key} for {stage}: {before:,} -> {after:,} tokens (budget {budget:,})")
+    if after > budget:
+        print(f"   ⚠️  {key} for {stage} is still over budget: its most informative sentence alone exceeds it")
+
+
+def fit_input(llm, prompt: "PromptTemplate", inputs: Dict, key: str, stage: str, span=None) -> Dict:
+    """Inputs with inputs[key] compressed to the stage's budget, unchanged when it already fits"""
+    text = inputs[key]
+    budget = input_budget(llm, prompt, inputs, key, stage)
+    before = count_tokens(text)
+    if before <= budget:
+        return inputs
+    if _summarize_enabled():
+        from llm_backends import get_llm
+        from llm_client import invoke_llm
+        text = invoke_llm(get_llm("compress"), _summary_prompt(),
+                          {"text": text, "words": int(budget * 0.7)}, "compress")
+    text = compress(text, budget)
+    _report(stage, key, before, count_tokens(text), budget, span)
+    return {**inputs, key: text}
+
+
+async def afit_input(llm, prompt: "PromptTemplate", inputs: Dict, key: str, stage: str, span=None) -> Dict:
+    """Asynchronous counterpart of fit_input"""
+    text = inputs[key]
+    budget = input_budget(llm, prompt, inputs, key, stage)
+    before = count_tokens(text)
+    if before <= budget:
+        return inputs
+    if _summarize_enabled():
+        from llm_backends import get_llm
+        from llm_client import ainvoke_llm
+        text = await ainvoke_llm(get_llm("compress"), _summary_prompt(),
+                                 {"text": text, "words": int(budget * 0.7)}, "compress")
+    text = compress(text, budget)
+    _report(stage, key, before, count_tokens(text), budget, span)
+    return {**inputs, key: text}
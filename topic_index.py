@@ -0,0 +1,156 @@
+"""
+Similar-Topic Index for Multi-Agent Content Creator System
+Finds earlier research whose topic is a near-duplicate of a new one ("AI in
+business automation" vs "impact of AI on business automation") so the
+researcher can reuse or update it instead of starting from scratch.
+
+Topics are compared by TF-IDF cosine similarity over stemmed words, blended
+with how much of the new topic's (IDF-weighted) vocabulary the earlier brief
+covers. Scoring is vectorized over an inverted index in NumPy, and the index
+reads only new research from the memory store on each query.
+"""
+
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from memory_store import MemoryStore
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "with", "about", "how", "why", "what",
+    "is", "are", "its", "it", "by", "from", "at", "as", "into", "vs", "versus", "guide", "introduction",
+    "overview", "refined", "based",
+    # framing words that say how a subject is discussed, not what it is
+    "impact", "impacts", "effect", "effects", "role", "rise", "state", "basics", "explained", "trends", "driven"
+}
+
+# Weight of the topic-to-topic cosine in the score; the rest is brief coverage
+TOPIC_WEIGHT = 0.75
+
+
+def terms(text: str) -> List[str]:
+    """Lowercased content words cut to a 6-letter stem ("automation", "automating" -> "automa")"""
+    words = re.findall(r"[a-z0-9][a-z0-9+#]*", text.lower())
+    return [word[:6] for word in words if word not in STOPWORDS]
+
+
+class TopicIndex:
+    """Latest research per distinct topic, searchable by similarity"""
+
+    def __init__(self, store: MemoryStore, excerpt_chars: int = 2000):
+        self.store = store
+        self.excerpt_chars = excerpt_chars
+        self.entries: List[Dict] = []         # one per distinct topic: record id, run, time, topic terms
+        self._by_topic: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {entry: count in topic}
+        self._brief_postings: Dict[str, set] = {}        # term -> entries whose brief mentions it
+        self._brief_terms: List[set] = []
+        self._norms: Optional[np.ndarray] = None          # topic vector norms, rebuilt when entries change
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Index research added to the store since the last refresh"""
+        for record in self.store.scan("research", after_id=self._last_id, excerpt_chars=self.excerpt_chars):
+            self._last_id = record["id"]
+            topic = (record["topic"] or "").strip()
+            if not topic:
+                continue
+            key = topic.lower()
+            words = terms(topic)
+            if key in self._by_topic:  # newer research on the same topic replaces the older one
+                index = self._by_topic[key]
+                self.entries[index].update(id=record["id"], run_id=record["run_id"], created_at=record["created_at"])
+                for term in self._brief_terms[index]:
+                    self._brief_postings[term].discard(index)
+            else:
+                index = len(self.entries)
+                self._by_topic[key] = index
+                self.entries.append({"id": record["id"], "run_id": record["run_id"], "topic": topic,
+                                     "created_at": record["created_at"]})
+                self._brief_terms.append(set())
+                for term in set(words):
+                    self._postings.setdefault(term, {})[index] = words.count(term)
+                self._norms = None
+            self._brief_terms[index] = set(terms(record["excerpt"]))
+            for term in self._brief_terms[index]:
+                self._brief_postings.setdefault(term, set()).add(index)
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self.entries)) / (1 + len(self._postings.get(term, ())))) + 1.0
+
+    def search(self, topic: str, threshold: float = 0.0, max_age_seconds: Optional[float] = None,
+               limit: int = 3) -> List[Dict]:
+        """Earlier research on similar topics, best first, as {"topic", "run_id", "score", ...}"""
+        with self._lock:
+            self.refresh()
+            query = terms(topic)
+            if not query or not self.entries:
+                return []
+            count = len(self.entries)
+            weights = {term: query.count(term) * self._idf(term) for term in set(query)}
+            query_norm = math.sqrt(sum(w * w for w in weights.values()))
+
+            dots = np.zeros(count)
+            covered = np.zeros(count)
+            for term, weight in weights.items():
+                postings = self._postings.get(term)
+                if postings:
+                    rows = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+                    tf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+                    np.add.at(dots, rows, weight * tf * self._idf(term))
+                briefs = self._brief_postings.get(term)
+                if briefs:
+                    covered[np.fromiter(briefs, dtype=np.int64, count=len(briefs))] += weight
+            candidates = np.nonzero(dots)[0]
+            if not len(candidates):
+                return []
+            cosine = dots[candidates] / (self._topic_norms()[candidates] * query_norm)
+            coverage = covered[candidates] / sum(weights.values())
+            scores = TOPIC_WEIGHT * cosine + (1 - TOPIC_WEIGHT) * coverage
+
+            oldest = time.time() - max_age_seconds if max_age_seconds else 0
+            matches = []
+            for position in np.argsort(-scores):
+                entry = self.entries[candidates[position]]
+                score = float(scores[position])
+                if score < threshold or len(matches) >= limit:
+                    break
+                if entry["created_at"] >= oldest:
+                    matches.append({"topic": entry["topic"], "run_id": entry["run_id"], "record_id": entry["id"],
+                                    "created_at": entry["created_at"], "score": round(score, 3)})
+            return matches
+
+    def _topic_norms(self) -> np.ndarray:
+        """TF-IDF vector norm of every indexed topic"""
+        if self._norms is None:
+            squares = np.zeros(len(self.entries))
+            for term, postings in self._postings.items():
+                rows = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+                tf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+                np.add.at(squares, rows, (tf * self._idf(term)) ** 2)
+            self._norms = np.sqrt(squares)
+        return self._norms
+
+    def best_match(self, topic: str, threshold: float, max_age_seconds: Optional[float] = None) -> Optional[Dict]:
+        """Closest earlier research at or above threshold, with its full content, or None"""
+        matches = self.search(topic, threshold, max_age_seconds, limit=1)
+        if not matches:
+            return None
+        record = self.store.get(matches[0]["record_id"])
+        return {**matches[0], "content": record["content"]} if record else None
+
+
+_indexes: Dict[int, TopicIndex] = {}
+
+
+def get_topic_index(store: MemoryStore) -> TopicIndex:
+    """Process-wide index for a memory store, so every run shares one incrementally updated index"""
+    index = _indexes.get(id(store))
+    if index is None or index.store is not store:
+        index = _indexes[id(store)] = TopicIndex(store)
+    return index
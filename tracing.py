@@ -0,0 +1,235 @@
+"""
+Structured Tracing for Multi-Agent Content Creator System
+Every LLM call and export step emits a span (wall time, queue wait, tokens,
+retries, cache hits) to a local JSONL file. `python tracing.py summary`
+prints per-stage latency percentiles across all recorded runs, and latency
+and token use per route (stage and the model that served it).
+
+Usage:
+    python tracing.py summary [traces.jsonl]
+"""
+
+import contextvars
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+_trace_id: contextvars.ContextVar = contextvars.ContextVar("trace_id", default=None)
+
+
+def set_trace_id(trace_id: Optional[str]):
+    """Tag spans from the current task/thread context with a run ID"""
+    _trace_id.set(trace_id)
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+def bind_trace(fn: Callable) -> Callable:
+    """Wrap fn so worker threads tag their spans with the caller's run ID"""
+    trace_id = _trace_id.get()
+
+    def run(*args, **kwargs):
+        _trace_id.set(trace_id)
+        return fn(*args, **kwargs)
+    return run
+
+
+class Span:
+    """Mutable record of one timed operation; extra fields are set as it runs"""
+
+    def __init__(self, stage: str, kind: str, **fields):
+        self.stage = stage
+        self.kind = kind
+        self.fields = dict(fields)
+        self.started = time.perf_counter()
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def to_record(self, wall_ms: float) -> Dict:
+        record = {
+            "ts": datetime.now().isoformat(),
+            "trace_id": current_trace_id(),
+            "stage": self.stage,
+            "kind": self.kind,
+            "wall_ms": round(wall_ms, 3),
+        }
+        record.update(self.fields)
+        return record
+
+
+# In-process subscribers (e.g. the HTTP service's progress streams); they
+# survive configure_tracing() and receive spans even when the file sink is off
+_listeners: List[Callable[[Dict], None]] = []
+
+
+def add_listener(listener: Callable[[Dict], None]):
+    """Call listener(record) for every span; it may run on any thread"""
+    _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[Dict], None]):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+class Tracer:
+    """Appends span records to a JSONL sink; disabled tracers cost one branch"""
+
+    def __init__(self, path: Optional[str] = "traces.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def record(self, record: Dict):
+        for listener in list(_listeners):
+            listener(record)
+        if not self.enabled:
+            return
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    @contextmanager
+    def span(self, stage: str, kind: str, **fields) -> Iterator[Span]:
+        """Time the enclosed block; exceptions are recorded and re-raised"""
+        current = Span(stage, kind, **fields)
+        try:
+            yield current
+            current.fields.setdefault("ok", True)
+        except BaseException as e:
+            current.set(ok=False, error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self.record(current.to_record((time.perf_counter() - current.started) * 1000))
+
+
+def _tracer_from_env() -> Tracer:
+    if os.getenv("TRACE", "on").lower() in ("off", "0", "false", "no"):
+        return Tracer(None)
+    return Tracer(os.getenv("TRACE_FILE", "traces.jsonl"))
+
+
+load_dotenv()
+tracer = _tracer_from_env()
+
+
+def configure_tracing(path: Optional[str] = "traces.jsonl"):
+    """Point the process-wide tracer at a new sink; None disables tracing"""
+    global tracer
+    tracer = Tracer(path)
+
+
+def get_tracer() -> Tracer:
+    return tracer
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already-sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(path: str = "traces.jsonl") -> Dict[str, Dict]:
+    """Aggregate recorded spans into per-stage latency and usage statistics"""
+    by_stage: Dict[str, List[Dict]] = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                by_stage.setdefault(record["stage"], []).append(record)
+
+    summary = {}
+    for stage, records in sorted(by_stage.items()):
+        wall = sorted(r["wall_ms"] for r in records)
+        waits = [r.get("queue_wait_ms") or 0 for r in records]
+        summary[stage] = {
+            "count": len(records),
+            "errors": sum(1 for r in records if not r.get("ok", True)),
+            "p50_ms": percentile(wall, 50),
+            "p95_ms": percentile(wall, 95),
+            "p99_ms": percentile(wall, 99),
+            "mean_queue_wait_ms": sum(waits) / len(waits),
+            "cache_hits": sum(1 for r in records if r.get("cache_hit")),
+            "retries": sum(r.get("retries") or 0 for r in records),
+            "prompt_tokens": sum(r.get("prompt_tokens") or 0 for r in records),
+            "completion_tokens": sum(r.get("completion_tokens") or 0 for r in records),
+            "tokens_saved": sum(r.get("input_tokens_saved") or 0 for r in records),
+        }
+    return summary
+
+
+def summarize_routes(path: str = "traces.jsonl") -> Dict[str, Dict]:
+    """Latency, tokens and fallbacks per "stage@model" route, over LLM spans that reached a model"""
+    by_route: Dict[str, List[Dict]] = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if record.get("kind") == "llm" and record.get("model") and not record.get("cache_hit"):
+                    by_route.setdefault(f"{record['stage']}@{record['model']}", []).append(record)
+
+    summary = {}
+    for route, records in sorted(by_route.items()):
+        wall = sorted(r["wall_ms"] for r in records)
+        summary[route] = {
+            "count": len(records),
+            "errors": sum(1 for r in records if not r.get("ok", True)),
+            "fallbacks": sum(1 for r in records if r.get("fallback_from")),
+            "mean_ms": sum(wall) / len(wall),
+            "p50_ms": percentile(wall, 50),
+            "p95_ms": percentile(wall, 95),
+            "prompt_tokens": sum(r.get("prompt_tokens") or 0 for r in records),
+            "completion_tokens": sum(r.get("completion_tokens") or 0 for r in records),
+        }
+    return summary
+
+
+def print_summary(path: str = "traces.jsonl"):
+    """Print a per-stage latency table for the spans in `path`"""
+    if not os.path.exists(path):
+        print(f"❌ No trace file found at {path}")
+        return
+    summary = summarize(path)
+    print("\n" + "="*70)
+    print(f"📊 STAGE LATENCY SUMMARY ({path})")
+    print("="*70)
+    print(f"{'stage':<22}{'n':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'wait ms':>9}{'hits':>6}"
+          f"{'tokens':>9}{'saved':>8}")
+    for stage, stats in summary.items():
+        tokens = stats["prompt_tokens"] + stats["completion_tokens"]
+        print(f"{stage:<22}{stats['count']:>6}{stats['errors']:>5}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}{stats['mean_queue_wait_ms']:>9.1f}{stats['cache_hits']:>6}{tokens:>9}"
+              f"{stats['tokens_saved']:>8}")
+
+    routes = summarize_routes(path)
+    if routes:
+        print(f"\n{'route':<44}{'n':>6}{'err':>5}{'fb':>4}{'mean ms':>10}{'p95 ms':>10}{'prompt':>9}{'compl':>8}")
+        for route, stats in routes.items():
+            print(f"{route:<44}{stats['count']:>6}{stats['errors']:>5}{stats['fallbacks']:>4}{stats['mean_ms']:>10.1f}"
+                  f"{stats['p95_ms']:>10.1f}{stats['prompt_tokens']:>9}{stats['completion_tokens']:>8}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "summary":
+        print(__doc__.strip())
+        sys.exit(1)
+    print_summary(sys.argv[2] if len(sys.argv) > 2 else os.getenv("TRACE_FILE", "traces.jsonl"))
@@ -0,0 +1,144 @@
+"""
+Delta-Compressed Version History for Multi-Agent Content Creator System
+Content-addressed store for successive drafts and edits of one article.
+Each distinct text is stored once under its SHA-256 digest, as a line-level
+delta against the previously added version; every KEYFRAME_INTERVAL deltas,
+or when a delta would not save space, a full copy is kept instead so
+reconstruction never walks a long chain.
+
+Usage:
+    python version_history.py diff memory_log.json OLD NEW   # version numbers from 1, or 7+ char digest prefixes
+"""
+
+import difflib
+import hashlib
+import json
+import sys
+from typing import Dict, List, Optional, Union
+
+KEYFRAME_INTERVAL = 8
+MIN_PREFIX = 7  # shortest digest prefix accepted; shorter all-digit refs are positions
+
+# Delta ops: [start, end] copies base lines start:end, a string inserts text
+Delta = List[Union[List[int], str]]
+
+
+def make_delta(base: str, text: str) -> Delta:
+    """Line-level delta that rebuilds text from base"""
+    base_lines = base.splitlines(keepends=True)
+    lines = text.splitlines(keepends=True)
+    delta: Delta = []
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif j2 > j1:
+            delta.append("".join(lines[j1:j2]))
+    return delta
+
+
+def apply_delta(base: str, delta: Delta) -> str:
+    base_lines = base.splitlines(keepends=True)
+    return "".join("".join(base_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in delta)
+
+
+def _delta_size(delta: Delta) -> int:
+    return sum(len(op) if isinstance(op, str) else 8 for op in delta)
+
+
+def encode_delta(base: str, text: str, depth: int) -> Optional[Delta]:
+    """Delta from base to text at the given chain depth, or None when a full copy should be kept"""
+    if depth > KEYFRAME_INTERVAL:
+        return None
+    delta = make_delta(base, text)
+    if _delta_size(delta) >= 0.8 * len(text):
+        return None
+    return delta
+
+
+class VersionHistory:
+    """Ordered versions of a text, stored once each and delta-encoded"""
+
+    def __init__(self):
+        self.blobs: Dict[str, Dict] = {}  # digest -> {"text"} or {"base", "delta", "depth"}
+        self.order: List[str] = []        # digests in the order versions were added
+        self._latest: Optional[tuple] = None  # (digest, text) of the newest version
+
+    def add(self, text: str) -> str:
+        """Store text (once) and return its version ID"""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if digest not in self.blobs:
+            self.blobs[digest] = self._encode(text)
+        self.order.append(digest)
+        self._latest = (digest, text)
+        return digest
+
+    def _encode(self, text: str) -> Dict:
+        if self._latest is None:
+            return {"text": text}
+        base, base_text = self._latest
+        depth = self.blobs[base].get("depth", 0) + 1
+        delta = encode_delta(base_text, text, depth)
+        if delta is None:
+            return {"text": text}
+        return {"base": base, "delta": delta, "depth": depth}
+
+    def get(self, version: str) -> str:
+        """Full text of a version, rebuilt from its nearest full copy"""
+        if self._latest is not None and self._latest[0] == version:
+            return self._latest[1]
+        blob = self.blobs[version]
+        if "text" in blob:
+            return blob["text"]
+        return apply_delta(self.get(blob["base"]), blob["delta"])
+
+    def resolve(self, ref: Union[int, str]) -> str:
+        """Version ID for a 1-based position in the history, or a digest prefix of at least 7 characters"""
+        if isinstance(ref, int) or (ref.isdigit() and len(ref) < MIN_PREFIX):
+            position = int(ref)
+            if not 1 <= position <= len(self.order):
+                raise KeyError(f"No version {position} (history has {len(self.order)})")
+            return self.order[position - 1]
+        if len(ref) < MIN_PREFIX:
+            raise KeyError(f"Version digest prefix '{ref}' is shorter than {MIN_PREFIX} characters")
+        matches = {digest for digest in self.order if digest.startswith(ref)}
+        if len(matches) != 1:
+            raise KeyError(f"{'Ambiguous' if matches else 'Unknown'} version '{ref}'")
+        return matches.pop()
+
+    def diff(self, old: Union[int, str], new: Union[int, str], context: int = 3) -> str:
+        """Unified diff between two versions"""
+        old_id, new_id = self.resolve(old), self.resolve(new)
+        return "".join(difflib.unified_diff(
+            self.get(old_id).splitlines(keepends=True), self.get(new_id).splitlines(keepends=True),
+            fromfile=f"version {old} ({old_id[:8]})", tofile=f"version {new} ({new_id[:8]})", n=context
+        ))
+
+    def stats(self) -> Dict:
+        """Characters the versions would take as full copies versus as stored"""
+        full = sum(len(self.get(digest)) for digest in self.order)
+        stored = sum(len(blob["text"]) if "text" in blob else _delta_size(blob["delta"])
+                     for blob in self.blobs.values())
+        return {"versions": len(self.order), "unique": len(self.blobs), "full_chars": full, "stored_chars": stored}
+
+    def to_dict(self) -> Dict:
+        return {"order": self.order, "blobs": self.blobs}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "VersionHistory":
+        history = cls()
+        history.blobs = data["blobs"]
+        history.order = data["order"]
+        if history.order:
+            latest = history.order[-1]
+            history._latest = (latest, history.get(latest))
+        return history
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5 or sys.argv[1] != "diff":
+        print(__doc__.strip())
+        sys.exit(1)
+    with open(sys.argv[2], encoding="utf-8") as f:
+        history = VersionHistory.from_dict(json.load(f)["versions"])
+    sys.stdout.write(history.diff(sys.argv[3], sys.argv[4]))